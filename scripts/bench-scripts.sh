@@ -0,0 +1,134 @@
+#!/usr/bin/env bash
+#
+# Benchmark suite for the deterministic scripts on synthetic novel projects.
+#
+# Usage:
+#   bench-scripts.sh [--sizes <n,n,...>] [--work-dir <dir>] [--repeat <n>] [--sample <k>] [--seed <n>]
+#                    [--cases <name,...>] [--out <bench.json>] [--baseline <bench.json>]
+#                    [--max-regression <pct>] [--min-delta-ms <ms>]
+#
+# Output:
+#   stdout JSON (exit 0 on success): per "<case>@<chapters>" wall_ms (median over --repeat),
+#   peak_rss_kb, items (chapters) and items_per_sec; plus "comparison" when --baseline is given.
+#
+# Exit codes:
+#   0 = success (no case regressed beyond --max-regression)
+#   1 = validation failure (bad args, missing baseline) or a case regressed vs --baseline
+#   2 = script exception (unexpected runtime error, or a benchmarked script failed)
+#
+# Notes:
+# - Projects (evaluations/logs/labels/foreshadowing shaped like eval/fixtures/demo-project, plus
+#   chapters/*.md with injected blacklist/cliche phrases and entities) are generated from --seed
+#   under --work-dir and reused by later runs with the same size/seed.
+# - Cases: run_regression_cold/warm, calibrate_quality_judge, compare_regression_runs,
+#   lint_{blacklist,cliche,readability}_batch (whole project) and lint_{blacklist,cliche,readability},
+#   run_ner, query_foreshadow (one call per chapter over --sample evenly spaced chapters).
+#   query_foreshadow_range answers every chapter with one query-foreshadow.sh --range call.
+#   run_ner_corpus runs the NER extractor over every chapter in one process and also reports
+#   chars_per_sec (e.g. --sizes 10000 --cases run_ner_corpus for a 10k-chapter corpus).
+# - A case regresses when it is more than --max-regression percent AND more than --min-delta-ms
+#   slower than the same case in the baseline; cases missing from either side are skipped.
+# - 30000 chapters needs ~600 MB of disk in --work-dir and ~1-2 minutes to generate the first time.
+# - Implementation: lib/bench_scripts.py (driver), lib/bench_synth.py (project generator).
+
+set -euo pipefail
+
+usage() {
+  cat >&2 <<'USAGE'
+Usage:
+  bench-scripts.sh [options]
+
+Options:
+  --sizes <n,n,...>       Project sizes in chapters (default: 30,300,3000,30000)
+  --work-dir <dir>        Where synthetic projects and run archives live (default: eval/bench)
+  --repeat <n>            Runs per case; wall_ms is the median (default: 3)
+  --sample <k>            Chapters for the per-chapter cases (0 = all; default: 20)
+  --seed <n>              Generator seed (default: 1)
+  --cases <name,...>      Only run these cases (default: all)
+  --out <file>            Also write the report JSON to file (directories created)
+  --baseline <file>       Earlier report to compare against
+  --max-regression <pct>  Allowed slowdown vs baseline in percent (default: 25)
+  --min-delta-ms <ms>     Ignore slowdowns smaller than this (default: 50)
+  -h, --help              Show help
+USAGE
+}
+
+sizes="30,300,3000,30000"
+work_dir="eval/bench"
+repeat=3
+sample=20
+seed=1
+cases=""
+out_path=""
+baseline_path=""
+max_regression=25
+min_delta_ms=50
+
+while [ "$#" -gt 0 ]; do
+  case "$1" in
+    --sizes|--work-dir|--repeat|--sample|--seed|--cases|--out|--baseline|--max-regression|--min-delta-ms)
+      [ "$#" -ge 2 ] || { echo "bench-scripts.sh: error: $1 requires a value" >&2; exit 1; }
+      case "$1" in
+        --sizes) sizes="$2" ;;
+        --work-dir) work_dir="$2" ;;
+        --repeat) repeat="$2" ;;
+        --sample) sample="$2" ;;
+        --seed) seed="$2" ;;
+        --cases) cases="$2" ;;
+        --out) out_path="$2" ;;
+        --baseline) baseline_path="$2" ;;
+        --max-regression) max_regression="$2" ;;
+        --min-delta-ms) min_delta_ms="$2" ;;
+      esac
+      shift 2
+      ;;
+    -h|--help)
+      usage
+      exit 0
+      ;;
+    *)
+      echo "bench-scripts.sh: unknown arg: $1" >&2
+      usage
+      exit 1
+      ;;
+  esac
+done
+
+if ! [[ "$sizes" =~ ^[0-9]+(,[0-9]+)*$ ]]; then
+  echo "bench-scripts.sh: --sizes must be comma-separated ints (got: $sizes)" >&2
+  exit 1
+fi
+if ! [[ "$repeat" =~ ^[0-9]+$ ]] || [ "$repeat" -le 0 ]; then
+  echo "bench-scripts.sh: --repeat must be an int >= 1 (got: $repeat)" >&2
+  exit 1
+fi
+for pair in "sample:$sample" "seed:$seed"; do
+  if ! [[ "${pair#*:}" =~ ^[0-9]+$ ]]; then
+    echo "bench-scripts.sh: --${pair%%:*} must be an int >= 0 (got: ${pair#*:})" >&2
+    exit 1
+  fi
+done
+for pair in "max-regression:$max_regression" "min-delta-ms:$min_delta_ms"; do
+  if ! [[ "${pair#*:}" =~ ^[0-9]+([.][0-9]+)?$ ]]; then
+    echo "bench-scripts.sh: --${pair%%:*} must be a number >= 0 (got: ${pair#*:})" >&2
+    exit 1
+  fi
+done
+
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "bench-scripts.sh: python3 is required but not found" >&2
+  exit 2
+fi
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+exec python3 "$SCRIPT_DIR/lib/bench_scripts.py" \
+  "$sizes" \
+  "$work_dir" \
+  "$repeat" \
+  "$sample" \
+  "$out_path" \
+  "$baseline_path" \
+  "$max_regression" \
+  "$min_delta_ms" \
+  "$seed" \
+  "$cases"
@@ -4,9 +4,19 @@
 #
 # Usage:
 #   calibrate-quality-judge.sh --project <novel_project_dir> --labels <labels.jsonl> [--out <report.json>]
+#                              [--bootstrap <n>] [--seed <n>] [--jobs <n>] [--multi-judge]
+#                              [--eval-store]
 #
 # Output:
 #   stdout JSON (exit 0 on success)
+#   --bootstrap adds "bootstrap" (95% percentile CIs for pearson_r, slope, intercept and gate
+#   agreement) and "threshold_sweep" (per gate threshold: judge-side candidates default +/- 0.5
+#   in 0.05 steps with agreement / false_pass / false_block vs the human gate, the best candidate
+#   and its bootstrap CI).
+#   --multi-judge adds "judges": every judge score source found in the evals (overall_final as
+#   resolved below, eval_used, and each metadata.judges.<role>[<model>]) calibrated against the
+#   labels ("comparison", best pearson_r first), plus a pairwise judge "agreement_matrix"
+#   (n / pearson_r / mean_abs_diff / gate_agreement over chapters both judges scored).
 #
 # Exit codes:
 #   0 = success (valid JSON emitted to stdout)
@@ -16,6 +26,15 @@
 # Notes:
 # - Aligns by chapter number.
 # - Uses judge `overall_final` when available; falls back to `overall`.
+# - Statistics (pearson_r, linear fit, mae/rmse/bias, fit residuals) for overall and every
+#   dimension are computed in one batch; NumPy is used when installed (optional), otherwise pure
+#   Python. Both give the same numbers; NOVEL_CALIBRATE_NUMPY=0 forces the pure-Python path.
+# - --bootstrap resamples chapters in chunks with per-chunk seeded RNGs: the same --seed gives the
+#   same report for any --jobs (0 = CPU count). The NumPy and pure-Python paths draw from different
+#   RNG streams, so their CIs differ slightly for the same --seed; bootstrap.rng records which one
+#   ran ("numpy" / "python"; set NOVEL_CALIBRATE_NUMPY=0 to pin the pure-Python stream).
+# - --eval-store reads judge scores from the project's consolidated eval store (see
+#   eval-store.sh) instead of parsing every eval file; the report is identical either way.
 
 set -euo pipefail
 
@@ -23,11 +42,18 @@ usage() {
   cat >&2 <<'EOF'
 Usage:
   calibrate-quality-judge.sh --project <novel_project_dir> --labels <labels.jsonl> [--out <report.json>]
+                             [--bootstrap <n>] [--seed <n>] [--jobs <n>] [--multi-judge]
+                             [--eval-store]
 
 Options:
   --project <dir>   Novel project directory (must contain evaluations/)
   --labels <file>   JSONL labels file (eval/datasets/**/labels-YYYY-MM-DD.jsonl)
   --out <file>      Optional: write report JSON to file (directories created)
+  --bootstrap <n>   Bootstrap resamples for CIs + gate threshold sweep (0 = off; default: 0)
+  --seed <n>        Bootstrap seed (default: 1)
+  --jobs <n>        Bootstrap worker processes (0 = CPU count; default: 1)
+  --multi-judge     Also calibrate every judge source (primary/secondary/...) and compare them
+  --eval-store      Read evals from <project>/logs/eval-store.sqlite (refreshed first; see eval-store.sh)
   -h, --help        Show help
 EOF
 }
@@ -35,6 +61,11 @@ EOF
 project_dir=""
 labels_path=""
 out_path=""
+bootstrap=0
+seed=1
+jobs=1
+multi_judge=0
+use_eval_store=0
 
 while [ "$#" -gt 0 ]; do
   case "$1" in
@@ -53,6 +84,23 @@ while [ "$#" -gt 0 ]; do
       out_path="$2"
       shift 2
       ;;
+    --bootstrap|--seed|--jobs)
+      [ "$#" -ge 2 ] || { echo "calibrate-quality-judge.sh: error: $1 requires a value" >&2; exit 1; }
+      case "$1" in
+        --bootstrap) bootstrap="$2" ;;
+        --seed) seed="$2" ;;
+        --jobs) jobs="$2" ;;
+      esac
+      shift 2
+      ;;
+    --multi-judge)
+      multi_judge=1
+      shift 1
+      ;;
+    --eval-store)
+      use_eval_store=1
+      shift 1
+      ;;
     -h|--help)
       usage
       exit 0
@@ -81,11 +129,18 @@ if [ ! -f "$labels_path" ]; then
   exit 1
 fi
 
+for pair in "bootstrap:$bootstrap" "seed:$seed" "jobs:$jobs"; do
+  if ! [[ "${pair#*:}" =~ ^[0-9]+$ ]]; then
+    echo "calibrate-quality-judge.sh: --${pair%%:*} must be an int >= 0 (got: ${pair#*:})" >&2
+    exit 1
+  fi
+done
+
 if ! command -v python3 >/dev/null 2>&1; then
   echo "calibrate-quality-judge.sh: python3 is required but not found" >&2
   exit 1
 fi
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
-python3 "$SCRIPT_DIR/lib/calibrate_quality_judge.py" "$project_dir" "$labels_path" "$out_path"
+python3 "$SCRIPT_DIR/lib/calibrate_quality_judge.py" "$project_dir" "$labels_path" "$out_path" "$bootstrap" "$seed" "$jobs" "$multi_judge" "$use_eval_store"
 
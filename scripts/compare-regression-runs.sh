@@ -4,9 +4,13 @@
 #
 # Usage:
 #   compare-regression-runs.sh <run_dir_a> <run_dir_b> [--out <delta.json>]
+#   compare-regression-runs.sh <run_dir_a> <run_dir_b> --chapters [--min-score-delta <x>] [--out <diff.jsonl>]
 #
 # Output:
 #   stdout JSON (exit 0 on success)
+#   --chapters: stdout JSONL, one {"type": "chapter", ...} line per chapter that regressed,
+#   recovered, changed violations or score, or exists in one run only (ascending chapter order),
+#   then a final {"type": "chapter_diff_summary", ...} line with the counts.
 #
 # Exit codes:
 #   0 = success (valid JSON emitted to stdout)
@@ -19,13 +23,22 @@ usage() {
   cat >&2 <<'EOF'
 Usage:
   compare-regression-runs.sh <run_dir_a> <run_dir_b> [--out <delta.json>]
+  compare-regression-runs.sh <run_dir_a> <run_dir_b> --chapters [--min-score-delta <x>] [--out <diff.jsonl>]
 
 Notes:
   - Expects each run dir to contain summary.json (generated by scripts/run-regression.sh).
+  - --chapters streams a merge-join of the runs' chapters.jsonl (per-chapter overall score and
+    violations) instead: a chapter "regressed" / "recovered" when it moves between clean,
+    violation and high-confidence violation; "changed" when only its violations or its score
+    (by more than --min-score-delta, default 0) differ. Memory use does not grow with chapters.
+  - delta.stage_latency: per stage / per model change in duration_ms p50/p90/p99/mean,
+    tokens_total and output_tokens_per_sec (null where one run lacks the stage or model).
 EOF
 }
 
 out_path=""
+chapters_mode=0
+min_score_delta=0
 
 if [ "$#" -lt 2 ]; then
   usage
@@ -43,6 +56,15 @@ while [ "$#" -gt 0 ]; do
       out_path="$2"
       shift 2
       ;;
+    --chapters)
+      chapters_mode=1
+      shift 1
+      ;;
+    --min-score-delta)
+      [ "$#" -ge 2 ] || { echo "compare-regression-runs.sh: error: --min-score-delta requires a value" >&2; exit 1; }
+      min_score_delta="$2"
+      shift 2
+      ;;
     -h|--help)
       usage
       exit 0
@@ -64,16 +86,29 @@ if [ ! -d "$run_b" ]; then
   exit 1
 fi
 
-summary_a="$run_a/summary.json"
-summary_b="$run_b/summary.json"
-
-if [ ! -f "$summary_a" ]; then
-  echo "compare-regression-runs.sh: missing summary.json: $summary_a" >&2
+if ! [[ "$min_score_delta" =~ ^[0-9]+([.][0-9]+)?$ ]]; then
+  echo "compare-regression-runs.sh: --min-score-delta must be a number >= 0 (got: $min_score_delta)" >&2
   exit 1
 fi
-if [ ! -f "$summary_b" ]; then
-  echo "compare-regression-runs.sh: missing summary.json: $summary_b" >&2
-  exit 1
+
+if [ "$chapters_mode" -eq 1 ]; then
+  input_a="$run_a/chapters.jsonl"
+  input_b="$run_b/chapters.jsonl"
+  for f in "$input_a" "$input_b"; do
+    if [ ! -f "$f" ]; then
+      echo "compare-regression-runs.sh: missing chapters.jsonl: $f (run archived before per-chapter records; re-run run-regression.sh)" >&2
+      exit 1
+    fi
+  done
+else
+  input_a="$run_a/summary.json"
+  input_b="$run_b/summary.json"
+  for f in "$input_a" "$input_b"; do
+    if [ ! -f "$f" ]; then
+      echo "compare-regression-runs.sh: missing summary.json: $f" >&2
+      exit 1
+    fi
+  done
 fi
 
 if ! command -v python3 >/dev/null 2>&1; then
@@ -82,5 +117,9 @@ if ! command -v python3 >/dev/null 2>&1; then
 fi
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
-python3 "$SCRIPT_DIR/lib/compare_regression_runs.py" "$summary_a" "$summary_b" "$out_path"
+if [ "$chapters_mode" -eq 1 ]; then
+  python3 "$SCRIPT_DIR/lib/compare_regression_runs.py" "$input_a" "$input_b" "$out_path" chapters "$min_score_delta"
+else
+  python3 "$SCRIPT_DIR/lib/compare_regression_runs.py" "$input_a" "$input_b" "$out_path"
+fi
 
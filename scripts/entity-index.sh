@@ -0,0 +1,152 @@
+#!/usr/bin/env bash
+#
+# Project-wide entity index built from run-ner.sh output (M3+ extension point).
+#
+# Usage:
+#   entity-index.sh update [--jobs <n>] <index.sqlite> <chapter.md|chapters_dir>...
+#   entity-index.sh query [--prefix] [--type <type,...>] [--from <chapter>] [--to <chapter>]
+#                         [--max-chapters <n>] <index.sqlite> <name>...
+#
+# Output:
+#   stdout JSON (exit 0 on success)
+#   update: counts of (re)indexed / unchanged / removed chapters and entities per type.
+#   query:  per name, matching entities with first_seen/last_seen, chapter_count and the most
+#           recent --max-chapters chapters with their run-ner.sh mentions (line/snippet);
+#           with 2+ names also "co_occurrence" (chapters where all of them appear).
+#
+# Exit codes:
+#   0 = success (valid JSON emitted to stdout)
+#   1 = validation failure (bad args, missing files, invalid index)
+#   2 = script exception (unexpected runtime error)
+#
+# Notes:
+# - The index is a SQLite file; recommended location: logs/entity-index.sqlite (derived data;
+#   rebuildable from chapters/; an index of an older layout is rebuilt on the next update).
+# - update runs the run-ner.sh extractor on each chapter (chapter number from chapter-NNN in the
+#   file name) and replaces whatever that chapter contributed before; chapters whose content
+#   hash is unchanged are skipped, so calling it after each committed chapter is cheap. Indexed
+#   chapters whose file no longer exists, or that no longer match in a chapters_dir argument
+#   (deleted or renumbered), are removed. Only changed rows are written.
+#   --jobs fans chapters out across worker processes (0 = CPU count; default: 1).
+# - query looks names up by exact text (or prefix with --prefix) through the index's primary key,
+#   reading only the matching entities' rows; no chapter text is read. --type limits entity types (characters, locations, time_markers, events).
+#   query opens the index read-only and exits 1 on an index of an older layout (run update first).
+# - Implementation: lib/entity_index.py.
+
+set -euo pipefail
+
+usage() {
+  cat >&2 <<'USAGE'
+Usage:
+  entity-index.sh update [--jobs <n>] <index.sqlite> <chapter.md|chapters_dir>...
+  entity-index.sh query [--prefix] [--type <type,...>] [--from <chapter>] [--to <chapter>]
+                        [--max-chapters <n>] <index.sqlite> <name>...
+
+Query options:
+  --prefix              Treat each name as a prefix
+  --type <type,...>     Only these entity types (characters,locations,time_markers,events)
+  --from <chapter>      Ignore chapters before this one
+  --to <chapter>        Ignore chapters after this one
+  --max-chapters <n>    Most recent chapters listed per entity (0 = all; default: 20)
+USAGE
+}
+
+if [ "$#" -lt 1 ]; then
+  usage
+  exit 1
+fi
+
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "entity-index.sh: python3 is required but not found" >&2
+  exit 2
+fi
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
+command_name="$1"
+shift 1
+
+case "$command_name" in
+  update)
+    jobs=1
+    if [ "${1:-}" = "--jobs" ]; then
+      [ "$#" -ge 2 ] || { echo "entity-index.sh: error: --jobs requires a value" >&2; exit 1; }
+      jobs="$2"
+      shift 2
+    fi
+    if [ "$#" -lt 2 ]; then
+      usage
+      exit 1
+    fi
+    if ! [[ "$jobs" =~ ^[0-9]+$ ]]; then
+      echo "entity-index.sh: --jobs must be an int >= 0 (got: $jobs)" >&2
+      exit 1
+    fi
+    index_path="$1"
+    shift 1
+    for chapter_arg in "$@"; do
+      if [ ! -e "$chapter_arg" ]; then
+        echo "entity-index.sh: chapter file or dir not found: $chapter_arg" >&2
+        exit 1
+      fi
+    done
+    exec python3 "$SCRIPT_DIR/lib/entity_index.py" update "$jobs" "$index_path" "$@"
+    ;;
+  query)
+    prefix=0
+    types=""
+    from_chapter=""
+    to_chapter=""
+    max_chapters=20
+    while [ "$#" -gt 0 ]; do
+      case "$1" in
+        --prefix)
+          prefix=1
+          shift 1
+          ;;
+        --type|--from|--to|--max-chapters)
+          [ "$#" -ge 2 ] || { echo "entity-index.sh: error: $1 requires a value" >&2; exit 1; }
+          case "$1" in
+            --type) types="$2" ;;
+            --from) from_chapter="$2" ;;
+            --to) to_chapter="$2" ;;
+            --max-chapters) max_chapters="$2" ;;
+          esac
+          shift 2
+          ;;
+        -h|--help)
+          usage
+          exit 0
+          ;;
+        -*)
+          echo "entity-index.sh: unknown arg: $1" >&2
+          usage
+          exit 1
+          ;;
+        *)
+          break
+          ;;
+      esac
+    done
+    if [ "$#" -lt 2 ]; then
+      usage
+      exit 1
+    fi
+    for pair in "from:$from_chapter" "to:$to_chapter" "max-chapters:$max_chapters"; do
+      if [ -n "${pair#*:}" ] && ! [[ "${pair#*:}" =~ ^[0-9]+$ ]]; then
+        echo "entity-index.sh: --${pair%%:*} must be an int >= 0 (got: ${pair#*:})" >&2
+        exit 1
+      fi
+    done
+    exec python3 "$SCRIPT_DIR/lib/entity_index.py" query "$1" "$prefix" "$types" "$from_chapter" "$to_chapter" "$max_chapters" "${@:2}"
+    ;;
+  -h|--help)
+    usage
+    exit 0
+    ;;
+  *)
+    echo "entity-index.sh: unknown command: $command_name (expected update or query)" >&2
+    usage
+    exit 1
+    ;;
+esac
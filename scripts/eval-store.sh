@@ -0,0 +1,84 @@
+#!/usr/bin/env bash
+#
+# Consolidated per-project eval store (M3).
+#
+# Usage:
+#   eval-store.sh --project <novel_project_dir> [--store <file>]
+#
+# Output:
+#   stdout JSON (exit 0 on success): refresh counts (unchanged / extracted / removed eval files)
+#   and row counts of the store.
+#
+# Exit codes:
+#   0 = success (valid JSON emitted to stdout)
+#   1 = validation failure (bad args, missing evaluations/, invalid eval JSON)
+#   2 = script exception (unexpected runtime error)
+#
+# Notes:
+# - Materializes what the M3 scripts extract from evaluations/chapter-NNN-eval.json (overall and
+#   its source field, every judge score, dimension scores, flattened contract_verification check
+#   rows: layer / rule_id / status / confidence / constraint_type) into one SQLite file, default
+#   <project>/logs/eval-store.sqlite (derived data; delete it to rebuild).
+# - Refreshes are incremental: only eval files whose size/mtime and content hash changed are
+#   re-extracted; deleted eval files are dropped.
+# - run-regression.sh and calibrate-quality-judge.sh read it with --eval-store (refreshing it
+#   first), so running this script beforehand is optional.
+# - Implementation: lib/eval_store.py.
+
+set -euo pipefail
+
+usage() {
+  cat >&2 <<'USAGE'
+Usage:
+  eval-store.sh --project <novel_project_dir> [--store <file>]
+
+Options:
+  --project <dir>   Novel project directory (must contain evaluations/)
+  --store <file>    Store path (default: <project>/logs/eval-store.sqlite)
+USAGE
+}
+
+project_dir=""
+store_path=""
+
+while [ "$#" -gt 0 ]; do
+  case "$1" in
+    --project)
+      [ "$#" -ge 2 ] || { echo "eval-store.sh: error: --project requires a value" >&2; exit 1; }
+      project_dir="$2"
+      shift 2
+      ;;
+    --store)
+      [ "$#" -ge 2 ] || { echo "eval-store.sh: error: --store requires a value" >&2; exit 1; }
+      store_path="$2"
+      shift 2
+      ;;
+    -h|--help)
+      usage
+      exit 0
+      ;;
+    *)
+      echo "eval-store.sh: unknown arg: $1" >&2
+      usage
+      exit 1
+      ;;
+  esac
+done
+
+if [ -z "$project_dir" ]; then
+  usage
+  exit 1
+fi
+
+if [ ! -d "$project_dir" ]; then
+  echo "eval-store.sh: project dir not found: $project_dir" >&2
+  exit 1
+fi
+
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "eval-store.sh: python3 is required but not found" >&2
+  exit 1
+fi
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+python3 "$SCRIPT_DIR/lib/eval_store.py" "$project_dir" "$store_path"
@@ -0,0 +1,327 @@
+"""Bootstrap confidence intervals and gate-threshold sweeps for calibration.
+
+Imported by calibrate_quality_judge.py (--bootstrap).
+
+Scores are discrete (labels and judges emit one or two decimals), so the
+sample is compressed to its distinct (human, judge) pairs with a count each;
+a resample is just a new count vector over those pairs, and every statistic
+is a weighted sum over a few hundred pairs instead of n chapters.
+
+Resamples run in fixed-size chunks, each with its own RNG seeded from
+(seed, chunk index), so results are reproducible for a given --seed and do
+not depend on --jobs; chunks fan out across a process pool.  With NumPy
+(see _calib_stats.numpy_enabled) a chunk draws its count vectors as one
+multinomial matrix and evaluates them with matrix products; the pure-Python
+path draws chapters with random.choices.  The two RNG streams differ, so
+CIs agree statistically, not digit for digit, across the two paths; the
+report records which one ran ("rng"), and a --seed reproduces a report only
+under the same rng.
+"""
+
+import math
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import _calib_stats
+from _calib_stats import np
+
+# Resamples per pool task; part of the seeding scheme, so changing it changes results.
+_CHUNK = 250
+SWEEP_RADIUS = 0.5
+SWEEP_STEP = 0.05
+CONFIDENCE = 0.95
+
+# Highest band first; below the last threshold is pause_for_user_force_rewrite.
+GATE_ORDER = ["pass", "polish", "revise", "pause_for_user"]
+
+Pairs = List[Tuple[float, float]]
+
+
+def gate_band(score: float, thresholds: Dict[str, float]) -> int:
+    """Index into GATE_ORDER of the band *score* falls in (len(GATE_ORDER) = below every threshold)."""
+    for i, name in enumerate(GATE_ORDER):
+        if score >= thresholds[name]:
+            return i
+    return len(GATE_ORDER)
+
+
+def sweep_candidates(defaults: Dict[str, float]) -> Dict[str, List[float]]:
+    """Candidate judge thresholds per gate: default +/- SWEEP_RADIUS in SWEEP_STEP steps, within [1, 5]."""
+    steps = int(round(SWEEP_RADIUS / SWEEP_STEP))
+    out: Dict[str, List[float]] = {}
+    for name in GATE_ORDER:
+        values = {round(defaults[name] + i * SWEEP_STEP, 6) for i in range(-steps, steps + 1)}
+        out[name] = sorted(v for v in values if 1.0 <= v <= 5.0)
+    return out
+
+
+class _Sample:
+    """Distinct (human, judge) pairs plus everything the sweep needs per pair."""
+
+    def __init__(self, human: Sequence[float], judge: Sequence[float], defaults: Dict[str, float]) -> None:
+        ids: Dict[Tuple[float, float], int] = {}
+        self.item_pair: List[int] = []
+        for h, j in zip(human, judge):
+            self.item_pair.append(ids.setdefault((float(h), float(j)), len(ids)))
+        self.pairs: Pairs = list(ids)
+        self.defaults = defaults
+        self.candidates = sweep_candidates(defaults)
+        # Per gate: is the human at/above the default threshold, and how many candidates the judge clears.
+        self.human_ok = {k: [h >= defaults[k] for h, _ in self.pairs] for k in GATE_ORDER}
+        self.cleared = {k: [sum(1 for c in self.candidates[k] if j >= c) for _, j in self.pairs] for k in GATE_ORDER}
+        self.band_match = [gate_band(h, defaults) == gate_band(j, defaults) for h, j in self.pairs]
+
+    def full_counts(self) -> List[int]:
+        counts = [0] * len(self.pairs)
+        for p in self.item_pair:
+            counts[p] += 1
+        return counts
+
+
+def weighted_fit(pairs: Pairs, counts: Sequence[int]) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """(pearson_r, slope, intercept) of human ~ judge over weighted pairs (two-pass, like _calib_stats)."""
+    n = sum(counts)
+    if n < 2:
+        return None, None, None
+    mean_h = sum(c * h for (h, _), c in zip(pairs, counts)) / n
+    mean_j = sum(c * j for (_, j), c in zip(pairs, counts)) / n
+    shh = sjj = shj = 0.0
+    for (h, j), c in zip(pairs, counts):
+        if not c:
+            continue
+        dh = h - mean_h
+        dj = j - mean_j
+        shh += c * dh * dh
+        sjj += c * dj * dj
+        shj += c * dh * dj
+    if sjj <= 0.0:
+        return None, None, None
+    slope = shj / sjj
+    r = shj / math.sqrt(shh * sjj) if shh > 0.0 else None
+    return r, slope, mean_h - slope * mean_j
+
+
+def sweep(sample: _Sample, counts: Sequence[int]) -> Dict[str, List[Tuple[int, int, int]]]:
+    """Per gate and candidate: (agree, false_pass, false_block) counts.
+
+    false_pass: judge clears the candidate but the human score is below the default threshold;
+    false_block: the reverse.
+    """
+    out: Dict[str, List[Tuple[int, int, int]]] = {}
+    for name in GATE_ORDER:
+        m = len(sample.candidates[name])
+        # hist_ok[x] / hist_low[x]: weight of pairs clearing exactly x candidates, by human side.
+        hist_ok = [0] * (m + 1)
+        hist_low = [0] * (m + 1)
+        for ok, cleared, c in zip(sample.human_ok[name], sample.cleared[name], counts):
+            if c:
+                if ok:
+                    hist_ok[cleared] += c
+                else:
+                    hist_low[cleared] += c
+        total_ok = sum(hist_ok)
+        total_low = sum(hist_low)
+        rows: List[Tuple[int, int, int]] = []
+        ok_below = 0  # human ok, judge below candidate i (clears <= i candidates)
+        low_below = 0
+        for i in range(m):
+            ok_below += hist_ok[i]
+            low_below += hist_low[i]
+            ok_above = total_ok - ok_below
+            low_above = total_low - low_below
+            rows.append((ok_above + low_below, low_above, ok_below))
+        out[name] = rows
+    return out
+
+
+def best_index(sample: _Sample, name: str, rows: List[Tuple[int, int, int]]) -> int:
+    """Most agreeing candidate; ties go to the one closest to the default, then the lower one."""
+    default = sample.defaults[name]
+    cands = sample.candidates[name]
+    return min(range(len(rows)), key=lambda i: (-rows[i][0], abs(cands[i] - default), cands[i]))
+
+
+def _resample_chunk(sample: _Sample, seed: int, chunk: int, size: int) -> List[Dict[str, Any]]:
+    """*size* resamples; runs in pool workers."""
+    rnd = random.Random(f"calibrate-bootstrap:{seed}:{chunk}")
+    n = len(sample.item_pair)
+    out: List[Dict[str, Any]] = []
+    for _ in range(size):
+        drawn = Counter(rnd.choices(sample.item_pair, k=n))
+        counts = [drawn.get(p, 0) for p in range(len(sample.pairs))]
+        r, slope, intercept = weighted_fit(sample.pairs, counts)
+        rows = sweep(sample, counts)
+        res: Dict[str, Any] = {
+            "pearson_r": r,
+            "slope": slope,
+            "intercept": intercept,
+            "gate_agreement": sum(c for c, match in zip(counts, sample.band_match) if match) / n,
+            "best": {},
+            "agreement_at_default": {},
+        }
+        for name in GATE_ORDER:
+            cands = sample.candidates[name]
+            res["best"][name] = cands[best_index(sample, name, rows[name])]
+            res["agreement_at_default"][name] = rows[name][cands.index(sample.defaults[name])][0] / n
+        out.append(res)
+    return out
+
+
+def _resample_chunk_numpy(sample: _Sample, seed: int, chunk: int, size: int) -> List[Dict[str, Any]]:
+    """Same as _resample_chunk, vectorized over the chunk's resamples."""
+    rng = np.random.default_rng([seed, chunk])
+    full = np.array(sample.full_counts(), dtype=np.float64)
+    n = float(full.sum())
+    counts = rng.multinomial(int(n), full / n, size=size).astype(np.float64)  # (size, pairs)
+    h = np.array([p[0] for p in sample.pairs])
+    j = np.array([p[1] for p in sample.pairs])
+
+    mean_h = counts @ h / n
+    mean_j = counts @ j / n
+    dh = h[None, :] - mean_h[:, None]
+    dj = j[None, :] - mean_j[:, None]
+    shh = (counts * dh * dh).sum(axis=1)
+    sjj = (counts * dj * dj).sum(axis=1)
+    shj = (counts * dh * dj).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = shj / sjj
+        r = shj / np.sqrt(shh * sjj)
+    intercept = mean_h - slope * mean_j
+    has_fit = sjj > 0.0
+    has_r = has_fit & (shh > 0.0)
+    gate_agreement = counts @ np.array(sample.band_match, dtype=np.float64) / n
+
+    best: Dict[str, Any] = {}
+    at_default: Dict[str, Any] = {}
+    for name in GATE_ORDER:
+        cands = sample.candidates[name]
+        cleared = np.array(sample.cleared[name])
+        ok = np.array(sample.human_ok[name])
+        above = cleared[:, None] > np.arange(len(cands))[None, :]  # (pairs, candidates)
+        agree = counts @ (above == ok[:, None]).astype(np.float64)  # (size, candidates)
+        # Columns in tie-break preference order, so argmax's first maximum is best_index().
+        pref = sorted(range(len(cands)), key=lambda i: (abs(cands[i] - sample.defaults[name]), cands[i]))
+        best[name] = [cands[pref[i]] for i in np.argmax(agree[:, pref], axis=1)]
+        at_default[name] = agree[:, cands.index(sample.defaults[name])] / n
+
+    return [
+        {
+            "pearson_r": float(r[i]) if has_r[i] else None,
+            "slope": float(slope[i]) if has_fit[i] else None,
+            "intercept": float(intercept[i]) if has_fit[i] else None,
+            "gate_agreement": float(gate_agreement[i]),
+            "best": {name: best[name][i] for name in GATE_ORDER},
+            "agreement_at_default": {name: float(at_default[name][i]) for name in GATE_ORDER},
+        }
+        for i in range(size)
+    ]
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    # Linear interpolation between closest ranks (numpy's default method).
+    pos = q * (len(sorted_values) - 1)
+    lo = int(math.floor(pos))
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _interval(values: List[Optional[float]], estimate: Optional[float], ndigits: int) -> Dict[str, Any]:
+    vals = sorted(v for v in values if v is not None)
+    out: Dict[str, Any] = {"estimate": None if estimate is None else round(estimate, ndigits), "valid_resamples": len(vals)}
+    if len(vals) < 2:
+        out.update({"ci": None, "std_error": None})
+        return out
+    alpha = (1.0 - CONFIDENCE) / 2.0
+    mean = sum(vals) / len(vals)
+    std = math.sqrt(sum((v - mean) ** 2 for v in vals) / (len(vals) - 1))
+    out["ci"] = [round(_quantile(vals, alpha), ndigits), round(_quantile(vals, 1.0 - alpha), ndigits)]
+    out["std_error"] = round(std, ndigits)
+    return out
+
+
+def bootstrap_report(
+    human: Sequence[float], judge: Sequence[float], defaults: Dict[str, float], resamples: int, seed: int, jobs: int
+) -> Dict[str, Any]:
+    """"bootstrap" (CIs for r / slope / intercept / gate agreement) and "threshold_sweep" report sections."""
+    sample = _Sample(human, judge, defaults)
+    n = len(sample.item_pair)
+
+    sizes = [min(_CHUNK, resamples - start) for start in range(0, resamples, _CHUNK)]
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(sizes))
+    use_numpy = _calib_stats.numpy_enabled()
+    resample = _resample_chunk_numpy if use_numpy else _resample_chunk
+    results: List[Dict[str, Any]] = []
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            k = len(sizes)
+            for part in pool.map(resample, [sample] * k, [seed] * k, range(k), sizes):
+                results.extend(part)
+    else:
+        for chunk, size in enumerate(sizes):
+            results.extend(resample(sample, seed, chunk, size))
+
+    full = sample.full_counts()
+    r, slope, intercept = weighted_fit(sample.pairs, full)
+    full_rows = sweep(sample, full)
+    gate_default = sum(c for c, match in zip(full, sample.band_match) if match) / n
+
+    best_thresholds: Dict[str, float] = {}
+    thresholds: Dict[str, Any] = {}
+    for name in GATE_ORDER:
+        cands = sample.candidates[name]
+        rows = full_rows[name]
+        best = best_index(sample, name, rows)
+        default_i = cands.index(defaults[name])
+        best_thresholds[name] = cands[best]
+        thresholds[name] = {
+            "default": defaults[name],
+            "best": cands[best],
+            "best_ci": _interval([res["best"][name] for res in results], cands[best], 3)["ci"],
+            "agreement_at_default": round(rows[default_i][0] / n, 4),
+            "agreement_at_default_ci": _interval([res["agreement_at_default"][name] for res in results], None, 4)["ci"],
+            "agreement_at_best": round(rows[best][0] / n, 4),
+            "candidates": [
+                {
+                    "threshold": c,
+                    "agreement": round(agree / n, 4),
+                    "false_pass": round(false_pass / n, 4),
+                    "false_block": round(false_block / n, 4),
+                }
+                for c, (agree, false_pass, false_block) in zip(cands, rows)
+            ],
+        }
+
+    # Whole-gate agreement with every swept best applied at once (bands stay ordered by sorting).
+    ordered = dict(zip(GATE_ORDER, sorted(best_thresholds.values(), reverse=True)))
+    gate_best = sum(c for (h, j), c in zip(sample.pairs, full) if gate_band(h, defaults) == gate_band(j, ordered)) / n
+
+    return {
+        "bootstrap": {
+            "resamples": resamples,
+            "seed": seed,
+            # Resampling stream: the same seed gives different draws under each.
+            "rng": "numpy" if use_numpy else "python",
+            "confidence": CONFIDENCE,
+            "method": "percentile",
+            "pearson_r": _interval([res["pearson_r"] for res in results], r, 4),
+            "slope": _interval([res["slope"] for res in results], slope, 6),
+            "intercept": _interval([res["intercept"] for res in results], intercept, 6),
+            "gate_agreement_at_defaults": _interval([res["gate_agreement"] for res in results], gate_default, 4),
+        },
+        "threshold_sweep": {
+            "radius": SWEEP_RADIUS,
+            "step": SWEEP_STEP,
+            "note": "human 按默认阈值分档；judge 按候选阈值分档。agreement = 两侧同在阈值上/下的章节占比；best_ci 为 bootstrap 最优阈值的置信区间，默认值落在区间内时不建议调整。",
+            "thresholds": thresholds,
+            "gate_agreement": {
+                "defaults": round(gate_default, 4),
+                "best": round(gate_best, 4),
+                "best_thresholds": ordered,
+            },
+        },
+    }
@@ -0,0 +1,148 @@
+"""Agreement statistics between human and judge scores.
+
+Imported by calibrate_quality_judge.py.
+
+A calibration group (overall, or one dimension) is a pair of equal-length
+score lists (human, judge).  group_stats() computes every group at once:
+with NumPy available the pairs are packed into one contiguous array tagged
+by group index and each statistic is a single grouped reduction
+(np.bincount) over all groups; without NumPy (or with
+NOVEL_CALIBRATE_NUMPY=0) the pure-Python loops run group by group.  Both
+paths use the same two-pass formulas and agree to 1e-9.
+"""
+
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+Groups = Dict[str, Tuple[Sequence[float], Sequence[float]]]
+Stats = Dict[str, Optional[float]]
+
+
+def numpy_enabled() -> bool:
+    return np is not None and os.environ.get("NOVEL_CALIBRATE_NUMPY", "1") != "0"
+
+
+def pearson(x: Sequence[float], y: Sequence[float]) -> Optional[float]:
+    if len(x) != len(y) or len(x) < 2:
+        return None
+    mean_x = sum(x) / len(x)
+    mean_y = sum(y) / len(y)
+    num = 0.0
+    den_x = 0.0
+    den_y = 0.0
+    for a, b in zip(x, y):
+        dx = a - mean_x
+        dy = b - mean_y
+        num += dx * dy
+        den_x += dx * dx
+        den_y += dy * dy
+    if den_x <= 0.0 or den_y <= 0.0:
+        return None
+    return num / math.sqrt(den_x * den_y)
+
+
+def linear_fit(x: Sequence[float], y: Sequence[float]) -> Optional[Dict[str, float]]:
+    if len(x) != len(y) or len(x) < 2:
+        return None
+    mean_x = sum(x) / len(x)
+    mean_y = sum(y) / len(y)
+    sxx = 0.0
+    sxy = 0.0
+    for a, b in zip(x, y):
+        dx = a - mean_x
+        sxx += dx * dx
+        sxy += dx * (b - mean_y)
+    if sxx <= 0.0:
+        return None
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+    return {"slope": slope, "intercept": intercept}
+
+
+def _python_stats(human: Sequence[float], judge: Sequence[float]) -> Stats:
+    n = len(human)
+    fit = linear_fit(judge, human)  # human ~ slope * judge + intercept
+    errors = [j - h for h, j in zip(human, judge)]
+    residual_rmse = None
+    if fit is not None:
+        slope, intercept = fit["slope"], fit["intercept"]
+        residual_rmse = math.sqrt(sum((h - (slope * j + intercept)) ** 2 for h, j in zip(human, judge)) / n)
+    return {
+        "n": n,
+        "pearson_r": pearson(human, judge),
+        "slope": None if fit is None else fit["slope"],
+        "intercept": None if fit is None else fit["intercept"],
+        "human_mean": sum(human) / n,
+        "judge_mean": sum(judge) / n,
+        "mae": sum(abs(e) for e in errors) / n,
+        "rmse": math.sqrt(sum(e * e for e in errors) / n),
+        "bias": sum(errors) / n,
+        "residual_rmse": residual_rmse,
+    }
+
+
+def _numpy_stats(keys: List[str], groups: Groups) -> Dict[str, Stats]:
+    sizes = np.array([len(groups[k][0]) for k in keys], dtype=np.int64)
+    total = int(sizes.sum())
+    human = np.fromiter((v for k in keys for v in groups[k][0]), dtype=np.float64, count=total)
+    judge = np.fromiter((v for k in keys for v in groups[k][1]), dtype=np.float64, count=total)
+    gid = np.repeat(np.arange(len(keys)), sizes)
+
+    def gsum(values: "np.ndarray") -> "np.ndarray":
+        return np.bincount(gid, weights=values, minlength=len(keys))
+
+    n = sizes.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_h = gsum(human) / n
+        mean_j = gsum(judge) / n
+        dh = human - mean_h[gid]
+        dj = judge - mean_j[gid]
+        shh = gsum(dh * dh)
+        sjj = gsum(dj * dj)
+        shj = gsum(dh * dj)
+        r = shj / np.sqrt(shh * sjj)
+        slope = shj / sjj
+        intercept = mean_h - slope * mean_j
+        residual = human - (slope[gid] * judge + intercept[gid])
+        residual_rmse = np.sqrt(gsum(residual * residual) / n)
+        errors = judge - human
+        mae = gsum(np.abs(errors)) / n
+        rmse = np.sqrt(gsum(errors * errors) / n)
+        bias = gsum(errors) / n
+
+    out: Dict[str, Stats] = {}
+    for i, key in enumerate(keys):
+        has_r = sizes[i] >= 2 and shh[i] > 0.0 and sjj[i] > 0.0
+        has_fit = sizes[i] >= 2 and sjj[i] > 0.0
+        out[key] = {
+            "n": int(sizes[i]),
+            "pearson_r": float(r[i]) if has_r else None,
+            "slope": float(slope[i]) if has_fit else None,
+            "intercept": float(intercept[i]) if has_fit else None,
+            "human_mean": float(mean_h[i]),
+            "judge_mean": float(mean_j[i]),
+            "mae": float(mae[i]),
+            "rmse": float(rmse[i]),
+            "bias": float(bias[i]),
+            "residual_rmse": float(residual_rmse[i]) if has_fit else None,
+        }
+    return out
+
+
+def group_stats(groups: Groups) -> Dict[str, Stats]:
+    """Per group: n, pearson_r, slope/intercept (human ~ judge), means, mae/rmse/bias (judge - human), residual_rmse.
+
+    Groups must be non-empty; pearson_r / fit fields are None when undefined (n < 2 or zero variance).
+    """
+    keys = sorted(groups)
+    if not keys:
+        return {}
+    if numpy_enabled():
+        return _numpy_stats(keys, groups)
+    return {k: _python_stats(*groups[k]) for k in keys}
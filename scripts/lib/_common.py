@@ -1,6 +1,7 @@
 """Shared utilities for M3 evaluation/regression scripts.
 
-Imported by calibrate_quality_judge.py, run_regression.py, compare_regression_runs.py.
+Imported by calibrate_quality_judge.py, run_regression.py, compare_regression_runs.py,
+eval_store.py.
 """
 
 import json
@@ -8,6 +9,7 @@ import math
 import os
 import re
 import sys
+import tempfile
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
@@ -51,10 +53,36 @@ def as_str(value: Any) -> Optional[str]:
     return None
 
 
+def write_json_atomic(path: str, obj: Any) -> None:
+    """Write *obj* as JSON to *path* via a temp file + os.replace (directories created)."""
+    out_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix=".tmp-", suffix=".json")
+    try:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(obj, ensure_ascii=False, sort_keys=True) + "\n")
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 def iso_utc_now() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+def timestamp_id() -> str:
+    """Run id used for archived run dirs, e.g. 20260101T120000_1234Z."""
+    now = datetime.now(timezone.utc)
+    return now.strftime("%Y%m%dT%H%M%S") + f"_{now.strftime('%f')[:4]}Z"
+
+
 # ---------------------------------------------------------------------------
 # Eval-object extraction (QualityJudge output format)
 # ---------------------------------------------------------------------------
@@ -64,25 +92,60 @@ def extract_eval_used(eval_obj: Dict[str, Any]) -> Dict[str, Any]:
     return maybe if isinstance(maybe, dict) else eval_obj
 
 
-def extract_overall(eval_obj: Dict[str, Any]) -> Optional[float]:
-    """Extract overall/overall_final with fallback chain."""
-    for v in [
-        eval_obj.get("overall_final"),
-        extract_eval_used(eval_obj).get("overall_final"),
-        extract_eval_used(eval_obj).get("overall"),
-        eval_obj.get("overall"),
+def _overall_with_source(eval_obj: Dict[str, Any]) -> Tuple[Optional[float], Optional[str]]:
+    """The overall score's fallback chain: (score, field it came from), or (None, None)."""
+    used = extract_eval_used(eval_obj)
+    for source, v in [
+        ("overall_final", eval_obj.get("overall_final")),
+        ("eval_used.overall_final", used.get("overall_final")),
+        ("eval_used.overall", used.get("overall")),
+        ("overall", eval_obj.get("overall")),
     ]:
         n = as_float(v)
         if n is not None:
-            return n
+            return (n, source)
     meta = eval_obj.get("metadata")
     if isinstance(meta, dict):
         judges = meta.get("judges")
         if isinstance(judges, dict):
             n = as_float(judges.get("overall_final"))
             if n is not None:
-                return n
-    return None
+                return (n, "metadata.judges.overall_final")
+    return (None, None)
+
+
+def extract_overall(eval_obj: Dict[str, Any]) -> Optional[float]:
+    """Extract overall/overall_final with fallback chain."""
+    return _overall_with_source(eval_obj)[0]
+
+
+def extract_overall_source(eval_obj: Dict[str, Any]) -> Optional[str]:
+    """Which field extract_overall() reads, e.g. "eval_used.overall"; None when it finds none."""
+    return _overall_with_source(eval_obj)[1]
+
+
+def extract_judge_sources(eval_obj: Dict[str, Any]) -> Dict[str, float]:
+    """Every judge overall score in one eval: the resolved overall_final, eval_used.overall and
+    each metadata.judges.<role> (keyed "judges.<role>[<model>]" when the model is recorded)."""
+    out: Dict[str, float] = {}
+    resolved = extract_overall(eval_obj)
+    if resolved is not None:
+        out["overall_final"] = float(resolved)
+    used = as_float(extract_eval_used(eval_obj).get("overall"))
+    if used is not None:
+        out["eval_used"] = float(used)
+    meta = eval_obj.get("metadata")
+    judges = meta.get("judges") if isinstance(meta, dict) else None
+    if isinstance(judges, dict):
+        for role, judge in sorted(judges.items()):
+            if not isinstance(judge, dict):
+                continue
+            score = as_float(judge.get("overall"))
+            if score is None:
+                continue
+            model = as_str(judge.get("model"))
+            out[f"judges.{role}[{model}]" if model else f"judges.{role}"] = float(score)
+    return out
 
 
 def extract_dimension_scores(eval_obj: Dict[str, Any]) -> Dict[str, float]:
@@ -114,6 +177,53 @@ def extract_contract_verification(eval_obj: Dict[str, Any]) -> Dict[str, Any]:
     return {}
 
 
+CHECK_LAYERS = [("L1", "l1_checks"), ("L2", "l2_checks"), ("L3", "l3_checks"), ("LS", "ls_checks")]
+
+
+def _check_rule_id(layer: str, item: Dict[str, Any]) -> str:
+    if layer == "L2":
+        return as_str(item.get("contract_id")) or as_str(item.get("rule_id")) or "UNKNOWN"
+    if layer == "L3":
+        return as_str(item.get("objective_id")) or as_str(item.get("rule_id")) or "UNKNOWN"
+    return as_str(item.get("rule_id")) or "UNKNOWN"
+
+
+def _check_confidence(value: Any) -> str:
+    s = as_str(value)
+    if not s:
+        return "unknown"
+    s = s.lower()
+    return s if s in {"high", "medium", "low"} else "unknown"
+
+
+def extract_check_rows(eval_obj: Dict[str, Any]) -> List[Tuple[str, str, str, str, Optional[str]]]:
+    """Flattened contract_verification checks: (layer, rule_id, status, confidence, constraint_type).
+
+    status is lower-cased ("unknown" when missing), confidence is high/medium/low/unknown,
+    rule_id falls back to contract_id (L2) / objective_id (L3) and then "UNKNOWN".
+    """
+    cv = extract_contract_verification(eval_obj)
+    rows: List[Tuple[str, str, str, str, Optional[str]]] = []
+    for layer, field in CHECK_LAYERS:
+        checks = cv.get(field)
+        if not isinstance(checks, list):
+            continue
+        for it in checks:
+            if not isinstance(it, dict):
+                continue
+            status = as_str(it.get("status"))
+            rows.append(
+                (
+                    layer,
+                    _check_rule_id(layer, it),
+                    status.lower() if status else "unknown",
+                    _check_confidence(it.get("confidence")),
+                    as_str(it.get("constraint_type")),
+                )
+            )
+    return rows
+
+
 # ---------------------------------------------------------------------------
 # File discovery
 # ---------------------------------------------------------------------------
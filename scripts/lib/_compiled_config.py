@@ -0,0 +1,73 @@
+"""Content-hash keyed cache of compiled lint configs.
+
+Imported by lint_blacklist.py and lint_cliche.py (and query_foreshadow.py,
+which keeps its SQLite foreshadowing index in the same cache dir).
+
+Configs such as ai-blacklist.json change rarely while chapters are linted
+constantly, so the compiled form (effective word list, severity/category
+index, prebuilt PhraseMatcher) is pickled under the cache dir and reused
+until the config bytes change.
+
+Cache dir: $NOVEL_LINT_CACHE_DIR, else ${XDG_CACHE_HOME:-~/.cache}/novel/lint.
+Set NOVEL_LINT_CACHE_DIR to an empty string to disable caching.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Optional
+
+# Bump when PhraseMatcher internals or any compiled layout changes.
+_FORMAT_VERSION = 1
+
+
+def cache_dir() -> Optional[str]:
+    env = os.environ.get("NOVEL_LINT_CACHE_DIR")
+    if env is not None:
+        return env or None
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "novel", "lint")
+
+
+def config_key(kind: str, raw: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(f"{kind}\0{_FORMAT_VERSION}\0".encode("utf-8"))
+    h.update(raw)
+    return h.hexdigest()
+
+
+def load_compiled(kind: str, raw: bytes, build: Callable[[], Any]) -> Any:
+    """Return the compiled form of config bytes *raw*, building (and caching) it on a miss.
+
+    *kind* namespaces the cache (include a version suffix, e.g. "blacklist-v1").
+    Cache read/write failures are never fatal: the config is simply rebuilt.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return build()
+
+    key = config_key(kind, raw)
+    path = os.path.join(directory, f"{kind}-{key[:32]}.pickle")
+    try:
+        with open(path, "rb") as f:
+            obj = pickle.load(f)
+        if isinstance(obj, dict) and obj.get("key") == key:
+            return obj["compiled"]
+    except Exception:
+        pass
+
+    compiled = build()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".pickle")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"key": key, "compiled": compiled}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    except Exception:
+        pass
+    return compiled
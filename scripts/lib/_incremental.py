@@ -0,0 +1,147 @@
+"""Paragraph-level incremental re-lint shared by the lint scripts (--incremental).
+
+Imported by lint_blacklist.py, lint_cliche.py and lint_readability.py.
+
+A state file keeps per-paragraph partial results keyed by a hash of the
+paragraph (plus whatever else the partial depends on, e.g. exemption masks).
+On the next run only paragraphs whose hash is not in the state are linted;
+the report is then rebuilt from the partials, so it is identical to a full
+lint.  The state is keyed by linter kind and config content hash and is
+silently rebuilt when either changes.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import _common
+from _phrase_matcher import LineIndex, PhraseMatcher
+
+_STATE_SCHEMA_VERSION = 1
+
+
+def segment_key(*parts: str) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def load_state(path: str, kind: str, config_key: str) -> Dict[str, Any]:
+    """Per-paragraph entries from *path*; empty when missing, unreadable or for another config."""
+    try:
+        obj = _common.load_json(path, missing_ok=True)
+    except Exception:
+        return {}
+    if (
+        not isinstance(obj, dict)
+        or obj.get("schema_version") != _STATE_SCHEMA_VERSION
+        or obj.get("kind") != kind
+        or obj.get("config_key") != config_key
+        or not isinstance(obj.get("paragraphs"), dict)
+    ):
+        return {}
+    return obj["paragraphs"]
+
+
+def save_state(path: str, kind: str, config_key: str, entries: Dict[str, Any]) -> None:
+    _common.write_json_atomic(
+        path,
+        {"schema_version": _STATE_SCHEMA_VERSION, "kind": kind, "config_key": config_key, "paragraphs": entries},
+    )
+
+
+def split_segments(text: str) -> List[str]:
+    """Split *text* into paragraph blocks at line boundaries; each blank line closes a block.
+
+    "".join(split_segments(text)) == text, and every block's splitlines() are
+    exactly the corresponding lines of text.splitlines().  The phrase linters
+    use this rather than lint_readability's _extract_paragraphs(), which
+    strips code fences, normalizes line endings and drops blank lines: its
+    paragraphs neither cover everything a full scan matches nor map back to
+    the original line numbers used as evidence.
+    """
+    segments: List[str] = []
+    buf: List[str] = []
+    for line in text.splitlines(True):
+        buf.append(line)
+        if not line.strip():
+            segments.append("".join(buf))
+            buf = []
+    if buf:
+        segments.append("".join(buf))
+    return segments
+
+
+def phrases_are_single_line(phrases: List[str]) -> bool:
+    """Segment-local matching is exact only when no phrase can span a line break."""
+    return all(p.splitlines() == [p] for p in phrases)
+
+
+def phrase_partial(matcher: PhraseMatcher, segment: str, masked: Optional[bytearray]) -> Dict[str, Any]:
+    """Counts + local evidence for every phrase occurring in *segment* (claimed or not)."""
+    counts, found = matcher.scan(segment, masked)
+    line_index = LineIndex(segment)
+    words: Dict[str, Any] = {}
+    for idx, starts in enumerate(found):
+        if not starts:
+            continue
+        lines, snippets = line_index.evidence(starts, len(matcher.phrases[idx]))
+        words[str(idx)] = [counts[idx], lines, snippets]
+    return {
+        "lines": len(segment.splitlines()),
+        "chars": len(re.sub(r"\s+", "", segment)),
+        "words": words,
+    }
+
+
+def merge_phrase_partials(
+    partials: List[Dict[str, Any]], n_phrases: int, max_lines: int = 20, max_snippets: int = 5
+) -> Tuple[int, List[int], Dict[int, Tuple[List[int], List[str]]]]:
+    """(non-ws chars, counts per phrase, evidence per phrase) for the concatenated segments."""
+    chars = 0
+    counts = [0] * n_phrases
+    evidence: Dict[int, Tuple[List[int], List[str]]] = {}
+    line_offset = 0
+    for partial in partials:
+        chars += partial["chars"]
+        for key, (count, lines, snippets) in partial["words"].items():
+            idx = int(key)
+            counts[idx] += count
+            all_lines, all_snippets = evidence.setdefault(idx, ([], []))
+            if len(all_lines) < max_lines:
+                all_lines.extend(line_offset + n for n in lines[: max_lines - len(all_lines)])
+            if len(all_snippets) < max_snippets:
+                all_snippets.extend(snippets[: max_snippets - len(all_snippets)])
+        line_offset += partial["lines"]
+    return chars, counts, evidence
+
+
+def null_mask(masked_text: str) -> bytearray:
+    """Positions blanked to NUL in *masked_text* (exemption masking) as a PhraseMatcher mask."""
+    masked = bytearray(len(masked_text))
+    for m in re.finditer(r"\x00+", masked_text):
+        masked[m.start() : m.end()] = b"\x01" * (m.end() - m.start())
+    return masked
+
+
+def collect_phrase_partials(
+    matcher: PhraseMatcher,
+    segments: List[str],
+    masked_segments: Optional[List[str]],
+    entries: Dict[str, Any],
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Partials for *segments* (reusing *entries*) and the entries to persist for the next run."""
+    partials: List[Dict[str, Any]] = []
+    new_entries: Dict[str, Any] = {}
+    for i, segment in enumerate(segments):
+        masked_text = masked_segments[i] if masked_segments is not None else ""
+        key = segment_key(segment, masked_text)
+        partial = entries.get(key)
+        if partial is None:
+            masked = null_mask(masked_text) if masked_segments is not None else None
+            partial = phrase_partial(matcher, segment, masked)
+        new_entries[key] = partial
+        partials.append(partial)
+    return partials, new_entries
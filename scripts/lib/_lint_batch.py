@@ -0,0 +1,116 @@
+"""Multi-chapter batch mode shared by the deterministic lint scripts.
+
+Imported by lint_blacklist.py, lint_cliche.py and lint_readability.py.
+
+A batch run loads (compiles) the config once, lints every chapter with it,
+and streams one per-chapter report per line (JSONL, same objects as the
+single-chapter mode) in chapter order.  The final line is the volume-level
+aggregate, tagged with "type": "volume_aggregate".
+
+With jobs > 1 the compiled config is shipped to each pool worker once (via
+the pool initializer) and chapters are linted in parallel; reports are still
+emitted in input order.
+"""
+
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_CHAPTER_FILE_RE = re.compile(r"^chapter-(\d+)\.md$")
+
+# Pool-worker state, set once per worker by _init_worker().
+_WORKER: Dict[str, Any] = {}
+
+
+def chapter_no_from_path(path: str) -> Optional[int]:
+    m = re.search(r"chapter-(\d+)", os.path.basename(path))
+    if not m:
+        return None
+    return int(m.group(1))
+
+
+def expand_chapters(args: List[str]) -> List[str]:
+    """Chapter files from file/dir args.  Dirs contribute chapter-NNN.md sorted by number."""
+    out: List[str] = []
+    seen = set()
+    for arg in args:
+        if os.path.isdir(arg):
+            found: List[Tuple[int, str]] = []
+            for name in os.listdir(arg):
+                m = _CHAPTER_FILE_RE.match(name)
+                if m:
+                    found.append((int(m.group(1)), name))
+            found.sort()
+            candidates = [os.path.join(arg, name) for _, name in found]
+        else:
+            candidates = [arg]
+        for path in candidates:
+            key = os.path.abspath(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            out.append(path)
+    return out
+
+
+def _init_worker(lint_one: Callable[[Any, str], Dict[str, Any]], compiled: Any) -> None:
+    _WORKER["lint_one"] = lint_one
+    _WORKER["compiled"] = compiled
+
+
+def _lint_in_worker(path: str) -> Dict[str, Any]:
+    return _WORKER["lint_one"](_WORKER["compiled"], path)
+
+
+def lint_chapters(
+    lint_one: Callable[[Any, str], Dict[str, Any]],
+    compiled: Any,
+    paths: List[str],
+    jobs: int,
+) -> Iterator[Dict[str, Any]]:
+    """Yield lint_one(compiled, path) for every path, in order.
+
+    *lint_one* must be a module-level function so it can be sent to pool workers.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(paths))
+    if jobs <= 1:
+        for path in paths:
+            yield lint_one(compiled, path)
+        return
+
+    # Small chunks keep the output streaming while amortizing IPC.
+    chunksize = max(1, min(16, len(paths) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(lint_one, compiled)) as pool:
+        yield from pool.map(_lint_in_worker, paths, chunksize=chunksize)
+
+
+def run_batch(
+    reports: Iterable[Dict[str, Any]],
+    dumps: Callable[[Dict[str, Any]], str],
+    add: Callable[[Dict[str, Any], Dict[str, Any]], None],
+    agg: Dict[str, Any],
+    finish: Callable[[Dict[str, Any]], Dict[str, Any]],
+) -> None:
+    """Stream each report as a JSONL line, folding it into *agg*; then emit the aggregate line."""
+    for report in reports:
+        add(agg, report)
+        sys.stdout.write(dumps(report) + "\n")
+        sys.stdout.flush()
+    summary = {"type": "volume_aggregate", **finish(agg)}
+    sys.stdout.write(json.dumps(summary, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+def per_kchars(n: int, chars: int) -> float:
+    if chars <= 0:
+        return 0.0
+    return round(float(n) / (chars / 1000.0), 3)
+
+
+def top_words(word_counts: Dict[str, int], word_chapters: Dict[str, int], limit: int = 20) -> List[Dict[str, Any]]:
+    ranked = sorted(word_counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [{"word": w, "count": n, "chapters": word_chapters.get(w, 0)} for w, n in ranked[:limit]]
@@ -0,0 +1,164 @@
+"""Aho–Corasick phrase matcher shared by the deterministic lint scripts.
+
+Imported by lint_blacklist.py and lint_cliche.py.
+
+The linters historically counted hits with a "longest phrase wins" loop:
+
+    for word in words_sorted_by_priority:
+        count = masked.count(word)
+        masked = masked.replace(word, "\\x00" * len(word))
+
+PhraseMatcher reproduces those counts exactly from a single automaton pass:
+every (possibly overlapping) occurrence is collected once, then occurrences
+are claimed phrase by phrase in priority order, left to right, skipping any
+that overlap a position already claimed (or pre-masked, e.g. by exemptions).
+
+LineIndex turns those raw occurrence offsets into the linters' line-number +
+snippet evidence without rescanning the chapter once per hit phrase.
+"""
+
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class PhraseMatcher:
+    """Multi-phrase matcher; phrase order defines masking priority."""
+
+    def __init__(self, phrases: Sequence[str]) -> None:
+        self.phrases: List[str] = list(phrases)
+        # Trie as parallel arrays: goto[node] = {char: child}.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Phrase indices ending exactly at node, and the nearest suffix node
+        # that has outputs (dictionary-suffix link; 0 = none).
+        self._out: List[List[int]] = [[]]
+        self._dict_link: List[int] = [0]
+
+        for idx, phrase in enumerate(self.phrases):
+            if not phrase:
+                continue
+            node = 0
+            for ch in phrase:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._dict_link.append(0)
+                node = nxt
+            self._out[node].append(idx)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                fc = self._fail[child]
+                self._dict_link[child] = fc if self._out[fc] else self._dict_link[fc]
+
+    def occurrences(self, text: str) -> List[List[int]]:
+        """Start offsets of every occurrence (overlaps included), per phrase index, ascending."""
+        found: List[List[int]] = [[] for _ in self.phrases]
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        dict_link = self._dict_link
+        lengths = [len(p) for p in self.phrases]
+
+        node = 0
+        for pos, ch in enumerate(text):
+            while True:
+                nxt = goto[node].get(ch)
+                if nxt is not None:
+                    node = nxt
+                    break
+                if node == 0:
+                    break
+                node = fail[node]
+            hit = node if out[node] else dict_link[node]
+            while hit:
+                for idx in out[hit]:
+                    found[idx].append(pos - lengths[idx] + 1)
+                hit = dict_link[hit]
+        return found
+
+    def scan(self, text: str, masked: Optional[bytearray] = None) -> Tuple[List[int], List[List[int]]]:
+        """Count hits with longest-first masking semantics.
+
+        *masked* optionally marks positions (value 1) that must not be
+        matched, e.g. exemption spans; it is updated in place.
+
+        Returns (counts per phrase index, raw occurrence offsets per phrase index).
+        """
+        found = self.occurrences(text)
+        taken = masked if masked is not None else bytearray(len(text))
+        counts = [0] * len(self.phrases)
+        for idx, starts in enumerate(found):
+            if not starts:
+                continue
+            length = len(self.phrases[idx])
+            claimed: List[int] = []
+            next_free = 0
+            for start in starts:
+                end = start + length
+                if start < next_free or taken.find(1, start, end) != -1:
+                    continue
+                claimed.append(start)
+                next_free = end
+            for start in claimed:
+                taken[start : start + length] = b"\x01" * length
+            counts[idx] = len(claimed)
+        return counts, found
+
+
+class LineIndex:
+    """Offset -> line lookup over text.splitlines() (1-based line numbers), built once per text."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        pos = 0
+        for line_with_end, line in zip(text.splitlines(True), text.splitlines()):
+            self._starts.append(pos)
+            self._ends.append(pos + len(line))
+            pos += len(line_with_end)
+
+    def evidence(
+        self,
+        starts: Sequence[int],
+        length: int,
+        max_lines: int = 20,
+        max_snippets: int = 5,
+        snippet_chars: int = 160,
+    ) -> Tuple[List[int], List[str]]:
+        """Lines containing an occurrence (ascending *starts* of a *length*-char phrase) + snippets.
+
+        Equivalent to scanning `for line in text.splitlines(): if phrase in line`.
+        """
+        lines: List[int] = []
+        snippets: List[str] = []
+        last = -1
+        for start in starts:
+            i = bisect_right(self._starts, start) - 1
+            # Skip repeats on the same line and occurrences spanning a line break.
+            if i == last or i < 0 or start + length > self._ends[i]:
+                continue
+            last = i
+            lines.append(i + 1)
+            if len(snippets) < max_snippets:
+                snippet = self.text[self._starts[i] : self._ends[i]].strip()
+                if len(snippet) > snippet_chars:
+                    snippet = snippet[:snippet_chars] + "…"
+                snippets.append(snippet)
+            if len(lines) >= max_lines:
+                break
+        return lines, snippets
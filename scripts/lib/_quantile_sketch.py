@@ -0,0 +1,92 @@
+"""Mergeable streaming quantile sketch for non-negative values.
+
+Imported by run_regression.py and run_regression_batch.py.
+
+Values fall into logarithmic buckets (bucket i covers (gamma^(i-1), gamma^i]
+with gamma = (1 + a) / (1 - a)), so any quantile is answered within relative
+error a = RELATIVE_ACCURACY using memory proportional to log(max / min), not
+to the number of values.  A sketch is a plain dict of counts: merging two
+sketches adds their buckets, so partial sketches built in any order or in
+separate processes merge into exactly the sketch of the whole stream.
+"""
+
+import math
+from typing import Any, Dict, List, Sequence
+
+RELATIVE_ACCURACY = 0.01
+
+_GAMMA = (1.0 + RELATIVE_ACCURACY) / (1.0 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+# Values at or below this count as zero (log buckets cannot hold them).
+_MIN_POSITIVE = 1e-9
+
+Sketch = Dict[str, Any]
+
+
+def new_sketch() -> Sketch:
+    return {"count": 0, "zero": 0, "bins": {}, "min": None, "max": None}
+
+
+def add(sketch: Sketch, value: float) -> None:
+    """Add one non-negative *value* (negative values are ignored)."""
+    if value < 0:
+        return
+    sketch["count"] += 1
+    if value <= _MIN_POSITIVE:
+        sketch["zero"] += 1
+    else:
+        i = math.ceil(math.log(value) / _LOG_GAMMA)
+        bins = sketch["bins"]
+        bins[i] = bins.get(i, 0) + 1
+    if sketch["min"] is None or value < sketch["min"]:
+        sketch["min"] = value
+    if sketch["max"] is None or value > sketch["max"]:
+        sketch["max"] = value
+
+
+def merge(dst: Sketch, src: Sketch) -> None:
+    """Fold *src* into *dst*."""
+    if src["count"] == 0:
+        return
+    dst["count"] += src["count"]
+    dst["zero"] += src["zero"]
+    bins = dst["bins"]
+    for i, n in src["bins"].items():
+        bins[i] = bins.get(i, 0) + n
+    if dst["min"] is None or src["min"] < dst["min"]:
+        dst["min"] = src["min"]
+    if dst["max"] is None or src["max"] > dst["max"]:
+        dst["max"] = src["max"]
+
+
+def quantiles(sketch: Sketch, qs: Sequence[float]) -> List[float]:
+    """Estimates of the *qs* quantiles (each in [0, 1]); the sketch must be non-empty.
+
+    Quantile q is the nearest-rank value (the ceil(q * count)-th smallest) to within
+    RELATIVE_ACCURACY; the smallest and largest ranks return the exact min / max.
+    """
+    count = sketch["count"]
+    if count <= 0:
+        raise ValueError("quantiles of an empty sketch")
+    ranks = [max(0, math.ceil(q * count) - 1) for q in qs]
+    out: List[float] = [0.0] * len(qs)
+    seen = sketch["zero"]
+    bins = iter(sorted(sketch["bins"].items()))
+    value = 0.0
+    for k in sorted(range(len(qs)), key=lambda k: ranks[k]):
+        rank = ranks[k]
+        while seen <= rank:
+            i, n = next(bins)
+            seen += n
+            # Relative midpoint of bucket i.
+            value = 2.0 * _GAMMA ** i / (_GAMMA + 1.0)
+        if rank == 0:
+            out[k] = sketch["min"]
+        elif rank == count - 1:
+            out[k] = sketch["max"]
+        elif rank < sketch["zero"]:
+            out[k] = 0.0
+        else:
+            out[k] = min(max(value, sketch["min"]), sketch["max"])
+    return out
@@ -0,0 +1,81 @@
+"""Inverted rule -> chapter index archived with each regression run.
+
+Imported by run_regression.py (build + archive) and query_rule_index.py.
+
+The index maps layer -> rule_id -> confidence -> the chapters with at least
+one such violation.  Chapter lists are stored ascending and delta-encoded
+(first chapter, then gaps), which keeps rule-index.json small for rules that
+fire on most chapters of a long project.
+"""
+
+import fnmatch
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+INDEX_FILE = "rule-index.json"
+SCHEMA_VERSION = 1
+
+CONFIDENCE_ORDER = ("high", "medium", "low", "unknown")
+
+Index = Dict[str, Dict[str, Dict[str, List[int]]]]
+
+
+def encode_chapters(chapters: Iterable[int]) -> List[int]:
+    """Ascending delta encoding of a chapter set: [first, gap, gap, ...]."""
+    out: List[int] = []
+    prev = 0
+    for ch in sorted(chapters):
+        out.append(ch - prev)
+        prev = ch
+    return out
+
+
+def decode_chapters(deltas: Sequence[int]) -> List[int]:
+    out: List[int] = []
+    ch = 0
+    for d in deltas:
+        ch += d
+        out.append(ch)
+    return out
+
+
+def build_index(chapters_by_rule: Dict[str, Dict[str, Dict[str, Set[int]]]]) -> Index:
+    """Encode a layer -> rule_id -> confidence -> chapter set mapping."""
+    return {
+        layer: {
+            rule_id: {conf: encode_chapters(chapters) for conf, chapters in conf_map.items()}
+            for rule_id, conf_map in rules.items()
+        }
+        for layer, rules in chapters_by_rule.items()
+    }
+
+
+def _conf_key(conf: str) -> Any:
+    return (CONFIDENCE_ORDER.index(conf), "") if conf in CONFIDENCE_ORDER else (len(CONFIDENCE_ORDER), conf)
+
+
+def query(
+    index: Index,
+    layers: Optional[Sequence[str]] = None,
+    rule_patterns: Optional[Sequence[str]] = None,
+    confidences: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Matching (layer, rule_id, confidence) entries with decoded chapter lists.
+
+    Each filter is optional; rule patterns are exact ids or globs.  Only the
+    matching lists are decoded.
+    """
+    out: List[Dict[str, Any]] = []
+    for layer in sorted(index):
+        if layers and layer not in layers:
+            continue
+        rules = index[layer]
+        for rule_id in sorted(rules):
+            if rule_patterns and not any(fnmatch.fnmatchcase(rule_id, p) for p in rule_patterns):
+                continue
+            conf_map = rules[rule_id]
+            for conf in sorted(conf_map, key=_conf_key):
+                if confidences and conf not in confidences:
+                    continue
+                chapters = decode_chapters(conf_map[conf])
+                out.append({"layer": layer, "rule_id": rule_id, "confidence": conf, "chapters": chapters})
+    return out
@@ -0,0 +1,321 @@
+"""Benchmark suite for the deterministic scripts (bench-scripts.sh).
+
+For every requested project size a synthetic project is generated (cached in
+the work dir, see bench_synth.py) and each script is run as a subprocess the
+way the CLI runs it.  Per case we record the median wall time over --repeat
+runs, the peak RSS of the process tree (from wait4 rusage) and throughput
+(chapters per second).
+
+Project-level scripts (run-regression, calibrate, compare, the --batch lints)
+run once per repeat over the whole project; per-chapter scripts (single
+lints, run-ner, query-foreshadow) run over an evenly spaced sample of
+chapters and report the totals for the sample.
+
+With a baseline report, every case present in both is compared and the run
+fails (exit 1) when a case got slower than --max-regression percent and by
+more than --min-delta-ms.
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import _common
+import bench_synth
+import run_ner
+
+_SCHEMA_VERSION = 1
+
+CASE_NAMES = [
+    "run_regression_cold",
+    "run_regression_warm",
+    "calibrate_quality_judge",
+    "compare_regression_runs",
+    "lint_blacklist_batch",
+    "lint_cliche_batch",
+    "lint_readability_batch",
+    "lint_blacklist",
+    "lint_cliche",
+    "lint_readability",
+    "run_ner",
+    "query_foreshadow",
+    "query_foreshadow_range",
+    "run_ner_corpus",
+]
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+def _maxrss_kb(ru_maxrss: int) -> int:
+    # Linux reports KiB, macOS bytes.
+    if sys.platform == "darwin":
+        return ru_maxrss // 1024
+    return ru_maxrss
+
+
+def _run(cmd: Sequence[str], cwd: Optional[str] = None) -> Tuple[float, int, bytes]:
+    """Run *cmd* to completion: (wall seconds, peak RSS KiB, stdout).  Dies on non-zero exit."""
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        started = time.perf_counter()
+        proc = subprocess.Popen(list(cmd), cwd=cwd, stdin=subprocess.DEVNULL, stdout=out, stderr=err)
+        # wait4 (not Popen.wait) so we get the child's rusage; it covers the child's
+        # reaped descendants too (bash wrapper -> python3).
+        _, status, rusage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - started
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode != 0:
+            err.seek(0)
+            message = err.read().decode("utf-8", errors="replace").strip()
+            _die(f"bench-scripts.sh: command failed (exit {proc.returncode}): {' '.join(cmd)}\n{message}", 2)
+        out.seek(0)
+        return elapsed, _maxrss_kb(rusage.ru_maxrss), out.read()
+
+
+def _sample(chapters: int, k: int) -> List[int]:
+    if k <= 0 or k >= chapters:
+        return list(range(1, chapters + 1))
+    return sorted({1 + (i * (chapters - 1)) // max(1, k - 1) for i in range(k)})
+
+
+class _Case:
+    def __init__(
+        self, name: str, items: int, cmds: List[Tuple[List[str], Optional[str]]], chars: Optional[int] = None
+    ) -> None:
+        self.name = name
+        self.items = items
+        self.cmds = cmds
+        self.chars = chars
+
+
+def _chapter_files(chapters_dir: str) -> List[str]:
+    return sorted(
+        os.path.join(chapters_dir, name)
+        for name in os.listdir(chapters_dir)
+        if name.startswith("chapter-") and name.endswith(".md")
+    )
+
+
+def ner_corpus(chapters_dir: str) -> None:
+    """--ner-corpus: run the run-ner.sh extractor over every chapter in one process."""
+    chars = 0
+    paths = _chapter_files(chapters_dir)
+    for path in paths:
+        text = run_ner.read_chapter(path)
+        run_ner.ner_text(text, path)
+        chars += len(text)
+    sys.stdout.write(json.dumps({"chapters": len(paths), "chars": chars}) + "\n")
+
+
+def _cases(scripts_dir: str, project: str, runs_dir: str, chapters: int, sample: List[int], only: Set[str]) -> List[_Case]:
+    def sh(name: str, *args: str) -> List[str]:
+        # Invoke through bash: not every script carries the executable bit.
+        return ["bash", os.path.join(scripts_dir, name), *args]
+
+    labels = os.path.join(project, "labels.jsonl")
+    chapters_dir = os.path.join(project, "chapters")
+    blacklist = os.path.join(project, "ai-blacklist.json")
+    cliche = os.path.join(project, "web-novel-cliche-lint.json")
+    profile = os.path.join(project, "platform-profile.json")
+    regression = sh("run-regression.sh", "--project", project, "--labels", labels, "--runs-dir", runs_dir, "--no-archive")
+
+    # Two archived runs to diff; this also primes the cache for run_regression_warm.
+    run_dirs = ["", ""]
+    if not only or only & {"compare_regression_runs", "run_regression_warm"}:
+        for i in range(2):
+            _, _, stdout = _run(sh("run-regression.sh", "--project", project, "--labels", labels, "--runs-dir", runs_dir))
+            run_dirs[i] = os.path.join(runs_dir, json.loads(stdout)["run_id"])
+
+    def chapter(n: int) -> str:
+        return os.path.join(chapters_dir, f"chapter-{n:03d}.md")
+
+    corpus_chars = None
+    if not only or "run_ner_corpus" in only:
+        corpus_chars = 0
+        for path in _chapter_files(chapters_dir):
+            with open(path, "r", encoding="utf-8-sig") as f:
+                corpus_chars += len(f.read())
+    ner_corpus_cmd = ["python3", os.path.abspath(__file__), "--ner-corpus", chapters_dir]
+
+    return [
+        _Case("run_regression_cold", chapters, [(regression + ["--no-cache"], None)]),
+        _Case("run_regression_warm", chapters, [(regression, None)]),
+        _Case("calibrate_quality_judge", chapters, [(sh("calibrate-quality-judge.sh", "--project", project, "--labels", labels), None)]),
+        _Case("compare_regression_runs", chapters, [(sh("compare-regression-runs.sh", run_dirs[0], run_dirs[1]), None)]),
+        _Case("lint_blacklist_batch", chapters, [(sh("lint-blacklist.sh", "--batch", blacklist, chapters_dir), None)]),
+        _Case("lint_cliche_batch", chapters, [(sh("lint-cliche.sh", "--batch", cliche, chapters_dir), None)]),
+        _Case("lint_readability_batch", chapters, [(sh("lint-readability.sh", "--batch", profile, chapters_dir), None)]),
+        _Case("lint_blacklist", len(sample), [(sh("lint-blacklist.sh", chapter(n), blacklist), None) for n in sample]),
+        _Case("lint_cliche", len(sample), [(sh("lint-cliche.sh", chapter(n), cliche), None) for n in sample]),
+        _Case("lint_readability", len(sample), [(sh("lint-readability.sh", chapter(n), profile, str(n)), None) for n in sample]),
+        _Case("run_ner", len(sample), [(sh("run-ner.sh", chapter(n)), None) for n in sample]),
+        _Case("query_foreshadow", len(sample), [(sh("query-foreshadow.sh", str(n)), project) for n in sample]),
+        _Case("query_foreshadow_range", chapters, [(sh("query-foreshadow.sh", "--range", f"1-{chapters}"), project)]),
+        _Case("run_ner_corpus", chapters, [(ner_corpus_cmd, None)], chars=corpus_chars),
+    ]
+
+
+def _measure(case: _Case, repeat: int) -> Dict[str, Any]:
+    walls: List[float] = []
+    peak_kb = 0
+    for _ in range(repeat):
+        total = 0.0
+        for cmd, cwd in case.cmds:
+            elapsed, rss_kb, _ = _run(cmd, cwd)
+            total += elapsed
+            peak_kb = max(peak_kb, rss_kb)
+        walls.append(total)
+    wall = statistics.median(walls)
+    out: Dict[str, Any] = {
+        "wall_ms": round(wall * 1000.0, 3),
+        "wall_ms_min": round(min(walls) * 1000.0, 3),
+        "wall_ms_max": round(max(walls) * 1000.0, 3),
+        "peak_rss_kb": peak_kb,
+        "items": case.items,
+        "items_per_sec": round(case.items / wall, 3) if wall > 0 else None,
+        "invocations": len(case.cmds),
+        "repeat": repeat,
+    }
+    if case.chars is not None:
+        out["chars"] = case.chars
+        out["chars_per_sec"] = round(case.chars / wall, 1) if wall > 0 else None
+    return out
+
+
+def compare_to_baseline(
+    results: Dict[str, Any], baseline: Dict[str, Any], max_regression_pct: float, min_delta_ms: float
+) -> Dict[str, Any]:
+    """Per-case wall-time deltas vs *baseline* results; cases in only one side are ignored."""
+    cases: Dict[str, Any] = {}
+    regressions: List[str] = []
+    for key in sorted(results):
+        base = baseline.get(key)
+        if not isinstance(base, dict) or not isinstance(base.get("wall_ms"), (int, float)):
+            continue
+        cur_ms = float(results[key]["wall_ms"])
+        base_ms = float(base["wall_ms"])
+        delta_ms = cur_ms - base_ms
+        delta_pct = (delta_ms / base_ms * 100.0) if base_ms > 0 else None
+        regressed = delta_pct is not None and delta_pct > max_regression_pct and delta_ms > min_delta_ms
+        cases[key] = {
+            "baseline_wall_ms": base_ms,
+            "wall_ms": cur_ms,
+            "delta_ms": round(delta_ms, 3),
+            "delta_pct": round(delta_pct, 2) if delta_pct is not None else None,
+            "regressed": regressed,
+        }
+        if regressed:
+            regressions.append(key)
+    return {
+        "max_regression_pct": max_regression_pct,
+        "min_delta_ms": min_delta_ms,
+        "cases": cases,
+        "regressions": regressions,
+    }
+
+
+def main() -> None:
+    if sys.argv[1] == "--ner-corpus":
+        ner_corpus(sys.argv[2])
+        return
+
+    sizes = [int(s) for s in sys.argv[1].split(",") if s.strip()]
+    work_dir = os.path.abspath(sys.argv[2])
+    repeat = int(sys.argv[3])
+    sample_k = int(sys.argv[4])
+    out_path = sys.argv[5].strip()
+    baseline_path = sys.argv[6].strip()
+    max_regression_pct = float(sys.argv[7])
+    min_delta_ms = float(sys.argv[8])
+    seed = int(sys.argv[9])
+    only = {c for c in sys.argv[10].split(",") if c}
+
+    if not sizes or any(n <= 0 for n in sizes):
+        _die("bench-scripts.sh: --sizes must be a comma-separated list of ints >= 1", 1)
+    unknown = sorted(only - set(CASE_NAMES))
+    if unknown:
+        _die(f"bench-scripts.sh: unknown case(s): {', '.join(unknown)} (known: {', '.join(CASE_NAMES)})", 1)
+
+    baseline_results: Optional[Dict[str, Any]] = None
+    if baseline_path:
+        if not os.path.isfile(baseline_path):
+            _die(f"bench-scripts.sh: baseline file not found: {baseline_path}", 1)
+        baseline_obj = _common.load_json(baseline_path)
+        if not isinstance(baseline_obj, dict) or not isinstance(baseline_obj.get("results"), dict):
+            _die(f"bench-scripts.sh: baseline must be a bench-scripts.sh report: {baseline_path}", 1)
+        baseline_results = baseline_obj["results"]
+
+    scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    templates_dir = os.path.join(os.path.dirname(scripts_dir), "templates")
+
+    results: Dict[str, Any] = {}
+    projects: Dict[str, Any] = {}
+    for size in sizes:
+        project = os.path.join(work_dir, f"project-{size}")
+        sys.stderr.write(f"bench-scripts.sh: preparing {size}-chapter project\n")
+        started = time.perf_counter()
+        bench_synth.generate_project(project, size, seed, templates_dir)
+        projects[str(size)] = {"path": project, "prepare_seconds": round(time.perf_counter() - started, 3)}
+
+        runs_dir = os.path.join(work_dir, f"runs-{size}")
+        shutil.rmtree(runs_dir, ignore_errors=True)
+        for case in _cases(scripts_dir, project, runs_dir, size, _sample(size, sample_k), only):
+            if only and case.name not in only:
+                continue
+            key = f"{case.name}@{size}"
+            results[key] = _measure(case, repeat)
+            r = results[key]
+            sys.stderr.write(f"  {key:<36} {r['wall_ms']:>12.1f} ms {r['peak_rss_kb']:>9d} KiB {r['items_per_sec']} items/s\n")
+
+    report: Dict[str, Any] = {
+        "schema_version": _SCHEMA_VERSION,
+        "generated_at": _common.iso_utc_now(),
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "sizes": sizes,
+            "repeat": repeat,
+            "sample": sample_k,
+            "seed": seed,
+            "synth_version": bench_synth.SYNTH_VERSION,
+        },
+        "projects": projects,
+        "results": results,
+    }
+    if baseline_results is not None:
+        report["comparison"] = compare_to_baseline(results, baseline_results, max_regression_pct, min_delta_ms)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
+    if out_path:
+        _common.write_json_atomic(out_path, report)
+    sys.stdout.write(text)
+
+    if baseline_results is not None and report["comparison"]["regressions"]:
+        for key in report["comparison"]["regressions"]:
+            c = report["comparison"]["cases"][key]
+            sys.stderr.write(
+                f"bench-scripts.sh: regression: {key} {c['baseline_wall_ms']:.1f} ms -> {c['wall_ms']:.1f} ms ({c['delta_pct']:+.1f}%)\n"
+            )
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"bench-scripts.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
@@ -0,0 +1,252 @@
+"""Synthetic novel projects for the script benchmark suite (bench-scripts.sh).
+
+Imported by bench_scripts.py.
+
+A generated project mirrors eval/fixtures/demo-project (evaluations/, logs/,
+foreshadowing/, volumes/, .checkpoint.json, style-drift.json) plus
+chapters/*.md with Chinese prose seeded with blacklist phrases, cliches,
+dialogue, named characters, locations, time markers and events, and the lint
+configs copied from templates/.  Output is fully determined by (chapters, seed).
+"""
+
+import json
+import os
+import random
+import shutil
+from typing import Any, Dict, List
+
+import _common
+
+# Bump whenever the generated layout/content changes so cached projects are regenerated.
+SYNTH_VERSION = 1
+
+_MARKER = ".bench-synth.json"
+
+_DIMENSIONS = [
+    ("plot_logic", 0.18),
+    ("character", 0.18),
+    ("immersion", 0.15),
+    ("foreshadowing", 0.10),
+    ("pacing", 0.08),
+    ("style_naturalness", 0.15),
+    ("emotional_impact", 0.08),
+    ("storyline_coherence", 0.08),
+]
+
+_FILLER = (
+    "的一是了我不人在他有这个上们来到时大地为子中你说生国年着就那和要她出也得里后自以会家可下而过天去能对小多然于心"
+    "学么之都好看起发当没成只如事把还用第样道想作种开美总从无情己面最女但现前些所同日手又行意动方期它头经长儿回位分"
+)
+_SURNAMES = "林苏萧叶秦楚陆沈顾韩唐周"
+_GIVEN = ["枫", "婉儿", "炎", "长风", "清寒", "若雪", "明远", "青山", "子墨", "灵儿", "无忌", "星河"]
+_LOCATIONS = ["北冥城", "青云山", "天机阁", "落霞镇", "幽冥谷", "【玄武城】", "万剑宗", "听雨楼", "东海港", "白鹿书院"]
+_TIMES = ["翌日", "三日后", "第三年春", "五月", "黄昏", "次日清晨", "半月后", "十年前", "当夜", "第二天"]
+_EVENTS = ["宗门大战爆发", "林家背叛", "天劫降临", "拍卖会开幕", "秘境开启", "婚约解除", "大比开始", "城门失守"]
+_SPEECH = ["说道", "冷笑道", "沉声道", "低声道", "怒道", "问道", "笑道"]
+
+
+def _phrases(project_dir: str) -> Dict[str, List[str]]:
+    blacklist = _common.load_json(os.path.join(project_dir, "ai-blacklist.json"))
+    cliche = _common.load_json(os.path.join(project_dir, "web-novel-cliche-lint.json"))
+    cliche_words = list(cliche.get("words") or [])
+    for words in (cliche.get("categories") or {}).values():
+        cliche_words.extend(words)
+    return {"blacklist": list(blacklist.get("words") or []), "cliche": cliche_words}
+
+
+def _filler(rnd: random.Random, lo: int, hi: int) -> str:
+    return "".join(rnd.choice(_FILLER) for _ in range(rnd.randint(lo, hi)))
+
+
+def _chapter_text(rnd: random.Random, chapter: int, names: List[str], phrases: Dict[str, List[str]], target_chars: int) -> str:
+    paras: List[str] = [f"# 第{chapter}章 {_filler(rnd, 2, 5)}"]
+    size = 0
+    while size < target_chars:
+        r = rnd.random()
+        if r < 0.35:
+            # Dialogue beat.
+            para = f"{rnd.choice(names)}{rnd.choice(_SPEECH)}：“{_filler(rnd, 6, 30)}{rnd.choice(phrases['cliche'])}。”"
+        elif r < 0.45:
+            # Overlong exposition paragraph (readability lint).
+            para = "。".join(_filler(rnd, 20, 40) for _ in range(rnd.randint(8, 14))) + "。"
+        else:
+            parts: List[str] = []
+            for _ in range(rnd.randint(2, 6)):
+                k = rnd.random()
+                if k < 0.2:
+                    parts.append(rnd.choice(phrases["blacklist"]))
+                elif k < 0.3:
+                    parts.append(rnd.choice(phrases["cliche"]))
+                elif k < 0.45:
+                    parts.append(rnd.choice(["来到", "进入", "离开", "回到"]) + rnd.choice(_LOCATIONS))
+                elif k < 0.55:
+                    parts.append(rnd.choice(_TIMES))
+                elif k < 0.6:
+                    parts.append(rnd.choice(_EVENTS))
+                elif k < 0.7:
+                    parts.append(rnd.choice(names) + rnd.choice(["看着", "点了点头", "转身", "沉默"]))
+                else:
+                    parts.append(_filler(rnd, 5, 20))
+                parts.append(rnd.choice(["，", "。", "！", "……"]))
+            para = "".join(parts)
+        paras.append(para)
+        size += len(para)
+    return "\n\n".join(paras) + "\n"
+
+
+def _checks(rnd: random.Random, prefix: str, n_rules: int) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for _ in range(rnd.randint(0, 4)):
+        status = rnd.choices(["pass", "violation", "violation_suspected"], weights=[8, 1, 1])[0]
+        item: Dict[str, Any] = {
+            "rule_id": f"{prefix}-{rnd.randint(1, n_rules):03d}",
+            "status": status,
+            "confidence": rnd.choice(["high", "medium", "low"]),
+            "detail": "synthetic",
+        }
+        if prefix == "LS":
+            item["constraint_type"] = rnd.choice(["hard", "soft"])
+        out.append(item)
+    return out
+
+
+def _eval_obj(rnd: random.Random, chapter: int) -> Dict[str, Any]:
+    overall = round(rnd.uniform(2.0, 4.8), 2)
+    scores = {
+        dim: {"score": rnd.choice([2, 2.5, 3, 3.5, 4, 4.5, 5]), "weight": weight, "reason": "synthetic", "evidence": "synthetic"}
+        for dim, weight in _DIMENSIONS
+    }
+    cv: Dict[str, Any] = {
+        "l1_checks": _checks(rnd, "W", 12),
+        "l2_checks": _checks(rnd, "C", 40),
+        "l3_checks": _checks(rnd, "O", 8),
+        "ls_checks": _checks(rnd, "LS", 10),
+    }
+    cv["has_violations"] = any(c["status"] != "pass" for checks in cv.values() for c in checks)
+    decision = "pass" if overall >= 3.5 else rnd.choice(["polish", "revise"])
+    secondary = round(min(5.0, max(1.0, overall + rnd.uniform(-0.6, 0.6))), 2)
+    return {
+        "chapter": chapter,
+        "eval_used": {
+            "contract_verification": cv,
+            "scores": scores,
+            "overall": overall,
+            "overall_final": overall,
+            "has_violations": cv["has_violations"],
+            "recommendation": decision,
+        },
+        "metadata": {
+            "judges": {
+                "primary": {"overall": overall, "model": "sonnet"},
+                "secondary": {"overall": secondary, "model": "opus"},
+                "overall_final": overall,
+            },
+            "gate": {"decision": decision, "reason": "synthetic"},
+        },
+    }
+
+
+def _log_obj(rnd: random.Random, chapter: int, decision: str) -> Dict[str, Any]:
+    stages = []
+    for name in ["draft", "refine", "judge"][: rnd.randint(2, 3)]:
+        stages.append(
+            {
+                "name": name,
+                "model": rnd.choice(["sonnet", "opus", "haiku"]),
+                "duration_ms": rnd.randint(800, 90000),
+                "input_tokens": rnd.randint(2000, 30000),
+                "output_tokens": rnd.randint(500, 8000),
+            }
+        )
+    return {
+        "chapter": chapter,
+        "storyline_id": rnd.choice(["main-arc", "side-arc-1", "side-arc-2"]),
+        "stages": stages,
+        "gate_decision": decision,
+        "revisions": rnd.randint(0, 3),
+        "force_passed": rnd.random() < 0.05,
+        "judges": {"primary": {"model": "sonnet"}, "secondary": {"model": "opus"}, "used": "primary"},
+    }
+
+
+def _foreshadowing(rnd: random.Random, chapters: int) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = []
+    for i in range(max(4, chapters // 2)):
+        planted = rnd.randint(1, chapters)
+        scope = rnd.choice(["short", "medium", "long"])
+        span = {"short": 10, "medium": 60, "long": 300}[scope]
+        lo = planted + rnd.randint(1, span)
+        status = rnd.choices(["planted", "advanced", "resolved"], weights=[5, 3, 2])[0]
+        items.append(
+            {
+                "id": f"fs-{i:05d}",
+                "description": "synthetic",
+                "scope": scope,
+                "status": status,
+                "planted_chapter": planted,
+                "target_resolve_range": [lo, lo + rnd.randint(0, span)],
+                "last_updated_chapter": planted,
+                "history": [{"chapter": planted, "action": "planted", "detail": "synthetic"}],
+            }
+        )
+    return items
+
+
+def _write_json(path: str, obj: Any) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+
+
+def generate_project(project_dir: str, chapters: int, seed: int, templates_dir: str, chapter_chars: int = 2500) -> None:
+    """(Re)generate a synthetic project; a matching marker file makes this a no-op."""
+    spec = {"synth_version": SYNTH_VERSION, "chapters": chapters, "seed": seed, "chapter_chars": chapter_chars}
+    try:
+        if _common.load_json(os.path.join(project_dir, _MARKER), missing_ok=True) == spec:
+            return
+    except Exception:
+        pass
+    if os.path.isdir(project_dir):
+        shutil.rmtree(project_dir)
+
+    for sub in ("evaluations", "logs/continuity", "chapters", "foreshadowing", "volumes/vol-01"):
+        os.makedirs(os.path.join(project_dir, sub), exist_ok=True)
+    shutil.copy(os.path.join(templates_dir, "ai-blacklist.json"), os.path.join(project_dir, "ai-blacklist.json"))
+    shutil.copy(os.path.join(templates_dir, "web-novel-cliche-lint.json"), os.path.join(project_dir, "web-novel-cliche-lint.json"))
+    profiles = _common.load_json(os.path.join(templates_dir, "platform-profile.json"))
+    _write_json(os.path.join(project_dir, "platform-profile.json"), profiles["defaults"]["qidian"])
+
+    rnd = random.Random(seed)
+    phrases = _phrases(project_dir)
+    names = [rnd.choice(_SURNAMES) + g for g in _GIVEN]
+    labels: List[str] = []
+    for ch in range(1, chapters + 1):
+        ev = _eval_obj(rnd, ch)
+        _write_json(os.path.join(project_dir, "evaluations", f"chapter-{ch:03d}-eval.json"), ev)
+        decision = ev["metadata"]["gate"]["decision"]
+        _write_json(os.path.join(project_dir, "logs", f"chapter-{ch:03d}-log.json"), _log_obj(rnd, ch, decision))
+        with open(os.path.join(project_dir, "chapters", f"chapter-{ch:03d}.md"), "w", encoding="utf-8") as f:
+            f.write(_chapter_text(rnd, ch, names, phrases, chapter_chars))
+        human = round(min(5.0, max(1.0, ev["eval_used"]["overall"] + rnd.uniform(-0.8, 0.8))), 1)
+        labels.append(
+            json.dumps(
+                {
+                    "schema_version": 1,
+                    "chapter": ch,
+                    "labels": {"continuity_errors": [], "spec_violations": [], "storyline_issues": []},
+                    "human_scores": {"overall": human, "plot_logic": human},
+                }
+            )
+        )
+    with open(os.path.join(project_dir, "labels.jsonl"), "w", encoding="utf-8") as f:
+        f.write("\n".join(labels) + "\n")
+
+    items = _foreshadowing(rnd, chapters)
+    _write_json(os.path.join(project_dir, "foreshadowing", "global.json"), {"foreshadowing": items})
+    _write_json(os.path.join(project_dir, "volumes", "vol-01", "foreshadowing.json"), {"foreshadowing": items[: len(items) // 4]})
+    _write_json(
+        os.path.join(project_dir, ".checkpoint.json"),
+        {"last_completed_chapter": chapters, "current_volume": 1, "orchestrator_state": "WRITING", "pipeline_stage": "committed"},
+    )
+    _write_json(os.path.join(project_dir, "style-drift.json"), {"active": True, "drifts": [{"dimension": "dialogue_ratio", "delta": 0.1}]})
+    _write_json(os.path.join(project_dir, "logs", "continuity", "latest.json"), {"stats": {"issues_total": 0}, "issues": []})
+    _write_json(os.path.join(project_dir, _MARKER), spec)
@@ -1,17 +1,24 @@
 """QualityJudge calibration against human-labeled dataset (M3).
 
 Extracted from scripts/calibrate-quality-judge.sh heredoc.
-Shared helpers imported from _common.py (same directory).
+Shared helpers imported from _common.py (same directory); the statistics
+for overall and every dimension are computed in one batch by _calib_stats.py
+(NumPy-backed when available).  --multi-judge calibrates every judge score
+found in the evals (resolved, eval_used, each metadata.judges role) from the
+same single parse of each eval file.  --eval-store reads the extracted
+fields from the project's eval_store.py store instead of the eval files.
 """
 
 import json
-import math
 import os
 import sys
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import _calib_bootstrap
+import _calib_stats
 import _common
+import eval_store
 
 _SCRIPT = "calibrate-quality-judge.sh"
 
@@ -51,43 +58,6 @@ def _iter_jsonl(path: str) -> Iterable[Tuple[int, Dict[str, Any]]]:
         _die(f"failed to read labels file {path}: {e}", 1)
 
 
-def _pearson(x: Sequence[float], y: Sequence[float]) -> Optional[float]:
-    if len(x) != len(y) or len(x) < 2:
-        return None
-    mean_x = sum(x) / len(x)
-    mean_y = sum(y) / len(y)
-    num = 0.0
-    den_x = 0.0
-    den_y = 0.0
-    for a, b in zip(x, y):
-        dx = a - mean_x
-        dy = b - mean_y
-        num += dx * dy
-        den_x += dx * dx
-        den_y += dy * dy
-    if den_x <= 0.0 or den_y <= 0.0:
-        return None
-    return num / math.sqrt(den_x * den_y)
-
-
-def _linear_fit(x: Sequence[float], y: Sequence[float]) -> Optional[Dict[str, float]]:
-    if len(x) != len(y) or len(x) < 2:
-        return None
-    mean_x = sum(x) / len(x)
-    mean_y = sum(y) / len(y)
-    sxx = 0.0
-    sxy = 0.0
-    for a, b in zip(x, y):
-        dx = a - mean_x
-        sxx += dx * dx
-        sxy += dx * (b - mean_y)
-    if sxx <= 0.0:
-        return None
-    slope = sxy / sxx
-    intercept = mean_y - slope * mean_x
-    return {"slope": slope, "intercept": intercept}
-
-
 def _clamp(v: float, lo: float = 1.0, hi: float = 5.0) -> float:
     return max(lo, min(hi, v))
 
@@ -98,12 +68,12 @@ def _safe_round(v: Optional[float], ndigits: int = 4) -> Optional[float]:
     return round(float(v), ndigits)
 
 
-def main() -> None:
-    project_dir = sys.argv[1]
-    labels_path = sys.argv[2]
-    out_path = sys.argv[3].strip() if len(sys.argv) > 3 else ""
+def _load_labels(labels_path: str) -> Dict[int, Dict[str, float]]:
+    """Numeric human scores per chapter ("overall" plus dimensions), streamed from the JSONL file.
 
-    label_records: Dict[int, Dict[str, Any]] = {}
+    Only the scores are kept, so memory stays proportional to the number of scores.
+    """
+    label_records: Dict[int, Dict[str, float]] = {}
     label_line_by_chapter: Dict[int, int] = {}
 
     for line_no, obj in _iter_jsonl(labels_path):
@@ -124,9 +94,106 @@ def main() -> None:
                 f"duplicate chapter {chapter} in labels (lines {label_line_by_chapter[chapter]} and {line_no})",
                 1,
             )
-        label_records[chapter] = obj
+        scores: Dict[str, float] = {}
+        for k, v in human_scores.items():
+            n = _common.as_float(v)
+            if n is not None:
+                scores[str(k)] = float(n)
+        label_records[chapter] = scores
         label_line_by_chapter[chapter] = line_no
 
+    return label_records
+
+
+def _multi_judge_report(
+    human_by_chapter: Dict[int, float], sources_by_chapter: Dict[int, Dict[str, float]], thresholds: Dict[str, float]
+) -> Dict[str, Any]:
+    """Per-source calibration against the human labels plus pairwise judge agreement, in one stats batch."""
+    sources = sorted({src for scores in sources_by_chapter.values() for src in scores})
+    chapters = sorted(sources_by_chapter)
+
+    # Group "<b>\t<a>": x = judge b (or the human label for the "\0human" sentinel), y = judge a.
+    groups: Dict[str, Tuple[List[float], List[float]]] = {}
+    gate_hits: Dict[str, int] = {}
+    for i, a in enumerate(sources):
+        for b in ["\0human"] + sources[i:]:
+            key = f"{b}\t{a}"
+            xs: List[float] = []
+            ys: List[float] = []
+            hits = 0
+            for chapter in chapters:
+                scores = sources_by_chapter[chapter]
+                if a not in scores:
+                    continue
+                x = human_by_chapter[chapter] if b == "\0human" else scores.get(b)
+                if x is None:
+                    continue
+                xs.append(x)
+                ys.append(scores[a])
+                hits += _calib_bootstrap.gate_band(x, thresholds) == _calib_bootstrap.gate_band(scores[a], thresholds)
+            if xs:
+                groups[key] = (xs, ys)
+                gate_hits[key] = hits
+    stats = _calib_stats.group_stats(groups)
+
+    comparison: List[Dict[str, Any]] = []
+    for src in sources:
+        key = f"\0human\t{src}"
+        st = stats[key]
+        comparison.append(
+            {
+                "source": src,
+                "n": st["n"],
+                "pearson_r": _safe_round(st["pearson_r"], 4),
+                "slope": _safe_round(st["slope"], 6),
+                "intercept": _safe_round(st["intercept"], 6),
+                "judge_mean": _safe_round(st["judge_mean"], 4),
+                "mae": _safe_round(st["mae"], 4),
+                "rmse": _safe_round(st["rmse"], 4),
+                "bias_judge_minus_human": _safe_round(st["bias"], 4),
+                "gate_agreement": _safe_round(gate_hits[key] / st["n"], 4),
+            }
+        )
+    comparison.sort(key=lambda row: (row["pearson_r"] is None, -(row["pearson_r"] or 0.0), row["source"]))
+
+    def cell(a: str, b: str, field: str) -> Any:
+        key = f"{a}\t{b}" if f"{a}\t{b}" in groups else f"{b}\t{a}"
+        if key not in groups:
+            return 0 if field == "n" else None
+        st = stats[key]
+        if field == "n":
+            return st["n"]
+        if field == "gate_agreement":
+            return _safe_round(gate_hits[key] / st["n"], 4)
+        return _safe_round(st[field], 4)
+
+    return {
+        "sources": sources,
+        # Sorted by pearson_r vs human labels (best first).
+        "comparison": comparison,
+        # Square matrices indexed like "sources"; each cell uses the chapters where both judges scored.
+        "agreement_matrix": {
+            "sources": sources,
+            "n": [[cell(a, b, "n") for b in sources] for a in sources],
+            "pearson_r": [[cell(a, b, "pearson_r") for b in sources] for a in sources],
+            "mean_abs_diff": [[cell(a, b, "mae") for b in sources] for a in sources],
+            "gate_agreement": [[cell(a, b, "gate_agreement") for b in sources] for a in sources],
+        },
+    }
+
+
+def main() -> None:
+    project_dir = sys.argv[1]
+    labels_path = sys.argv[2]
+    out_path = sys.argv[3].strip() if len(sys.argv) > 3 else ""
+    resamples = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else 1
+    jobs = int(sys.argv[6]) if len(sys.argv) > 6 else 1
+    multi_judge = len(sys.argv) > 7 and sys.argv[7] == "1"
+    use_eval_store = len(sys.argv) > 8 and sys.argv[8] == "1"
+
+    label_records = _load_labels(labels_path)
+
     if not label_records:
         _die("labels file has no records", 1)
 
@@ -137,6 +204,14 @@ def main() -> None:
     eval_file_list = _common.find_eval_files(eval_dir)
     eval_files: Dict[int, str] = {ch: path for ch, path in eval_file_list}
 
+    fields = ("judge_sources", "dimension_scores") if multi_judge else ("dimension_scores",)
+    records: Optional[Dict[str, Dict[str, Any]]] = None
+    if use_eval_store:
+        try:
+            records, _refresh = eval_store.load_project(project_dir, fields=fields)
+        except ValueError as e:
+            _die(str(e), 1)
+
     matched_chapters: List[int] = []
     missing_eval_chapters: List[int] = []
 
@@ -145,6 +220,7 @@ def main() -> None:
     judge_overall_source: Dict[int, str] = {}
 
     dim_pairs: Dict[str, Tuple[List[float], List[float]]] = {}
+    sources_by_chapter: Dict[int, Dict[str, float]] = {}
 
     for chapter in sorted(label_records.keys()):
         eval_path = eval_files.get(chapter)
@@ -152,50 +228,33 @@ def main() -> None:
             missing_eval_chapters.append(chapter)
             continue
 
-        eval_obj = _load_json(eval_path)
-        if not isinstance(eval_obj, dict):
+        if records is not None:
+            record = records[eval_path]
+        else:
+            record = eval_store.extract_record(chapter, _load_json(eval_path), fields)
+        if not record["is_object"]:
             _die(f"eval JSON must be an object at {eval_path}", 1)
 
-        human = _common.as_float(label_records[chapter]["human_scores"]["overall"])
-        judge = _common.extract_overall(eval_obj)
-        if human is None:
-            _die(f"labels human_scores.overall not a number for chapter {chapter}", 1)
+        human_dims = label_records[chapter]
+        human = human_dims["overall"]
+        if multi_judge and record["judge_sources"]:
+            sources_by_chapter[chapter] = record["judge_sources"]
+        judge = record["overall"]
         if judge is None:
             missing_eval_chapters.append(chapter)
             continue
 
         # Track which field provided judge overall.
-        src = "unknown"
-        if _common.as_float(eval_obj.get("overall_final")) is not None:
-            src = "overall_final"
-        elif _common.as_float(_common.extract_eval_used(eval_obj).get("overall_final")) is not None:
-            src = "eval_used.overall_final"
-        elif _common.as_float(_common.extract_eval_used(eval_obj).get("overall")) is not None:
-            src = "eval_used.overall"
-        elif _common.as_float(eval_obj.get("overall")) is not None:
-            src = "overall"
-        else:
-            meta = eval_obj.get("metadata")
-            if isinstance(meta, dict) and isinstance(meta.get("judges"), dict) and _common.as_float(meta["judges"].get("overall_final")) is not None:
-                src = "metadata.judges.overall_final"
-        judge_overall_source[chapter] = src
+        judge_overall_source[chapter] = record["overall_source"] or "unknown"
 
         matched_chapters.append(chapter)
-        human_overall.append(float(human))
+        human_overall.append(human)
         judge_overall.append(float(judge))
 
-        human_scores = label_records[chapter].get("human_scores")
-        human_dims: Dict[str, float] = {}
-        if isinstance(human_scores, dict):
-            for k, v in human_scores.items():
-                if k == "overall":
-                    continue
-                n = _common.as_float(v)
-                if n is not None:
-                    human_dims[str(k)] = float(n)
-
-        judge_dims = _common.extract_dimension_scores(eval_obj)
+        judge_dims = record["dimension_scores"]
         for dim_key, human_dim_score in human_dims.items():
+            if dim_key == "overall":
+                continue
             judge_dim_score = judge_dims.get(dim_key)
             if judge_dim_score is None:
                 continue
@@ -209,13 +268,21 @@ def main() -> None:
             1,
         )
 
-    r_overall = _pearson(human_overall, judge_overall)
-    fit = _linear_fit(judge_overall, human_overall)  # human ~ slope * judge + intercept
+    # Overall and every dimension in one batch ("overall" is never a dimension key).
+    groups: Dict[str, Tuple[List[float], List[float]]] = {"overall": (human_overall, judge_overall)}
+    for dim_key, pair in dim_pairs.items():
+        groups[dim_key] = pair
+    stats = _calib_stats.group_stats(groups)
+    overall_stats = stats["overall"]
 
-    errors = [j - h for h, j in zip(human_overall, judge_overall)]
-    mae = sum(abs(e) for e in errors) / len(errors)
-    rmse = math.sqrt(sum(e * e for e in errors) / len(errors))
-    bias = sum(errors) / len(errors)
+    r_overall = overall_stats["pearson_r"]
+    fit = None  # human ~ slope * judge + intercept
+    if overall_stats["slope"] is not None:
+        fit = {"slope": overall_stats["slope"], "intercept": overall_stats["intercept"]}
+
+    mae = overall_stats["mae"]
+    rmse = overall_stats["rmse"]
+    bias = float(overall_stats["bias"])
 
     # pause_for_user_force_rewrite is implicit (<2.0), no threshold to calibrate
     default_thresholds = {"pass": 4.0, "polish": 3.5, "revise": 3.0, "pause_for_user": 2.0}
@@ -254,9 +321,14 @@ def main() -> None:
 
     dims_report: Dict[str, Any] = {}
     for dim_key in sorted(dim_pairs.keys()):
-        xs, ys = dim_pairs[dim_key]
-        r = _pearson(xs, ys)
-        dims_report[dim_key] = {"n": len(xs), "pearson_r": _safe_round(r, 4)}
+        st = stats[dim_key]
+        dims_report[dim_key] = {
+            "n": st["n"],
+            "pearson_r": _safe_round(st["pearson_r"], 4),
+            "mae": _safe_round(st["mae"], 4),
+            "bias_judge_minus_human": _safe_round(st["bias"], 4),
+            "fit_residual_rmse": _safe_round(st["residual_rmse"], 4),
+        }
 
     now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
     out: Dict[str, Any] = {
@@ -278,16 +350,24 @@ def main() -> None:
         "overall": {
             "n": len(matched_chapters),
             "pearson_r": _safe_round(r_overall, 4),
-            "human_mean": _safe_round(sum(human_overall) / len(human_overall), 4),
-            "judge_mean": _safe_round(sum(judge_overall) / len(judge_overall), 4),
+            "human_mean": _safe_round(overall_stats["human_mean"], 4),
+            "judge_mean": _safe_round(overall_stats["judge_mean"], 4),
             "mae": _safe_round(mae, 4),
             "rmse": _safe_round(rmse, 4),
             "bias_judge_minus_human": _safe_round(bias, 4),
+            "fit_residual_rmse": _safe_round(overall_stats["residual_rmse"], 4),
         },
         "dimensions": dims_report,
         "threshold_suggestions": suggestions,
     }
 
+    if multi_judge:
+        human_by_chapter = {ch: scores["overall"] for ch, scores in label_records.items()}
+        out["judges"] = _multi_judge_report(human_by_chapter, sources_by_chapter, default_thresholds)
+
+    if resamples > 0:
+        out.update(_calib_bootstrap.bootstrap_report(human_overall, judge_overall, default_thresholds, resamples, seed, jobs))
+
     out_json = json.dumps(out, ensure_ascii=False, sort_keys=True) + "\n"
     sys.stdout.write(out_json)
 
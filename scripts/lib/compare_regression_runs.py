@@ -2,12 +2,16 @@
 
 Extracted from the heredoc in scripts/compare-regression-runs.sh.
 Reuses helpers from _common to avoid duplication.
+
+The chapter mode (--chapters) merge-joins the runs' chapters.jsonl files
+line by line on chapter id, so memory stays constant however many chapters
+the runs hold; changed chapters are written out as they are found.
 """
 
 import json
 import os
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
 
 import _common
 
@@ -72,10 +76,201 @@ def _delta_map(a: Any, b: Any) -> Dict[str, Optional[float]]:
     return out
 
 
+def _stage_fields(stats: Any) -> Dict[str, Any]:
+    if not isinstance(stats, dict):
+        return {}
+    duration = stats.get("duration_ms") if isinstance(stats.get("duration_ms"), dict) else {}
+    tokens = stats.get("tokens") if isinstance(stats.get("tokens"), dict) else {}
+    return {
+        "stages": stats.get("stages"),
+        "duration_ms_p50": duration.get("p50"),
+        "duration_ms_p90": duration.get("p90"),
+        "duration_ms_p99": duration.get("p99"),
+        "duration_ms_mean": duration.get("mean"),
+        "tokens_total": tokens.get("total"),
+        "output_tokens_per_sec": stats.get("output_tokens_per_sec"),
+    }
+
+
+def _delta_stage_latency(a: Any, b: Any) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+    """Per stage / per model deltas (b - a) of latency percentiles, tokens and tokens/sec."""
+    if not isinstance(a, dict):
+        a = {}
+    if not isinstance(b, dict):
+        b = {}
+    out: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {}
+    for group in ("by_stage", "by_model"):
+        ga = a.get(group) if isinstance(a.get(group), dict) else {}
+        gb = b.get(group) if isinstance(b.get(group), dict) else {}
+        out[group] = {}
+        for key in sorted(set(ga.keys()) | set(gb.keys())):
+            fa = _stage_fields(ga.get(key))
+            fb = _stage_fields(gb.get(key))
+            delta = _delta_map(fa, fb)
+            out[group][key] = {k: None if v is None else round(v, 6) for k, v in delta.items()}
+    return out
+
+
+_COMPLIANCE_LEVELS = ("clean", "violation", "high_confidence_violation")
+
+
+def _iter_chapter_records(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (chapter, record) from a chapters.jsonl file, checking ascending order."""
+    prev: Optional[int] = None
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except Exception as e:
+                _die(f"invalid JSON at {path}:{lineno}: {e}", 1)
+            ch = _common.as_int(rec.get("chapter")) if isinstance(rec, dict) else None
+            if ch is None:
+                _die(f"missing chapter at {path}:{lineno}", 1)
+            if prev is not None and ch <= prev:
+                _die(f"chapters not in ascending order at {path}:{lineno}", 1)
+            prev = ch
+            yield (ch, rec)
+
+
+def _compliance_level(rec: Dict[str, Any]) -> int:
+    if rec.get("high_conf_violation") is True:
+        return 2
+    return 1 if rec.get("violations") else 0
+
+
+def _violation_keys(rec: Dict[str, Any]) -> List[Tuple[str, ...]]:
+    out = []
+    for v in rec.get("violations") or []:
+        if isinstance(v, list):
+            out.append(tuple(str(x) for x in v))
+    return out
+
+
+def _diff_chapter(
+    ch: int, a: Optional[Dict[str, Any]], b: Optional[Dict[str, Any]], min_score_delta: float
+) -> Optional[Dict[str, Any]]:
+    """Chapter diff line, or None when nothing changed beyond *min_score_delta*."""
+    out: Dict[str, Any] = {"type": "chapter", "chapter": ch}
+    if a is None or b is None:
+        rec = a if a is not None else b
+        assert rec is not None
+        out["change"] = "only_in_a" if a is not None else "only_in_b"
+        out["compliance"] = _COMPLIANCE_LEVELS[_compliance_level(rec)]
+        out["overall"] = _common.as_float(rec.get("overall"))
+        return out
+
+    level_a = _compliance_level(a)
+    level_b = _compliance_level(b)
+    keys_a = set(_violation_keys(a))
+    keys_b = set(_violation_keys(b))
+    overall_a = _common.as_float(a.get("overall"))
+    overall_b = _common.as_float(b.get("overall"))
+    score_delta = _delta_number(overall_a, overall_b)
+    if score_delta is not None:
+        score_delta = round(score_delta, 6)
+    if overall_a is None and overall_b is None:
+        score_changed = False
+    elif score_delta is None:
+        score_changed = True
+    else:
+        score_changed = abs(score_delta) > min_score_delta
+    if level_a == level_b and keys_a == keys_b and not score_changed:
+        return None
+
+    if level_b > level_a:
+        out["change"] = "regressed"
+    elif level_b < level_a:
+        out["change"] = "recovered"
+    else:
+        out["change"] = "changed"
+    out["compliance_a"] = _COMPLIANCE_LEVELS[level_a]
+    out["compliance_b"] = _COMPLIANCE_LEVELS[level_b]
+    out["overall_a"] = overall_a
+    out["overall_b"] = overall_b
+    out["overall_delta"] = score_delta
+    out["violations_added"] = [list(k) for k in sorted(keys_b - keys_a)]
+    out["violations_removed"] = [list(k) for k in sorted(keys_a - keys_b)]
+    return out
+
+
+def _compare_chapters(path_a: str, path_b: str, min_score_delta: float, sinks: List[TextIO]) -> None:
+    """Stream chapter diff lines, then a chapter_diff_summary line, to every sink."""
+    counts = {"chapters_compared": 0, "only_in_a": 0, "only_in_b": 0, "regressed": 0, "recovered": 0, "changed": 0, "score_changed": 0}
+    score_delta_sum = 0.0
+    score_delta_n = 0
+
+    def emit(obj: Dict[str, Any]) -> None:
+        line = json.dumps(obj, ensure_ascii=False, sort_keys=True) + "\n"
+        for sink in sinks:
+            sink.write(line)
+
+    it_a = _iter_chapter_records(path_a)
+    it_b = _iter_chapter_records(path_b)
+    a = next(it_a, None)
+    b = next(it_b, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            assert a is not None
+            ch, rec_a, rec_b = a[0], a[1], None
+            a = next(it_a, None)
+        elif a is None or b[0] < a[0]:
+            ch, rec_a, rec_b = b[0], None, b[1]
+            b = next(it_b, None)
+        else:
+            ch, rec_a, rec_b = a[0], a[1], b[1]
+            a = next(it_a, None)
+            b = next(it_b, None)
+            counts["chapters_compared"] += 1
+            delta = _delta_number(rec_a.get("overall"), rec_b.get("overall"))
+            if delta is not None:
+                score_delta_sum += delta
+                score_delta_n += 1
+
+        line = _diff_chapter(ch, rec_a, rec_b, min_score_delta)
+        if line is None:
+            continue
+        counts[line["change"]] += 1
+        if line.get("overall_delta") is not None and abs(line["overall_delta"]) > min_score_delta:
+            counts["score_changed"] += 1
+        emit(line)
+
+    summary: Dict[str, Any] = {
+        "type": "chapter_diff_summary",
+        "schema_version": 1,
+        "generated_at": _common.iso_utc_now(),
+        "run_a": {"dir": os.path.dirname(os.path.abspath(path_a)), "chapters_path": os.path.abspath(path_a)},
+        "run_b": {"dir": os.path.dirname(os.path.abspath(path_b)), "chapters_path": os.path.abspath(path_b)},
+        "min_score_delta": min_score_delta,
+        "overall_delta_mean": round(score_delta_sum / score_delta_n, 6) if score_delta_n else None,
+    }
+    summary.update(counts)
+    emit(summary)
+
+
+def _main_chapters(path_a: str, path_b: str, out_path: str, min_score_delta: float) -> None:
+    if not out_path:
+        _compare_chapters(path_a, path_b, min_score_delta, [sys.stdout])
+        return
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    if out_dir and not os.path.isdir(out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+    try:
+        out_file = open(out_path, "w", encoding="utf-8")
+    except Exception as e:
+        _die(f"failed to write to {out_path}: {e}", 1)
+    with out_file:
+        _compare_chapters(path_a, path_b, min_score_delta, [sys.stdout, out_file])
+
+
 def main() -> None:
     path_a = sys.argv[1]
     path_b = sys.argv[2]
     out_path = sys.argv[3].strip() if len(sys.argv) > 3 else ""
+    if len(sys.argv) > 4 and sys.argv[4] == "chapters":
+        _main_chapters(path_a, path_b, out_path, float(sys.argv[5]))
+        return
 
     a = _load_json(path_a)
     b = _load_json(path_b)
@@ -105,6 +300,7 @@ def main() -> None:
             "violations_by_confidence": _delta_map(a.get("violations_by_confidence"), b.get("violations_by_confidence")),
             "violations_by_layer": _delta_map(a.get("violations_by_layer"), b.get("violations_by_layer")),
             "score_overall_mean": _delta_number(score_a.get("mean"), score_b.get("mean")),
+            "stage_latency": _delta_stage_latency(a.get("stage_latency"), b.get("stage_latency")),
         },
         "score_dimensions": {},
         "notes": [],
@@ -113,6 +309,9 @@ def main() -> None:
     if _common.as_float(a.get("chapters_total")) != _common.as_float(b.get("chapters_total")):
         out["notes"].append("chapters_total differs; compare deltas with caution.")
 
+    if isinstance(a.get("stage_latency"), dict) != isinstance(b.get("stage_latency"), dict):
+        out["notes"].append("stage_latency is missing from one run (older summary or no logs/); latency deltas are null.")
+
     dims_a = a.get("score_dimensions", {})
     dims_b = b.get("score_dimensions", {})
     if dims_a or dims_b:
@@ -0,0 +1,293 @@
+"""Project-wide entity index built from run-ner.sh output (entity-index.sh).
+
+The index maps entity -> chapter -> mentions (line/snippet, as emitted by
+run-ner.sh) per entity type (characters / locations / time_markers /
+events).  It is a SQLite file with one row per (type, text, chapter), keyed
+by that triple, and is updated chapter by chapter: re-indexing a chapter
+first drops its rows, chapters whose content hash is unchanged are skipped,
+and chapters whose file is gone are dropped.  Only changed rows are written.
+
+Lookups by exact name or name prefix are primary-key range scans, so a
+query reads only the matching entities' rows (O(log n) plus the matches),
+never the whole index or any chapter text.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import sys
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import _lint_batch
+import run_ner
+
+_SCHEMA_VERSION = 2
+
+ENTITY_TYPES = ["characters", "locations", "time_markers", "events"]
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+def _chapter_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _ner_path(_compiled: Any, path: str) -> Dict[str, Any]:
+    return run_ner.ner_text(run_ner.read_chapter(path), path)
+
+
+def open_index(path: str) -> sqlite3.Connection:
+    """Open (creating if needed) the index at *path*; an index of another schema version is rebuilt."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30.0)
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    except sqlite3.DatabaseError:
+        conn.close()
+        _die(f"entity-index.sh: not an entity index (SQLite, schema_version {_SCHEMA_VERSION}): {path}", 1)
+    if row is not None and row[0] != str(_SCHEMA_VERSION):
+        # Derived data: rebuild from the chapters rather than migrate.
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS mentions")
+            conn.execute("DROP TABLE IF EXISTS chapters")
+            conn.execute("DELETE FROM meta")
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS chapters (
+            chapter INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            sha1 TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS mentions (
+            etype TEXT NOT NULL, text TEXT NOT NULL, chapter INTEGER NOT NULL, mentions TEXT NOT NULL,
+            PRIMARY KEY (etype, text, chapter)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS mentions_by_chapter ON mentions (chapter);
+        """
+    )
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(_SCHEMA_VERSION),))
+    return conn
+
+
+def open_index_readonly(path: str) -> sqlite3.Connection:
+    """Open an existing index for queries; never creates, migrates or rebuilds it."""
+    uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=30.0)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    except sqlite3.DatabaseError:
+        conn.close()
+        _die(f"entity-index.sh: not an entity index (SQLite, schema_version {_SCHEMA_VERSION}): {path}", 1)
+    if row is None or row[0] != str(_SCHEMA_VERSION):
+        conn.close()
+        found = row[0] if row is not None else "none"
+        _die(f"entity-index.sh: {path} has schema_version {found}, expected {_SCHEMA_VERSION} (run entity-index.sh update to rebuild it)", 1)
+    return conn
+
+
+def drop_chapter(conn: sqlite3.Connection, chapter: int) -> None:
+    """Remove everything *chapter* contributed to the index."""
+    conn.execute("DELETE FROM mentions WHERE chapter = ?", (chapter,))
+    conn.execute("DELETE FROM chapters WHERE chapter = ?", (chapter,))
+
+
+def add_chapter(conn: sqlite3.Connection, chapter: int, path: str, digest: str, report: Dict[str, Any]) -> None:
+    """(Re)index one chapter from its run-ner.sh report."""
+    drop_chapter(conn, chapter)
+    rows = []
+    for etype in ENTITY_TYPES:
+        for ent in report["entities"].get(etype, []):
+            rows.append((etype, ent["text"], chapter, json.dumps(ent["mentions"], ensure_ascii=False)))
+    conn.executemany("INSERT OR REPLACE INTO mentions (etype, text, chapter, mentions) VALUES (?, ?, ?, ?)", rows)
+    conn.execute("INSERT INTO chapters (chapter, path, sha1) VALUES (?, ?, ?)", (chapter, path, digest))
+
+
+class EntityIndex:
+    """Read-only query view over an open index (primary-key range lookups)."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def lookup(self, name: str, prefix: bool = False, types: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """(type, text) pairs equal to *name* (or starting with it when *prefix*)."""
+        out: List[Tuple[str, str]] = []
+        for etype in types or ENTITY_TYPES:
+            if not prefix:
+                row = self.conn.execute("SELECT 1 FROM mentions WHERE etype = ? AND text = ? LIMIT 1", (etype, name)).fetchone()
+                if row is not None:
+                    out.append((etype, name))
+                continue
+            # Every string with this prefix sorts in [name, name + U+10FFFF).
+            rows = self.conn.execute(
+                "SELECT DISTINCT text FROM mentions WHERE etype = ? AND text >= ? AND text < ? ORDER BY text",
+                (etype, name, name + "\U0010ffff"),
+            )
+            out.extend((etype, text) for (text,) in rows)
+        return out
+
+    def chapters_of(self, etype: str, text: str, lo: int, hi: int) -> List[int]:
+        rows = self.conn.execute(
+            "SELECT chapter FROM mentions WHERE etype = ? AND text = ? AND chapter BETWEEN ? AND ? ORDER BY chapter",
+            (etype, text, lo, hi),
+        )
+        return [c for (c,) in rows]
+
+    def describe(self, etype: str, text: str, lo: int, hi: int, max_chapters: int) -> Dict[str, Any]:
+        first_seen, last_seen = self.conn.execute(
+            "SELECT MIN(chapter), MAX(chapter) FROM mentions WHERE etype = ? AND text = ?", (etype, text)
+        ).fetchone()
+        (chapter_count,) = self.conn.execute(
+            "SELECT COUNT(*) FROM mentions WHERE etype = ? AND text = ? AND chapter BETWEEN ? AND ?", (etype, text, lo, hi)
+        ).fetchone()
+        # Most recent chapters last; older ones beyond max_chapters are omitted.
+        limit = max_chapters if max_chapters > 0 else -1
+        rows = self.conn.execute(
+            "SELECT chapter, mentions FROM mentions WHERE etype = ? AND text = ? AND chapter BETWEEN ? AND ?"
+            " ORDER BY chapter DESC LIMIT ?",
+            (etype, text, lo, hi, limit),
+        ).fetchall()
+        return {
+            "type": etype,
+            "text": text,
+            "first_seen": first_seen,
+            "last_seen": last_seen,
+            "chapter_count": chapter_count,
+            "chapters": [{"chapter": c, "mentions": json.loads(m)} for c, m in reversed(rows)],
+        }
+
+
+def update_main(argv: List[str]) -> None:
+    jobs = int(argv[0])
+    index_path = argv[1]
+    paths = _lint_batch.expand_chapters(argv[2:])
+    if not paths:
+        _die("entity-index.sh: no chapter files matched", 1)
+    # Directory args cover every chapter file in them: an indexed chapter whose file lived there
+    # but no longer matched (deleted or renumbered) is dropped.
+    covered_dirs = {os.path.abspath(a) for a in argv[2:] if os.path.isdir(a)}
+
+    conn = open_index(index_path)
+    known = {c: (path, sha1) for c, path, sha1 in conn.execute("SELECT chapter, path, sha1 FROM chapters")}
+    todo: List[Tuple[int, str, str]] = []
+    moved: List[Tuple[int, str]] = []
+    seen: Set[int] = set()
+    for path in paths:
+        chapter = _lint_batch.chapter_no_from_path(path)
+        if chapter is None:
+            _die(f"entity-index.sh: cannot infer chapter number from file name: {path}", 1)
+        seen.add(chapter)
+        abs_path = os.path.abspath(path)
+        digest = _chapter_digest(path)
+        prev = known.get(chapter)
+        if prev is not None and prev[1] == digest:
+            if prev[0] != abs_path:
+                moved.append((chapter, abs_path))
+            continue
+        todo.append((chapter, abs_path, digest))
+
+    stale = [
+        c
+        for c, (path, _sha1) in known.items()
+        if c not in seen and (os.path.dirname(path) in covered_dirs or not os.path.isfile(path))
+    ]
+
+    reports = _lint_batch.lint_chapters(_ner_path, None, [p for _, p, _ in todo], jobs)
+    with conn:
+        for chapter in stale:
+            drop_chapter(conn, chapter)
+        for chapter, abs_path in moved:
+            conn.execute("UPDATE chapters SET path = ? WHERE chapter = ?", (abs_path, chapter))
+        for (chapter, path, digest), report in zip(todo, reports):
+            add_chapter(conn, chapter, path, digest, report)
+
+    entities_total = {t: 0 for t in ENTITY_TYPES}
+    for etype, n in conn.execute("SELECT etype, COUNT(DISTINCT text) FROM mentions GROUP BY etype"):
+        entities_total[etype] = n
+    (chapters_total,) = conn.execute("SELECT COUNT(*) FROM chapters").fetchone()
+    conn.close()
+    out = {
+        "schema_version": 1,
+        "index_path": index_path,
+        "chapters_indexed": len(todo),
+        "chapters_unchanged": len(paths) - len(todo),
+        "chapters_removed": len(stale),
+        "chapters_total": chapters_total,
+        "entities_total": entities_total,
+    }
+    sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
+
+
+def query_main(argv: List[str]) -> None:
+    index_path = argv[0]
+    prefix = int(argv[1]) == 1
+    types = [t for t in argv[2].split(",") if t] or None
+    lo = int(argv[3]) if argv[3] else 1
+    hi = int(argv[4]) if argv[4] else sys.maxsize
+    max_chapters = int(argv[5])
+    names = argv[6:]
+
+    for t in types or []:
+        if t not in ENTITY_TYPES:
+            _die(f"entity-index.sh: unknown entity type: {t} (expected one of {', '.join(ENTITY_TYPES)})", 1)
+    if not os.path.isfile(index_path):
+        _die(f"entity-index.sh: index file not found: {index_path}", 1)
+
+    view = EntityIndex(open_index_readonly(index_path))
+    results = []
+    chapter_sets = []
+    for name in names:
+        hits = view.lookup(name, prefix=prefix, types=types)
+        matches = [view.describe(etype, text, lo, hi, max_chapters) for etype, text in hits]
+        chapters: Set[int] = set()
+        for etype, text in hits:
+            chapters.update(view.chapters_of(etype, text, lo, hi))
+        chapter_sets.append(chapters)
+        results.append({"name": name, "matches": matches})
+    view.conn.close()
+
+    out: Dict[str, Any] = {
+        "schema_version": 1,
+        "query": {
+            "names": names,
+            "prefix": prefix,
+            "types": types or ENTITY_TYPES,
+            "from_chapter": lo,
+            "to_chapter": hi if hi != sys.maxsize else None,
+        },
+        "results": results,
+    }
+    if len(names) >= 2:
+        # Chapters where every queried name appears, e.g. "where was 林枫 last in 北冥城".
+        together = sorted(set.intersection(*chapter_sets))
+        out["co_occurrence"] = {
+            "chapters": together[-max_chapters:] if max_chapters > 0 else together,
+            "chapter_count": len(together),
+            "first_chapter": together[0] if together else None,
+            "last_chapter": together[-1] if together else None,
+        }
+    sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
+
+
+def main() -> None:
+    if sys.argv[1] == "update":
+        update_main(sys.argv[2:])
+    else:
+        query_main(sys.argv[2:])
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"entity-index.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
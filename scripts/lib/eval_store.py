@@ -0,0 +1,286 @@
+"""Consolidated per-project eval store (eval-store.sh).
+
+Materializes the fields the M3 scripts extract from
+evaluations/chapter-NNN-eval.json into one SQLite file (default
+logs/eval-store.sqlite, derived data):
+
+  evals(id, name, chapter, mtime_ns, size, sha256, is_object, overall, overall_source)
+  judge_scores(eval, seq, source, score)        -- _common.extract_judge_sources
+  dimension_scores(eval, seq, dim, score)       -- _common.extract_dimension_scores
+  checks(eval, seq, layer, rule_id, status, confidence, constraint_type)
+                                                -- _common.extract_check_rows
+
+refresh() re-extracts only eval files whose (mtime_ns, size) changed and
+whose sha256 differs, and drops files that disappeared; load() then returns
+every file's record with one query per table, so consumers
+(run-regression.sh / calibrate-quality-judge.sh --eval-store) skip parsing
+thousands of JSON files.  extract_record() is the same record built from a
+parsed eval, so both paths feed consumers identical values.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import _common
+
+_SCHEMA_VERSION = 1
+
+DEFAULT_STORE_PATH = os.path.join("logs", "eval-store.sqlite")
+
+# Files modified this recently may still change within the same mtime tick;
+# they are stored without a stat fast-path so the next refresh rehashes them.
+_RACY_WINDOW_NS = 2_000_000_000
+
+Record = Dict[str, Any]
+
+# Per-record fields kept in their own tables; load() can skip any of them.
+RECORD_FIELDS = ("judge_sources", "dimension_scores", "checks")
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    _common.die(f"eval-store.sh: {msg}", exit_code)
+
+
+def extract_record(chapter: int, eval_obj: Any, fields: Sequence[str] = RECORD_FIELDS) -> Record:
+    """Store record of one parsed eval (is_object False and empty fields for a non-object).
+
+    Fields not in *fields* are left empty, as load() leaves them.
+    """
+    if not isinstance(eval_obj, dict):
+        return {
+            "chapter": chapter,
+            "is_object": False,
+            "overall": None,
+            "overall_source": None,
+            "judge_sources": {},
+            "dimension_scores": {},
+            "checks": [],
+        }
+    return {
+        "chapter": chapter,
+        "is_object": True,
+        "overall": _common.extract_overall(eval_obj),
+        "overall_source": _common.extract_overall_source(eval_obj),
+        "judge_sources": _common.extract_judge_sources(eval_obj) if "judge_sources" in fields else {},
+        "dimension_scores": _common.extract_dimension_scores(eval_obj) if "dimension_scores" in fields else {},
+        "checks": _common.extract_check_rows(eval_obj) if "checks" in fields else [],
+    }
+
+
+def open_store(path: str) -> sqlite3.Connection:
+    """Open (creating if needed) the store at *path*; an incompatible store is recreated."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if row is not None and row[0] != str(_SCHEMA_VERSION):
+        # Derived data: rebuild from the eval files rather than migrate.
+        with conn:
+            for table in ("checks", "dimension_scores", "judge_scores", "evals"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute("DELETE FROM meta")
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS evals (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            chapter INTEGER NOT NULL,
+            mtime_ns INTEGER,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            is_object INTEGER NOT NULL,
+            overall REAL,
+            overall_source TEXT
+        );
+        CREATE TABLE IF NOT EXISTS judge_scores (
+            eval INTEGER NOT NULL, seq INTEGER NOT NULL, source TEXT NOT NULL, score REAL NOT NULL,
+            PRIMARY KEY (eval, seq)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS dimension_scores (
+            eval INTEGER NOT NULL, seq INTEGER NOT NULL, dim TEXT NOT NULL, score REAL NOT NULL,
+            PRIMARY KEY (eval, seq)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS checks (
+            eval INTEGER NOT NULL, seq INTEGER NOT NULL,
+            layer TEXT NOT NULL, rule_id TEXT NOT NULL, status TEXT NOT NULL,
+            confidence TEXT NOT NULL, constraint_type TEXT,
+            PRIMARY KEY (eval, seq)
+        ) WITHOUT ROWID;
+        """
+    )
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(_SCHEMA_VERSION),))
+    return conn
+
+
+def _delete_rows(conn: sqlite3.Connection, eval_id: int) -> None:
+    for table in ("judge_scores", "dimension_scores", "checks"):
+        conn.execute(f"DELETE FROM {table} WHERE eval = ?", (eval_id,))
+
+
+def _insert_record(conn: sqlite3.Connection, eval_id: int, record: Record) -> None:
+    conn.executemany(
+        "INSERT INTO judge_scores (eval, seq, source, score) VALUES (?, ?, ?, ?)",
+        [(eval_id, i, k, v) for i, (k, v) in enumerate(record["judge_sources"].items())],
+    )
+    conn.executemany(
+        "INSERT INTO dimension_scores (eval, seq, dim, score) VALUES (?, ?, ?, ?)",
+        [(eval_id, i, k, v) for i, (k, v) in enumerate(record["dimension_scores"].items())],
+    )
+    conn.executemany(
+        "INSERT INTO checks (eval, seq, layer, rule_id, status, confidence, constraint_type) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(eval_id, i, *row) for i, row in enumerate(record["checks"])],
+    )
+
+
+def refresh(conn: sqlite3.Connection, eval_dir: str) -> Dict[str, int]:
+    """Bring the store in line with *eval_dir*.  Raises ValueError on an eval file that is not valid JSON."""
+    items = _common.find_eval_files(eval_dir)
+    known: Dict[str, Tuple[int, Optional[int], int, str]] = {
+        row[0]: (row[1], row[2], row[3], row[4]) for row in conn.execute("SELECT name, id, mtime_ns, size, sha256 FROM evals")
+    }
+    stats = {"evals": len(items), "unchanged": 0, "extracted": 0, "removed": 0}
+    with conn:
+        for chapter, path in items:
+            name = os.path.basename(path)
+            prev = known.pop(name, None)
+            st = os.stat(path)
+            if prev is not None and prev[1] == st.st_mtime_ns and prev[2] == st.st_size:
+                stats["unchanged"] += 1
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            racy = time.time_ns() - st.st_mtime_ns < _RACY_WINDOW_NS
+            mtime_ns = None if racy else st.st_mtime_ns
+            if prev is not None and prev[3] == digest:
+                conn.execute("UPDATE evals SET mtime_ns = ?, size = ? WHERE id = ?", (mtime_ns, st.st_size, prev[0]))
+                stats["unchanged"] += 1
+                continue
+            try:
+                obj = json.loads(data.decode("utf-8"))
+            except Exception as e:
+                raise ValueError(f"invalid JSON at {path}: {e}") from None
+            record = extract_record(chapter, obj)
+            if prev is not None:
+                _delete_rows(conn, prev[0])
+                conn.execute("DELETE FROM evals WHERE id = ?", (prev[0],))
+            cur = conn.execute(
+                "INSERT INTO evals (name, chapter, mtime_ns, size, sha256, is_object, overall, overall_source)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, chapter, mtime_ns, st.st_size, digest, int(record["is_object"]), record["overall"], record["overall_source"]),
+            )
+            _insert_record(conn, cur.lastrowid, record)
+            stats["extracted"] += 1
+        for eval_id, _mtime, _size, _digest in known.values():
+            _delete_rows(conn, eval_id)
+            conn.execute("DELETE FROM evals WHERE id = ?", (eval_id,))
+            stats["removed"] += 1
+    return stats
+
+
+def load(
+    conn: sqlite3.Connection,
+    eval_dir: str,
+    fields: Sequence[str] = RECORD_FIELDS,
+    check_statuses: Optional[Sequence[str]] = None,
+) -> Dict[str, Record]:
+    """Stored records keyed by eval file path (joined onto *eval_dir*, as find_eval_files returns it).
+
+    Only the *fields* tables are read (others stay empty); *check_statuses* keeps just the
+    check rows with those statuses.
+    """
+    by_id: Dict[int, Record] = {}
+    out: Dict[str, Record] = {}
+    for eval_id, name, chapter, is_object, overall, overall_source in conn.execute(
+        "SELECT id, name, chapter, is_object, overall, overall_source FROM evals"
+    ):
+        record = {
+            "chapter": chapter,
+            "is_object": bool(is_object),
+            "overall": overall,
+            "overall_source": overall_source,
+            "judge_sources": {},
+            "dimension_scores": {},
+            "checks": [],
+        }
+        by_id[eval_id] = record
+        out[os.path.join(eval_dir, name)] = record
+    if "judge_sources" in fields:
+        for eval_id, source, score in conn.execute("SELECT eval, source, score FROM judge_scores ORDER BY eval, seq"):
+            by_id[eval_id]["judge_sources"][source] = score
+    if "dimension_scores" in fields:
+        for eval_id, dim, score in conn.execute("SELECT eval, dim, score FROM dimension_scores ORDER BY eval, seq"):
+            by_id[eval_id]["dimension_scores"][dim] = score
+    if "checks" in fields:
+        query = "SELECT eval, layer, rule_id, status, confidence, constraint_type FROM checks"
+        params: List[str] = []
+        if check_statuses is not None:
+            query += f" WHERE status IN ({','.join('?' * len(check_statuses))})"
+            params = list(check_statuses)
+        for eval_id, *row in conn.execute(query + " ORDER BY eval, seq", params):
+            by_id[eval_id]["checks"].append(tuple(row))
+    return out
+
+
+def load_project(
+    project_dir: str,
+    store_path: str = "",
+    fields: Sequence[str] = RECORD_FIELDS,
+    check_statuses: Optional[Sequence[str]] = None,
+) -> Tuple[Dict[str, Record], Dict[str, int]]:
+    """Refresh the project's store (default logs/eval-store.sqlite) and load() it.  Returns (records, refresh stats)."""
+    eval_dir = os.path.join(project_dir, "evaluations")
+    conn = open_store(store_path or os.path.join(project_dir, DEFAULT_STORE_PATH))
+    try:
+        stats = refresh(conn, eval_dir)
+        return load(conn, eval_dir, fields, check_statuses), stats
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    # argv: <project_dir> <store_path or "">
+    project_dir = os.path.abspath(sys.argv[1])
+    store_path = sys.argv[2] if len(sys.argv) > 2 else ""
+    if not os.path.isdir(os.path.join(project_dir, "evaluations")):
+        _die(f"evaluations/ not found under project dir: {project_dir}", 1)
+    path = os.path.abspath(store_path or os.path.join(project_dir, DEFAULT_STORE_PATH))
+    conn = open_store(path)
+    try:
+        try:
+            stats = refresh(conn, os.path.join(project_dir, "evaluations"))
+        except ValueError as e:
+            _die(str(e), 1)
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("judge_scores", "dimension_scores", "checks")
+        }
+        chapters = conn.execute("SELECT COUNT(DISTINCT chapter) FROM evals").fetchone()[0]
+    finally:
+        conn.close()
+    out = {
+        "schema_version": 1,
+        "project_path": project_dir,
+        "store_path": path,
+        "refresh": stats,
+        "chapters": chapters,
+        "rows": counts,
+    }
+    sys.stdout.write(json.dumps(out, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"eval-store.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
@@ -0,0 +1,290 @@
+"""Deterministic AI-blacklist linter (M3+ extension point).
+
+Extracted from the heredoc in scripts/lint-blacklist.sh.
+Hit counting uses the shared Aho–Corasick matcher in _phrase_matcher.py;
+`--batch` mode (many chapters, one config load) is driven by _lint_batch.py;
+`--incremental <state.json>` re-scans only changed paragraphs via _incremental.py.
+"""
+
+import json
+import re
+import sys
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import _incremental
+import _lint_batch
+from _compiled_config import config_key, load_compiled
+from _phrase_matcher import LineIndex, PhraseMatcher
+
+# Compiled-config cache namespace; bump the suffix when compile_blacklist() output changes.
+_COMPILED_KIND = "blacklist-v2"
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+def _as_str_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        return []
+    out: List[str] = []
+    for item in value:
+        if isinstance(item, str) and item.strip():
+            out.append(item.strip())
+    return out
+
+
+def _get_whitelist_words(blacklist: Dict[str, Any]) -> Set[str]:
+    words: List[str] = []
+
+    whitelist = blacklist.get("whitelist")
+    if isinstance(whitelist, list):
+        words.extend(_as_str_list(whitelist))
+    elif isinstance(whitelist, dict):
+        words.extend(_as_str_list(whitelist.get("words")))
+
+    exemptions = blacklist.get("exemptions")
+    if isinstance(exemptions, dict):
+        words.extend(_as_str_list(exemptions.get("words")))
+
+    return set(words)
+
+
+def _unique_preserve_order(items: List[str]) -> List[str]:
+    seen: Set[str] = set()
+    out: List[str] = []
+    for item in items:
+        if item in seen:
+            continue
+        seen.add(item)
+        out.append(item)
+    return out
+
+
+def _read_bytes(path: str, what: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except Exception as e:
+        _die(f"lint-blacklist.sh: failed to read {what}: {e}", 1)
+
+
+def compile_blacklist(raw: bytes, blacklist_path: str) -> Dict[str, Any]:
+    """Parse + validate ai-blacklist.json bytes into the reusable compiled form."""
+    try:
+        blacklist = json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        _die(f"lint-blacklist.sh: invalid JSON at {blacklist_path}: {e}", 1)
+    if not isinstance(blacklist, dict):
+        _die("lint-blacklist.sh: ai-blacklist.json must be a JSON object", 1)
+
+    words = blacklist.get("words")
+    if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+        _die("lint-blacklist.sh: ai-blacklist.json.words must be a list of strings", 1)
+
+    whitelist = _get_whitelist_words(blacklist)
+
+    effective_words = [w.strip() for w in words if isinstance(w, str) and w.strip() and w.strip() not in whitelist]
+    effective_words = list(dict.fromkeys(effective_words))  # dedup preserving order
+
+    # Sort by length descending to match longest phrases first
+    effective_words.sort(key=lambda w: -len(w))
+
+    return {
+        "config_key": config_key(_COMPILED_KIND, raw),
+        "blacklist_words_count": len(words),
+        "whitelist_words_count": len(whitelist),
+        "effective_words": effective_words,
+        "matcher": PhraseMatcher(effective_words),
+    }
+
+
+def load_blacklist(blacklist_path: str) -> Dict[str, Any]:
+    """Compiled blacklist for *blacklist_path*, served from the config cache when unchanged."""
+    raw = _read_bytes(blacklist_path, "blacklist")
+    return load_compiled(_COMPILED_KIND, raw, lambda: compile_blacklist(raw, blacklist_path))
+
+
+def _build_report(
+    compiled: Dict[str, Any],
+    non_ws_chars: int,
+    counts: List[int],
+    evidence_for: Callable[[int], Tuple[List[int], List[str]]],
+    chapter_path: str,
+    blacklist_path: str,
+) -> Dict[str, Any]:
+    effective_words: List[str] = compiled["effective_words"]
+
+    hits: List[Dict[str, Any]] = []
+    total_hits = 0
+
+    for idx, (word, count) in enumerate(zip(effective_words, counts)):
+        if count <= 0:
+            continue
+        total_hits += count
+
+        # Collect line numbers and snippets from ORIGINAL text
+        line_numbers, snippets = evidence_for(idx)
+
+        hits.append(
+            {
+                "word": word,
+                "count": count,
+                "lines": line_numbers,
+                "snippets": snippets,
+            }
+        )
+
+    hits.sort(key=lambda x: (-int(x["count"]), str(x["word"])))
+
+    hits_per_kchars = 0.0
+    if non_ws_chars > 0:
+        hits_per_kchars = total_hits / (non_ws_chars / 1000.0)
+
+    return {
+        "chapter_path": chapter_path,
+        "blacklist_path": blacklist_path,
+        "chars": non_ws_chars,
+        "blacklist_words_count": compiled["blacklist_words_count"],
+        "whitelist_words_count": compiled["whitelist_words_count"],
+        "effective_words_count": len(effective_words),
+        "total_hits": total_hits,
+        "hits_per_kchars": round(hits_per_kchars, 3),
+        "hits": hits,
+    }
+
+
+def lint_text(compiled: Dict[str, Any], text: str, chapter_path: str, blacklist_path: str) -> Dict[str, Any]:
+    effective_words: List[str] = compiled["effective_words"]
+
+    non_ws_chars = len(re.sub(r"\s+", "", text))
+
+    # Longest phrases claim their spans first, preventing substring double-counting.
+    counts, occurrences = compiled["matcher"].scan(text)
+    line_index = LineIndex(text)
+
+    def evidence_for(idx: int) -> Tuple[List[int], List[str]]:
+        return line_index.evidence(occurrences[idx], len(effective_words[idx]))
+
+    return _build_report(compiled, non_ws_chars, counts, evidence_for, chapter_path, blacklist_path)
+
+
+def lint_text_incremental(
+    compiled: Dict[str, Any], text: str, chapter_path: str, blacklist_path: str, state_path: str
+) -> Dict[str, Any]:
+    """lint_text() that re-scans only paragraphs missing from the state file at *state_path*."""
+    effective_words: List[str] = compiled["effective_words"]
+    if not _incremental.phrases_are_single_line(effective_words):
+        return lint_text(compiled, text, chapter_path, blacklist_path)
+
+    entries = _incremental.load_state(state_path, _COMPILED_KIND, compiled["config_key"])
+    segments = _incremental.split_segments(text)
+    partials, new_entries = _incremental.collect_phrase_partials(compiled["matcher"], segments, None, entries)
+    _incremental.save_state(state_path, _COMPILED_KIND, compiled["config_key"], new_entries)
+
+    non_ws_chars, counts, evidence = _incremental.merge_phrase_partials(partials, len(effective_words))
+    return _build_report(compiled, non_ws_chars, counts, lambda idx: evidence[idx], chapter_path, blacklist_path)
+
+
+def read_chapter(chapter_path: str) -> str:
+    try:
+        with open(chapter_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception as e:
+        _die(f"lint-blacklist.sh: failed to read chapter: {e}", 1)
+
+
+def _lint_path(ctx: Tuple[Dict[str, Any], str], chapter_path: str) -> Dict[str, Any]:
+    compiled, blacklist_path = ctx
+    return lint_text(compiled, read_chapter(chapter_path), chapter_path, blacklist_path)
+
+
+def _new_batch_aggregate(blacklist_path: str) -> Dict[str, Any]:
+    return {
+        "blacklist_path": blacklist_path,
+        "chapters": 0,
+        "chapters_with_hits": 0,
+        "chars": 0,
+        "total_hits": 0,
+        "word_counts": {},
+        "word_chapters": {},
+    }
+
+
+def _add_batch_report(agg: Dict[str, Any], report: Dict[str, Any]) -> None:
+    agg["chapters"] += 1
+    agg["chars"] += int(report["chars"])
+    agg["total_hits"] += int(report["total_hits"])
+    if report["total_hits"] > 0:
+        agg["chapters_with_hits"] += 1
+    for h in report["hits"]:
+        word = h["word"]
+        agg["word_counts"][word] = agg["word_counts"].get(word, 0) + int(h["count"])
+        agg["word_chapters"][word] = agg["word_chapters"].get(word, 0) + 1
+
+
+def _finish_batch_aggregate(agg: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "schema_version": 1,
+        "linter": "blacklist",
+        "blacklist_path": agg["blacklist_path"],
+        "chapters": agg["chapters"],
+        "chapters_with_hits": agg["chapters_with_hits"],
+        "chars": agg["chars"],
+        "total_hits": agg["total_hits"],
+        "hits_per_kchars": _lint_batch.per_kchars(agg["total_hits"], agg["chars"]),
+        "top_words": _lint_batch.top_words(agg["word_counts"], agg["word_chapters"]),
+    }
+
+
+def batch_main(argv: List[str]) -> None:
+    jobs = int(argv[0])
+    blacklist_path = argv[1]
+    chapters = _lint_batch.expand_chapters(argv[2:])
+    if not chapters:
+        _die("lint-blacklist.sh: no chapter files matched", 1)
+
+    compiled = load_blacklist(blacklist_path)
+    reports = _lint_batch.lint_chapters(_lint_path, (compiled, blacklist_path), chapters, jobs)
+    _lint_batch.run_batch(
+        reports,
+        lambda out: json.dumps(out, ensure_ascii=False),
+        _add_batch_report,
+        _new_batch_aggregate(blacklist_path),
+        _finish_batch_aggregate,
+    )
+
+
+def main() -> None:
+    if sys.argv[1] == "--batch":
+        batch_main(sys.argv[2:])
+        return
+
+    args = sys.argv[1:]
+    state_path = None
+    if args[0] == "--incremental":
+        state_path = args[1]
+        args = args[2:]
+    chapter_path = args[0]
+    blacklist_path = args[1]
+
+    compiled = load_blacklist(blacklist_path)
+    text = read_chapter(chapter_path)
+    if state_path is None:
+        out = lint_text(compiled, text, chapter_path, blacklist_path)
+    else:
+        out = lint_text_incremental(compiled, text, chapter_path, blacklist_path, state_path)
+    sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"lint-blacklist.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
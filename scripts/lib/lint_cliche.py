@@ -0,0 +1,490 @@
+"""Deterministic web-novel cliché linter (M6.4 extension point).
+
+Extracted from the heredoc in scripts/lint-cliche.sh.
+Hit counting uses the shared Aho–Corasick matcher in _phrase_matcher.py;
+`--batch` mode (many chapters, one config load) is driven by _lint_batch.py;
+`--incremental <state.json>` re-scans only changed paragraphs via _incremental.py.
+"""
+
+import json
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import _incremental
+import _lint_batch
+from _compiled_config import config_key, load_compiled
+from _phrase_matcher import LineIndex, PhraseMatcher
+
+# Compiled-config cache namespace; bump the suffix when compile_cliche() output changes.
+_COMPILED_KIND = "cliche-v2"
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+def _as_str_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        return []
+    out: List[str] = []
+    for item in value:
+        if isinstance(item, str) and item.strip():
+            out.append(item.strip())
+    return out
+
+
+def _unique_preserve_order(items: List[str]) -> List[str]:
+    seen: Set[str] = set()
+    out: List[str] = []
+    for item in items:
+        if item in seen:
+            continue
+        seen.add(item)
+        out.append(item)
+    return out
+
+
+def _sev_rank(sev: str) -> int:
+    if sev == "warn":
+        return 1
+    if sev == "soft":
+        return 2
+    if sev == "hard":
+        return 3
+    return 0
+
+
+def _max_sev(a: str, b: str) -> str:
+    return a if _sev_rank(a) >= _sev_rank(b) else b
+
+
+def _get_whitelist_words(cfg: Dict[str, Any]) -> Set[str]:
+    words: List[str] = []
+    whitelist = cfg.get("whitelist")
+    if isinstance(whitelist, list):
+        words.extend(_as_str_list(whitelist))
+    elif isinstance(whitelist, dict):
+        words.extend(_as_str_list(whitelist.get("words")))
+    return set(words)
+
+
+def _get_exemptions(cfg: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    exemptions = cfg.get("exemptions")
+    if not isinstance(exemptions, dict):
+        return ([], [])
+    exact = _as_str_list(exemptions.get("exact"))
+    regex = _as_str_list(exemptions.get("regex"))
+    return (_unique_preserve_order(exact), _unique_preserve_order(regex))
+
+
+def _mask_literal(text: str, phrase: str) -> str:
+    if not phrase:
+        return text
+    return text.replace(phrase, "\x00" * len(phrase))
+
+
+def _mask_exemptions(text: str, exact: List[str], regex: List[str]) -> str:
+    masked = text
+    for phrase in exact:
+        masked = _mask_literal(masked, phrase)
+    for pattern in regex:
+        try:
+            re_obj = re.compile(pattern, flags=re.UNICODE)
+        except Exception:
+            continue
+        masked = re_obj.sub(lambda m: "\x00" * len(m.group(0)), masked)
+    return masked
+
+
+def _read_bytes(path: str, what: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except Exception as e:
+        _die(f"lint-cliche.sh: failed to read {what}: {e}", 1)
+
+
+def compile_cliche(raw: bytes, config_path: str) -> Dict[str, Any]:
+    """Parse + validate web-novel-cliche-lint.json bytes into the reusable compiled form."""
+    try:
+        cfg_raw = json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        _die(f"lint-cliche.sh: invalid JSON at {config_path}: {e}", 1)
+    if not isinstance(cfg_raw, dict):
+        _die("lint-cliche.sh: web-novel-cliche-lint.json must be a JSON object", 1)
+    cfg: Dict[str, Any] = cfg_raw
+
+    schema_version = cfg.get("schema_version")
+    if not isinstance(schema_version, int):
+        schema_version = 0
+    last_updated = cfg.get("last_updated")
+    if not isinstance(last_updated, str) or not last_updated.strip():
+        last_updated = None
+    else:
+        last_updated = last_updated.strip()
+
+    words_raw = cfg.get("words")
+    if words_raw is None:
+        words_raw = []
+    if not isinstance(words_raw, list) or not all(isinstance(w, str) for w in words_raw):
+        _die("lint-cliche.sh: web-novel-cliche-lint.json.words must be a list of strings", 1)
+    words_flat = _unique_preserve_order([w.strip() for w in words_raw if isinstance(w, str) and w.strip()])
+
+    categories_raw = cfg.get("categories")
+    categories: Dict[str, List[str]] = {}
+    if categories_raw is not None:
+        if not isinstance(categories_raw, dict):
+            _die("lint-cliche.sh: web-novel-cliche-lint.json.categories must be an object", 1)
+        for k, v in categories_raw.items():
+            if not isinstance(k, str) or not k.strip():
+                continue
+            categories[k] = _unique_preserve_order([w.strip() for w in _as_str_list(v) if w.strip()])
+
+    severity_raw = cfg.get("severity")
+    severity_default = "warn"
+    per_category: Dict[str, str] = {}
+    per_word: Dict[str, str] = {}
+    if severity_raw is not None:
+        if not isinstance(severity_raw, dict):
+            _die("lint-cliche.sh: web-novel-cliche-lint.json.severity must be an object", 1)
+        default_raw = severity_raw.get("default")
+        if isinstance(default_raw, str) and default_raw in ("warn", "soft", "hard"):
+            severity_default = default_raw
+        pc_raw = severity_raw.get("per_category")
+        if isinstance(pc_raw, dict):
+            for k, v in pc_raw.items():
+                if isinstance(k, str) and isinstance(v, str) and v in ("warn", "soft", "hard"):
+                    per_category[k] = v
+        pw_raw = severity_raw.get("per_word")
+        if isinstance(pw_raw, dict):
+            for k, v in pw_raw.items():
+                if isinstance(k, str) and isinstance(v, str) and v in ("warn", "soft", "hard"):
+                    per_word[k] = v
+
+    whitelist = _get_whitelist_words(cfg)
+    exemptions_exact, exemptions_regex = _get_exemptions(cfg)
+    exemptions_exact_set = set(exemptions_exact)
+
+    # Build index: word -> (categories, severity)
+    index: Dict[str, Dict[str, Any]] = {}
+
+    def _add_word(word: str, cat: Optional[str]) -> None:
+        w = word.strip()
+        if not w:
+            return
+        if w in whitelist:
+            return
+        if w in exemptions_exact_set:
+            return
+        meta = index.get(w)
+        if meta is None:
+            meta = {"categories": set(), "severity": severity_default}
+            index[w] = meta
+        if cat:
+            meta["categories"].add(cat)
+
+    for w in words_flat:
+        _add_word(w, None)
+    for cat, lst in categories.items():
+        for w in lst:
+            _add_word(w, cat)
+
+    # Resolve severities
+    for w, meta in index.items():
+        if w in per_word:
+            meta["severity"] = per_word[w]
+        else:
+            sev = severity_default
+            for cat in meta["categories"]:
+                if cat in per_category:
+                    sev = _max_sev(sev, per_category[cat])
+            meta["severity"] = sev
+
+    # Sort by length desc, then stable word sort for determinism
+    effective_words = list(index.keys())
+    effective_words.sort(key=lambda w: (-len(w), w))
+
+    return {
+        "config_key": config_key(_COMPILED_KIND, raw),
+        "schema_version": int(schema_version),
+        "last_updated": last_updated,
+        "severity_default": severity_default,
+        "index": index,
+        "exemptions_exact": exemptions_exact,
+        "exemptions_regex": exemptions_regex,
+        "effective_words": effective_words,
+        "matcher": PhraseMatcher(effective_words),
+    }
+
+
+def load_cliche(config_path: str) -> Dict[str, Any]:
+    """Compiled cliche config for *config_path*, served from the config cache when unchanged."""
+    raw = _read_bytes(config_path, "config")
+    return load_compiled(_COMPILED_KIND, raw, lambda: compile_cliche(raw, config_path))
+
+
+def _build_report(
+    compiled: Dict[str, Any],
+    non_ws_chars: int,
+    counts: List[int],
+    evidence_for: Callable[[int], Tuple[List[int], List[str]]],
+    chapter_path: str,
+) -> Dict[str, Any]:
+    severity_default: str = compiled["severity_default"]
+    index: Dict[str, Dict[str, Any]] = compiled["index"]
+    effective_words: List[str] = compiled["effective_words"]
+
+    severity_counts: Dict[str, int] = {"warn": 0, "soft": 0, "hard": 0}
+    category_counts: Dict[str, int] = {}
+    hits: List[Dict[str, Any]] = []
+    total_hits = 0
+
+    for idx, (word, count) in enumerate(zip(effective_words, counts)):
+        if count <= 0:
+            continue
+        total_hits += count
+
+        meta = index.get(word, {"categories": set(), "severity": severity_default})
+        sev = meta.get("severity", severity_default)
+        if sev not in ("warn", "soft", "hard"):
+            sev = severity_default
+        severity_counts[sev] = severity_counts.get(sev, 0) + count
+
+        cats_sorted = sorted(list(meta.get("categories", set())))
+        primary_cat = cats_sorted[0] if len(cats_sorted) > 0 else None
+        if primary_cat:
+            category_counts[primary_cat] = category_counts.get(primary_cat, 0) + count
+
+        # Evidence covers every raw occurrence in the original text (exempted/masked ones included).
+        lines, snippets = evidence_for(idx)
+        hits.append(
+            {
+                "word": word,
+                "count": count,
+                "severity": sev,
+                "category": primary_cat,
+                "categories": cats_sorted,
+                "lines": lines,
+                "snippets": snippets,
+            }
+        )
+
+    def _sort_hits_key(h: Dict[str, Any]) -> Tuple[int, int, str]:
+        return (-int(h.get("count", 0)), -_sev_rank(str(h.get("severity", "warn"))), str(h.get("word", "")))
+
+    hits.sort(key=_sort_hits_key)
+
+    def _per_k(n: int) -> float:
+        if non_ws_chars <= 0:
+            return 0.0
+        return round(float(n) / (non_ws_chars / 1000.0), 3)
+
+    hits_per_kchars = _per_k(total_hits)
+
+    by_severity = {
+        "warn": {"hits": int(severity_counts.get("warn", 0)), "hits_per_kchars": _per_k(int(severity_counts.get("warn", 0)))},
+        "soft": {"hits": int(severity_counts.get("soft", 0)), "hits_per_kchars": _per_k(int(severity_counts.get("soft", 0)))},
+        "hard": {"hits": int(severity_counts.get("hard", 0)), "hits_per_kchars": _per_k(int(severity_counts.get("hard", 0)))},
+    }
+
+    by_category: Dict[str, Any] = {}
+    for cat, n in category_counts.items():
+        by_category[cat] = {"hits": int(n), "hits_per_kchars": _per_k(int(n))}
+
+    top_hits = [
+        {"word": h["word"], "count": int(h["count"]), "severity": h["severity"], "category": h.get("category")}
+        for h in hits[:10]
+    ]
+
+    has_hard_hits = int(severity_counts.get("hard", 0)) > 0
+
+    chapter_num = 0
+    m = re.search(r"chapter-(\d+)", chapter_path)
+    if m:
+        try:
+            chapter_num = int(m.group(1))
+        except Exception:
+            chapter_num = 0
+
+    out: Dict[str, Any] = {
+        "schema_version": 1,
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "scope": {"chapter": chapter_num},
+        "config": {"schema_version": compiled["schema_version"], "last_updated": compiled["last_updated"]},
+        "mode": "script",
+        "chars": int(non_ws_chars),
+        "total_hits": int(total_hits),
+        "hits_per_kchars": float(hits_per_kchars),
+        "by_severity": by_severity,
+        "by_category": by_category,
+        "hits": hits,
+        "top_hits": top_hits,
+        "has_hard_hits": bool(has_hard_hits),
+    }
+
+    return out
+
+
+def lint_text(compiled: Dict[str, Any], text: str, chapter_path: str) -> Dict[str, Any]:
+    effective_words: List[str] = compiled["effective_words"]
+
+    masked_text = _mask_exemptions(text, compiled["exemptions_exact"], compiled["exemptions_regex"])
+    non_ws_chars = len(re.sub(r"\s+", "", text))
+
+    # Exempted spans are pre-masked; longest phrases then claim their spans first.
+    counts, occurrences = compiled["matcher"].scan(text, _incremental.null_mask(masked_text))
+    line_index = LineIndex(text)
+
+    def evidence_for(idx: int) -> Tuple[List[int], List[str]]:
+        return line_index.evidence(occurrences[idx], len(effective_words[idx]))
+
+    return _build_report(compiled, non_ws_chars, counts, evidence_for, chapter_path)
+
+
+def lint_text_incremental(compiled: Dict[str, Any], text: str, chapter_path: str, state_path: str) -> Dict[str, Any]:
+    """lint_text() that re-scans only paragraphs missing from the state file at *state_path*."""
+    effective_words: List[str] = compiled["effective_words"]
+    if not _incremental.phrases_are_single_line(effective_words):
+        return lint_text(compiled, text, chapter_path)
+
+    # Exemptions (regexes may span paragraphs) are masked over the whole text;
+    # each paragraph's partial is keyed by its text and its slice of the mask.
+    masked_text = _mask_exemptions(text, compiled["exemptions_exact"], compiled["exemptions_regex"])
+    segments = _incremental.split_segments(text)
+    masked_segments: List[str] = []
+    pos = 0
+    for segment in segments:
+        masked_segments.append(masked_text[pos : pos + len(segment)])
+        pos += len(segment)
+
+    entries = _incremental.load_state(state_path, _COMPILED_KIND, compiled["config_key"])
+    partials, new_entries = _incremental.collect_phrase_partials(compiled["matcher"], segments, masked_segments, entries)
+    _incremental.save_state(state_path, _COMPILED_KIND, compiled["config_key"], new_entries)
+
+    non_ws_chars, counts, evidence = _incremental.merge_phrase_partials(partials, len(effective_words))
+    return _build_report(compiled, non_ws_chars, counts, lambda idx: evidence[idx], chapter_path)
+
+
+def read_chapter(chapter_path: str) -> str:
+    try:
+        with open(chapter_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception as e:
+        _die(f"lint-cliche.sh: failed to read chapter: {e}", 1)
+
+
+def _lint_path(compiled: Dict[str, Any], chapter_path: str) -> Dict[str, Any]:
+    return lint_text(compiled, read_chapter(chapter_path), chapter_path)
+
+
+def _new_batch_aggregate(compiled: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "config": {"schema_version": compiled["schema_version"], "last_updated": compiled["last_updated"]},
+        "chapters": 0,
+        "chapters_with_hard_hits": 0,
+        "chars": 0,
+        "total_hits": 0,
+        "severity_counts": {"warn": 0, "soft": 0, "hard": 0},
+        "category_counts": {},
+        "word_counts": {},
+        "word_chapters": {},
+        "word_meta": {},
+    }
+
+
+def _add_batch_report(agg: Dict[str, Any], report: Dict[str, Any]) -> None:
+    agg["chapters"] += 1
+    agg["chars"] += int(report["chars"])
+    agg["total_hits"] += int(report["total_hits"])
+    if report["has_hard_hits"]:
+        agg["chapters_with_hard_hits"] += 1
+    for sev, item in report["by_severity"].items():
+        agg["severity_counts"][sev] = agg["severity_counts"].get(sev, 0) + int(item["hits"])
+    for cat, item in report["by_category"].items():
+        agg["category_counts"][cat] = agg["category_counts"].get(cat, 0) + int(item["hits"])
+    for h in report["hits"]:
+        word = h["word"]
+        agg["word_counts"][word] = agg["word_counts"].get(word, 0) + int(h["count"])
+        agg["word_chapters"][word] = agg["word_chapters"].get(word, 0) + 1
+        agg["word_meta"][word] = {"severity": h["severity"], "category": h.get("category")}
+
+
+def _finish_batch_aggregate(agg: Dict[str, Any]) -> Dict[str, Any]:
+    chars = agg["chars"]
+    top = _lint_batch.top_words(agg["word_counts"], agg["word_chapters"])
+    for item in top:
+        item.update(agg["word_meta"][item["word"]])
+    return {
+        "schema_version": 1,
+        "linter": "cliche",
+        "config": agg["config"],
+        "chapters": agg["chapters"],
+        "chapters_with_hard_hits": agg["chapters_with_hard_hits"],
+        "chars": chars,
+        "total_hits": agg["total_hits"],
+        "hits_per_kchars": _lint_batch.per_kchars(agg["total_hits"], chars),
+        "by_severity": {
+            sev: {"hits": n, "hits_per_kchars": _lint_batch.per_kchars(n, chars)}
+            for sev, n in agg["severity_counts"].items()
+        },
+        "by_category": {
+            cat: {"hits": n, "hits_per_kchars": _lint_batch.per_kchars(n, chars)}
+            for cat, n in sorted(agg["category_counts"].items())
+        },
+        "top_words": top,
+    }
+
+
+def batch_main(argv: List[str]) -> None:
+    jobs = int(argv[0])
+    config_path = argv[1]
+    chapters = _lint_batch.expand_chapters(argv[2:])
+    if not chapters:
+        _die("lint-cliche.sh: no chapter files matched", 1)
+
+    compiled = load_cliche(config_path)
+    reports = _lint_batch.lint_chapters(_lint_path, compiled, chapters, jobs)
+    _lint_batch.run_batch(
+        reports,
+        lambda out: json.dumps(out, ensure_ascii=False),
+        _add_batch_report,
+        _new_batch_aggregate(compiled),
+        _finish_batch_aggregate,
+    )
+
+
+def main() -> None:
+    if sys.argv[1] == "--batch":
+        batch_main(sys.argv[2:])
+        return
+
+    args = sys.argv[1:]
+    state_path = None
+    if args[0] == "--incremental":
+        state_path = args[1]
+        args = args[2:]
+    chapter_path = args[0]
+    config_path = args[1]
+
+    compiled = load_cliche(config_path)
+    text = read_chapter(chapter_path)
+    if state_path is None:
+        out = lint_text(compiled, text, chapter_path)
+    else:
+        out = lint_text_incremental(compiled, text, chapter_path, state_path)
+    sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"lint-cliche.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
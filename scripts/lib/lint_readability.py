@@ -0,0 +1,506 @@
+"""Deterministic mobile readability linter (M7R.3 extension point).
+
+Extracted from the heredoc in scripts/lint-readability.sh.
+`--batch` mode (many chapters, one profile load) is driven by _lint_batch.py;
+`--incremental <state.json>` reuses unchanged paragraphs' features via _incremental.py.
+"""
+
+import json
+import math
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import _incremental
+import _lint_batch
+
+_INCREMENTAL_KIND = "readability-paragraphs-v1"
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+def _load_json(path: str) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        _die(f"lint-readability.sh: invalid JSON at {path}: {e}", 1)
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception as e:
+        _die(f"lint-readability.sh: failed to read {path}: {e}", 1)
+
+
+def _count_non_whitespace_chars(text: str) -> int:
+    compact = re.sub(r"\s+", "", text, flags=re.UNICODE)
+    return len(compact)
+
+
+def _strip_code_fences(text: str) -> str:
+    # Best-effort removal of fenced code blocks to avoid counting them as prose paragraphs.
+    return re.sub(r"(^|\n)```[\s\S]*?\n```[ \t]*(?=\n|$)", "\n", text, flags=re.UNICODE)
+
+
+def _is_atx_heading_line(line: str) -> bool:
+    return re.match(r"^(?:\ufeff)? {0,3}#{1,6}(?!#)\s+.*$", line, flags=re.UNICODE) is not None
+
+
+def _split_paragraphs(text: str) -> List[str]:
+    cleaned = _strip_code_fences(text).replace("\r\n", "\n").replace("\r", "\n")
+    lines = cleaned.split("\n")
+
+    out: List[str] = []
+    buf: List[str] = []
+
+    def flush() -> None:
+        nonlocal buf
+        if not buf:
+            return
+        raw = "\n".join(buf).rstrip()
+        buf = []
+        if not raw.strip():
+            return
+        out.append(raw)
+
+    for line in lines:
+        if not line.strip():
+            flush()
+            continue
+        buf.append(line)
+    flush()
+    return out
+
+
+def _paragraph_features(raw: str) -> Dict[str, Any]:
+    first_line = ""
+    for l in raw.split("\n"):
+        if l.strip():
+            first_line = l
+            break
+    return {
+        "chars": _count_non_whitespace_chars(raw),
+        "is_heading": _is_atx_heading_line(first_line),
+        "has_dialogue": bool(re.search(r'["“”]', raw, flags=re.UNICODE)),
+    }
+
+
+def _extract_paragraphs(
+    text: str, features_for: Callable[[str], Dict[str, Any]] = _paragraph_features
+) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for raw in _split_paragraphs(text):
+        features = features_for(raw)
+        out.append(
+            {
+                "index": len(out) + 1,
+                "raw": raw,
+                "chars": features["chars"],
+                "is_heading": features["is_heading"],
+                "has_dialogue": features["has_dialogue"],
+                "is_single_line": "\n" not in raw,
+            }
+        )
+    return out
+
+
+def _snippet(text: str, max_len: int) -> str:
+    s = re.sub(r"\s+", " ", text.strip(), flags=re.UNICODE)
+    if len(s) <= max_len:
+        return s
+    return s[: max(0, max_len - 1)] + "…"
+
+
+def _require_int(v: Any, field: str) -> int:
+    if not isinstance(v, int) or isinstance(v, bool):
+        _die(f"lint-readability.sh: invalid platform-profile.json: {field} must be an int", 1)
+    return v
+
+
+def _require_str(v: Any, field: str) -> str:
+    if not isinstance(v, str) or not v.strip():
+        _die(f"lint-readability.sh: invalid platform-profile.json: {field} must be a non-empty string", 1)
+    return v.strip()
+
+
+def _require_bool(v: Any, field: str) -> bool:
+    if not isinstance(v, bool):
+        _die(f"lint-readability.sh: invalid platform-profile.json: {field} must be a boolean", 1)
+    return v
+
+
+def _parse_mobile_policy(profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    readability = profile.get("readability")
+    if readability is None:
+        return None
+    if not isinstance(readability, dict):
+        _die("lint-readability.sh: invalid platform-profile.json: readability must be an object", 1)
+    mobile = readability.get("mobile")
+    if mobile is None:
+        return None
+    if not isinstance(mobile, dict):
+        _die("lint-readability.sh: invalid platform-profile.json: readability.mobile must be an object", 1)
+
+    enabled = _require_bool(mobile.get("enabled"), "readability.mobile.enabled")
+    max_paragraph_chars = _require_int(mobile.get("max_paragraph_chars"), "readability.mobile.max_paragraph_chars")
+    if max_paragraph_chars < 1:
+        _die("lint-readability.sh: invalid platform-profile.json: readability.mobile.max_paragraph_chars must be >= 1", 1)
+    max_consecutive = _require_int(
+        mobile.get("max_consecutive_exposition_paragraphs"),
+        "readability.mobile.max_consecutive_exposition_paragraphs",
+    )
+    if max_consecutive < 1:
+        _die(
+            "lint-readability.sh: invalid platform-profile.json: readability.mobile.max_consecutive_exposition_paragraphs must be >= 1",
+            1,
+        )
+    blocking = _require_str(mobile.get("blocking_severity"), "readability.mobile.blocking_severity")
+    if blocking not in ("hard_only", "soft_and_hard"):
+        _die(
+            "lint-readability.sh: invalid platform-profile.json: readability.mobile.blocking_severity must be 'hard_only' or 'soft_and_hard'",
+            1,
+        )
+
+    return {
+        "enabled": enabled,
+        "max_paragraph_chars": max_paragraph_chars,
+        "max_consecutive_exposition_paragraphs": max_consecutive,
+        "blocking_severity": blocking,
+    }
+
+
+def _overlong_severity(chars: int, max_chars: int) -> str:
+    return "hard" if chars > math.ceil(max_chars * 1.5) else "soft"
+
+
+def _exposition_run_severity(run_len: int, max_run: int) -> str:
+    return "hard" if run_len >= (max_run + 2) else "soft"
+
+
+def _dialogue_dense_severity(quote_count: int, chars: int, max_chars: int) -> str:
+    if quote_count >= 10:
+        return "hard"
+    if chars > max_chars:
+        return "hard"
+    return "soft"
+
+
+def load_policy(profile_path: str) -> Optional[Dict[str, Any]]:
+    """Parse + validate readability.mobile from platform-profile.json (None when absent)."""
+    profile_raw = _load_json(profile_path)
+    if not isinstance(profile_raw, dict):
+        _die("lint-readability.sh: platform-profile.json must be a JSON object", 1)
+    profile: Dict[str, Any] = profile_raw
+    return _parse_mobile_policy(profile)
+
+
+def policy_enabled(policy: Optional[Dict[str, Any]]) -> bool:
+    return policy is not None and bool(policy.get("enabled", False))
+
+
+def disabled_report(policy: Optional[Dict[str, Any]], chapter_no: int) -> Dict[str, Any]:
+    # Still emit a valid report for introspection, but with no issues.
+    return {
+        "schema_version": 1,
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "scope": {"chapter": chapter_no},
+        "policy": policy
+        or {
+            "enabled": False,
+            "max_paragraph_chars": 1,
+            "max_consecutive_exposition_paragraphs": 1,
+            "blocking_severity": "hard_only",
+        },
+        "issues": [],
+    }
+
+
+def lint_text(
+    policy: Dict[str, Any], chapter_text: str, chapter_no: int, paragraphs: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Readability report for one chapter under an enabled *policy* (*paragraphs* precomputed or extracted)."""
+    if paragraphs is None:
+        paragraphs = _extract_paragraphs(chapter_text)
+
+    max_para = int(policy["max_paragraph_chars"])
+    max_expo = int(policy["max_consecutive_exposition_paragraphs"])
+
+    issues: List[Dict[str, Any]] = []
+
+    # Chapter-level quote / punctuation consistency (warn-only).
+    has_ascii_quotes = '"' in chapter_text
+    has_curly_quotes = bool(re.search(r"[“”]", chapter_text, flags=re.UNICODE))
+    if has_ascii_quotes and has_curly_quotes:
+        issues.append(
+            {
+                "id": "readability.mobile.mixed_quote_styles",
+                "severity": "warn",
+                "summary": "Mixed quote styles detected (ASCII '\"' and curly quotes “”).",
+                "suggestion": "Use a single quote style consistently to improve mobile readability.",
+            }
+        )
+
+    has_ascii_ellipsis = "..." in chapter_text
+    has_cjk_ellipsis = "……" in chapter_text
+    if has_ascii_ellipsis and has_cjk_ellipsis:
+        issues.append(
+            {
+                "id": "readability.mobile.mixed_ellipsis_styles",
+                "severity": "warn",
+                "summary": "Mixed ellipsis styles detected ('...' and '……').",
+                "suggestion": "Use a single ellipsis style consistently.",
+            }
+        )
+
+    punctuation_pairs = [
+        (",", "，", "readability.mobile.mixed_comma_styles", "Mixed comma styles detected (',' and '，')."),
+        (".", "。", "readability.mobile.mixed_period_styles", "Mixed period styles detected ('.' and '。')."),
+        ("?", "？", "readability.mobile.mixed_question_mark_styles", "Mixed question mark styles detected ('?' and '？')."),
+        ("!", "！", "readability.mobile.mixed_exclamation_styles", "Mixed exclamation mark styles detected ('!' and '！')."),
+    ]
+    for ascii_ch, full_ch, issue_id, summary in punctuation_pairs:
+        if ascii_ch in chapter_text and full_ch in chapter_text:
+            issues.append(
+                {
+                    "id": issue_id,
+                    "severity": "warn",
+                    "summary": summary,
+                    "suggestion": "Use a single punctuation width style consistently (prefer fullwidth for Chinese prose).",
+                }
+            )
+
+    # Per-paragraph checks.
+    for p in paragraphs:
+        if p.get("is_heading"):
+            continue
+        chars = int(p.get("chars") or 0)
+        raw = str(p.get("raw") or "")
+
+        if chars > max_para:
+            sev = _overlong_severity(chars, max_para)
+            issues.append(
+                {
+                    "id": "readability.mobile.overlong_paragraph",
+                    "severity": sev,
+                    "summary": f"Overlong paragraph ({chars} chars > max {max_para}).",
+                    "evidence": _snippet(raw, 140),
+                    "suggestion": "Split the paragraph into 2–3 shorter paragraphs around actions/dialogue beats.",
+                    "paragraph_index": int(p.get("index") or 0),
+                    "paragraph_chars": chars,
+                }
+            )
+
+        has_dialogue = bool(p.get("has_dialogue"))
+        if has_dialogue and bool(p.get("is_single_line")):
+            quote_count = len(re.findall(r'["“”]', raw, flags=re.UNICODE))
+            if quote_count >= 6:
+                sev = _dialogue_dense_severity(quote_count, chars, max_para)
+                issues.append(
+                    {
+                        "id": "readability.mobile.dialogue_dense_paragraph",
+                        "severity": sev,
+                        "summary": "Dialogue-heavy paragraph may hurt mobile readability (many quotes in one paragraph).",
+                        "evidence": _snippet(raw, 140),
+                        "suggestion": "Split dialogue into separate paragraphs per speaker and keep each paragraph short.",
+                        "paragraph_index": int(p.get("index") or 0),
+                        "paragraph_chars": chars,
+                    }
+                )
+
+    # Consecutive exposition blocks: consecutive non-heading paragraphs with no dialogue.
+    run_start = 0
+    run_len = 0
+
+    def flush_run() -> None:
+        nonlocal run_start, run_len
+        if run_len <= max_expo:
+            run_start = 0
+            run_len = 0
+            return
+        start_idx = run_start
+        end_idx = run_start + run_len - 1
+        sev = _exposition_run_severity(run_len, max_expo)
+        issues.append(
+            {
+                "id": "readability.mobile.exposition_run_too_long",
+                "severity": sev,
+                "summary": f"Too many consecutive exposition paragraphs ({run_len} > max {max_expo}).",
+                "evidence": f"paragraphs {start_idx}-{end_idx}",
+                "suggestion": "Break up exposition with dialogue/action beats, and add whitespace for mobile scanning.",
+            }
+        )
+        run_start = 0
+        run_len = 0
+
+    for p in paragraphs:
+        if p.get("is_heading"):
+            flush_run()
+            continue
+        is_exposition = not bool(p.get("has_dialogue"))
+        if not is_exposition:
+            flush_run()
+            continue
+        if run_len == 0:
+            run_start = int(p.get("index") or 0)
+        run_len += 1
+    flush_run()
+
+    out = {
+        "schema_version": 1,
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "scope": {"chapter": chapter_no},
+        "policy": {
+            "enabled": bool(policy["enabled"]),
+            "max_paragraph_chars": max_para,
+            "max_consecutive_exposition_paragraphs": max_expo,
+            "blocking_severity": str(policy["blocking_severity"]),
+        },
+        "issues": issues,
+    }
+    return out
+
+
+def lint_chapter(policy: Optional[Dict[str, Any]], chapter_path: str, chapter_no: int) -> Dict[str, Any]:
+    # A disabled policy never reads the chapter.
+    if not policy_enabled(policy):
+        return disabled_report(policy, chapter_no)
+    return lint_text(policy, _read_text(chapter_path), chapter_no)
+
+
+def lint_chapter_incremental(
+    policy: Optional[Dict[str, Any]], chapter_path: str, chapter_no: int, state_path: str
+) -> Dict[str, Any]:
+    """lint_chapter() reusing per-paragraph features stored in the state file at *state_path*.
+
+    Paragraph features do not depend on the policy, so the state survives profile edits.
+    """
+    if not policy_enabled(policy):
+        return disabled_report(policy, chapter_no)
+    chapter_text = _read_text(chapter_path)
+
+    entries = _incremental.load_state(state_path, _INCREMENTAL_KIND, "")
+    new_entries: Dict[str, Any] = {}
+
+    def features_for(raw: str) -> Dict[str, Any]:
+        key = _incremental.segment_key(raw)
+        features = entries.get(key)
+        if features is None:
+            features = _paragraph_features(raw)
+        new_entries[key] = features
+        return features
+
+    paragraphs = _extract_paragraphs(chapter_text, features_for)
+    _incremental.save_state(state_path, _INCREMENTAL_KIND, "", new_entries)
+    return lint_text(policy, chapter_text, chapter_no, paragraphs)
+
+
+def _lint_path(policy: Optional[Dict[str, Any]], chapter_path: str) -> Dict[str, Any]:
+    return lint_chapter(policy, chapter_path, int(_lint_batch.chapter_no_from_path(chapter_path) or 0))
+
+
+def _blocking_severities(policy: Optional[Dict[str, Any]]) -> Tuple[str, ...]:
+    if policy is not None and policy.get("blocking_severity") == "soft_and_hard":
+        return ("soft", "hard")
+    return ("hard",)
+
+
+def _new_batch_aggregate(policy: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "blocking": _blocking_severities(policy) if policy_enabled(policy) else (),
+        "chapters": 0,
+        "chapters_with_issues": 0,
+        "chapters_blocked": 0,
+        "issues_total": 0,
+        "by_severity": {"warn": 0, "soft": 0, "hard": 0},
+        "by_id": {},
+    }
+
+
+def _add_batch_report(agg: Dict[str, Any], report: Dict[str, Any]) -> None:
+    issues = report["issues"]
+    agg["chapters"] += 1
+    agg["issues_total"] += len(issues)
+    if issues:
+        agg["chapters_with_issues"] += 1
+    if any(i["severity"] in agg["blocking"] for i in issues):
+        agg["chapters_blocked"] += 1
+    for i in issues:
+        agg["by_severity"][i["severity"]] = agg["by_severity"].get(i["severity"], 0) + 1
+        agg["by_id"][i["id"]] = agg["by_id"].get(i["id"], 0) + 1
+    agg["policy"] = report["policy"]
+
+
+def _finish_batch_aggregate(agg: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "schema_version": 1,
+        "linter": "readability",
+        "policy": agg.get("policy"),
+        "chapters": agg["chapters"],
+        "chapters_with_issues": agg["chapters_with_issues"],
+        "chapters_blocked": agg["chapters_blocked"],
+        "issues_total": agg["issues_total"],
+        "by_severity": agg["by_severity"],
+        "top_issue_ids": [
+            {"id": issue_id, "count": n} for issue_id, n in sorted(agg["by_id"].items(), key=lambda kv: (-kv[1], kv[0]))
+        ],
+    }
+
+
+def batch_main(argv: List[str]) -> None:
+    jobs = int(argv[0])
+    profile_path = argv[1]
+    chapters = _lint_batch.expand_chapters(argv[2:])
+    if not chapters:
+        _die("lint-readability.sh: no chapter files matched", 1)
+    for chapter_path in chapters:
+        if not _lint_batch.chapter_no_from_path(chapter_path):
+            _die(f"lint-readability.sh: cannot infer chapter_no from file name (expected chapter-NNN): {chapter_path}", 1)
+
+    policy = load_policy(profile_path)
+    reports = _lint_batch.lint_chapters(_lint_path, policy, chapters, jobs)
+    _lint_batch.run_batch(
+        reports,
+        lambda out: json.dumps(out, ensure_ascii=False, separators=(",", ":")),
+        _add_batch_report,
+        _new_batch_aggregate(policy),
+        _finish_batch_aggregate,
+    )
+
+
+def main() -> None:
+    if sys.argv[1] == "--batch":
+        batch_main(sys.argv[2:])
+        return
+
+    args = sys.argv[1:]
+    state_path = None
+    if args[0] == "--incremental":
+        state_path = args[1]
+        args = args[2:]
+    chapter_path = args[0]
+    profile_path = args[1]
+    chapter_no = int(args[2])
+
+    policy = load_policy(profile_path)
+    if state_path is None:
+        out = lint_chapter(policy, chapter_path, chapter_no)
+    else:
+        out = lint_chapter_incremental(policy, chapter_path, chapter_no, state_path)
+    sys.stdout.write(json.dumps(out, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"lint-readability.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
@@ -0,0 +1,331 @@
+"""Persistent lint server: keeps compiled lint configs warm between calls.
+
+Speaks line-delimited JSON-RPC 2.0 over stdin/stdout (default) or a Unix
+socket (one request per line, one response per line).  Each method returns
+exactly the JSON object the matching script prints:
+
+    lint_blacklist    {chapter_path, blacklist_path, [text]}
+    lint_cliche       {chapter_path, config_path, [text]}
+    lint_readability  {chapter_path, profile_path, chapter_no, [text]}
+    run_ner           {chapter_path, [text]}
+    ping              {}
+    shutdown          {}
+
+`text` lints an in-memory draft instead of reading chapter_path (which is
+then only echoed in the report).  Configs are recompiled when their
+(mtime, size) changes.  Script validation failures become JSON-RPC errors
+with code -32001 (script exit 1) or -32002 (script exit 2) and the script's
+stderr message.
+
+Requests run on a thread pool so a slow chapter never blocks other callers;
+the linters are CPU-bound, so throughput stays that of one core.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import lint_blacklist
+import lint_cliche
+import lint_readability
+import run_ner
+
+_SCRIPT_ERROR_CODES = {1: -32001, 2: -32002}
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+class _InvalidParams(Exception):
+    pass
+
+
+class _StderrRouter(io.TextIOBase):
+    """sys.stderr stand-in: captures writes per request thread, passes others through."""
+
+    def __init__(self, target: Any) -> None:
+        self._target = target
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        buf = io.StringIO()
+        self._local.buf = buf
+        try:
+            yield buf
+        finally:
+            self._local.buf = None
+
+    def write(self, s: str) -> int:
+        buf = getattr(self._local, "buf", None)
+        (buf if buf is not None else self._target).write(s)
+        return len(s)
+
+    def flush(self) -> None:
+        self._target.flush()
+
+
+class _ConfigCache:
+    """Compiled configs by absolute path, reloaded when the file's (mtime_ns, size) changes."""
+
+    def __init__(self, load: Callable[[str], Any]) -> None:
+        self._load = load
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+    def get(self, path: str) -> Any:
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size)
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == sig:
+            return entry[1]
+        compiled = self._load(path)
+        with self._lock:
+            self._entries[key] = (sig, compiled)
+        return compiled
+
+
+def _str_param(params: Dict[str, Any], name: str) -> str:
+    value = params.get(name)
+    if not isinstance(value, str) or not value:
+        raise _InvalidParams(f"params.{name} must be a non-empty string")
+    return value
+
+
+def _text_param(params: Dict[str, Any]) -> Optional[str]:
+    value = params.get("text")
+    if value is not None and not isinstance(value, str):
+        raise _InvalidParams("params.text must be a string")
+    return value
+
+
+def _require_file(path: str, message: str) -> None:
+    if not os.path.isfile(path):
+        _die(message, 1)
+
+
+class LintServer:
+    def __init__(self) -> None:
+        self.blacklists = _ConfigCache(lint_blacklist.load_blacklist)
+        self.cliche_configs = _ConfigCache(lint_cliche.load_cliche)
+        self.profiles = _ConfigCache(lint_readability.load_policy)
+        self.methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "lint_blacklist": self.lint_blacklist,
+            "lint_cliche": self.lint_cliche,
+            "lint_readability": self.lint_readability,
+            "run_ner": self.run_ner,
+            "ping": lambda params: {"ok": True},
+        }
+
+    def lint_blacklist(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chapter_path = _str_param(params, "chapter_path")
+        blacklist_path = _str_param(params, "blacklist_path")
+        text = _text_param(params)
+        if text is None:
+            _require_file(chapter_path, f"lint-blacklist.sh: chapter file not found: {chapter_path}")
+        _require_file(blacklist_path, f"lint-blacklist.sh: blacklist file not found: {blacklist_path}")
+        compiled = self.blacklists.get(blacklist_path)
+        if text is None:
+            text = lint_blacklist.read_chapter(chapter_path)
+        return lint_blacklist.lint_text(compiled, text, chapter_path, blacklist_path)
+
+    def lint_cliche(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chapter_path = _str_param(params, "chapter_path")
+        config_path = _str_param(params, "config_path")
+        text = _text_param(params)
+        if text is None:
+            _require_file(chapter_path, f"lint-cliche.sh: chapter file not found: {chapter_path}")
+        _require_file(config_path, f"lint-cliche.sh: config file not found: {config_path}")
+        compiled = self.cliche_configs.get(config_path)
+        if text is None:
+            text = lint_cliche.read_chapter(chapter_path)
+        return lint_cliche.lint_text(compiled, text, chapter_path)
+
+    def lint_readability(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chapter_path = _str_param(params, "chapter_path")
+        profile_path = _str_param(params, "profile_path")
+        text = _text_param(params)
+        chapter_no = params.get("chapter_no")
+        if text is None:
+            _require_file(chapter_path, f"lint-readability.sh: chapter file not found: {chapter_path}")
+        _require_file(profile_path, f"lint-readability.sh: platform profile file not found: {profile_path}")
+        if not isinstance(chapter_no, int) or isinstance(chapter_no, bool) or chapter_no <= 0:
+            _die("lint-readability.sh: chapter_no must be an int >= 1", 1)
+        policy = self.profiles.get(profile_path)
+        if text is None:
+            return lint_readability.lint_chapter(policy, chapter_path, chapter_no)
+        if not lint_readability.policy_enabled(policy):
+            return lint_readability.disabled_report(policy, chapter_no)
+        return lint_readability.lint_text(policy, text, chapter_no)
+
+    def run_ner(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chapter_path = _str_param(params, "chapter_path")
+        text = _text_param(params)
+        if text is None:
+            _require_file(chapter_path, f"run-ner.sh: chapter file not found: {chapter_path}")
+            text = run_ner.read_chapter(chapter_path)
+        elif text.startswith("\ufeff"):
+            # Match run-ner.sh's utf-8-sig decoding.
+            text = text[1:]
+        return run_ner.ner_text(text, chapter_path)
+
+    def handle_line(self, line: str, stderr: _StderrRouter) -> Optional[Dict[str, Any]]:
+        """Response for one request line (None for notifications)."""
+        try:
+            req = json.loads(line)
+        except Exception as e:
+            return _error(None, -32700, f"parse error: {e}")
+        if not isinstance(req, dict) or not isinstance(req.get("method"), str):
+            return _error(None, -32600, "invalid request")
+        req_id = req.get("id")
+        is_notification = "id" not in req
+        method = self.methods.get(req["method"])
+        params = req.get("params", {})
+        if method is None:
+            resp = _error(req_id, -32601, f"method not found: {req['method']}")
+        elif not isinstance(params, dict):
+            resp = _error(req_id, -32602, "params must be an object")
+        else:
+            with stderr.capture() as buf:
+                try:
+                    resp = {"jsonrpc": "2.0", "id": req_id, "result": method(params)}
+                except _InvalidParams as e:
+                    resp = _error(req_id, -32602, str(e))
+                except SystemExit as e:
+                    code = e.code if isinstance(e.code, int) else 2
+                    message = buf.getvalue().strip() or "script failed"
+                    resp = _error(req_id, _SCRIPT_ERROR_CODES.get(code, -32002), message, {"exit_code": code})
+                except Exception as e:
+                    resp = _error(req_id, -32002, f"unexpected error: {e}", {"exit_code": 2})
+        return None if is_notification else resp
+
+
+def _error(req_id: Any, code: int, message: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    err: Dict[str, Any] = {"code": code, "message": message}
+    if data is not None:
+        err["data"] = data
+    return {"jsonrpc": "2.0", "id": req_id, "error": err}
+
+
+def _is_shutdown(line: str) -> bool:
+    try:
+        req = json.loads(line)
+    except Exception:
+        return False
+    return isinstance(req, dict) and req.get("method") == "shutdown"
+
+
+def _encode(resp: Dict[str, Any]) -> bytes:
+    return (json.dumps(resp, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def serve_stdio(server: LintServer, stderr: _StderrRouter, workers: int) -> None:
+    out = sys.stdout.buffer
+    out_lock = threading.Lock()
+
+    def respond(resp: Optional[Dict[str, Any]]) -> None:
+        if resp is None:
+            return
+        with out_lock:
+            out.write(_encode(resp))
+            out.flush()
+
+    def run(line: str) -> None:
+        respond(server.handle_line(line, stderr))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for raw in sys.stdin.buffer:
+            line = raw.decode("utf-8", errors="replace").strip()
+            if not line:
+                continue
+            if _is_shutdown(line):
+                req_id = json.loads(line).get("id")
+                pool.shutdown(wait=True)
+                respond({"jsonrpc": "2.0", "id": req_id, "result": {"ok": True}})
+                return
+            pool.submit(run, line)
+
+
+def serve_socket(server: LintServer, stderr: _StderrRouter, socket_path: str) -> None:
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for raw in self.rfile:
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                if _is_shutdown(line):
+                    self.wfile.write(_encode({"jsonrpc": "2.0", "id": json.loads(line).get("id"), "result": {"ok": True}}))
+                    threading.Thread(target=unix_server.shutdown, daemon=True).start()
+                    return
+                resp = server.handle_line(line, stderr)
+                if resp is not None:
+                    self.wfile.write(_encode(resp))
+
+    if os.path.exists(socket_path):
+        # A leftover socket from a crashed server; refuse to clobber anything else.
+        if not _is_stale_socket(socket_path):
+            _die(f"lint-server.sh: socket path in use: {socket_path}", 1)
+        os.unlink(socket_path)
+
+    socketserver.ThreadingUnixStreamServer.daemon_threads = True
+    unix_server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=unix_server.shutdown, daemon=True).start())
+    try:
+        unix_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        unix_server.server_close()
+        with contextlib.suppress(OSError):
+            os.unlink(socket_path)
+
+
+def _is_stale_socket(path: str) -> bool:
+    if not stat.S_ISSOCK(os.stat(path).st_mode):
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        return True
+    finally:
+        probe.close()
+    return False
+
+
+def main() -> None:
+    socket_path = sys.argv[1]
+    workers = int(sys.argv[2])
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+
+    stderr = _StderrRouter(sys.stderr)
+    sys.stderr = stderr
+    server = LintServer()
+    if socket_path:
+        serve_socket(server, stderr, socket_path)
+    else:
+        serve_stdio(server, stderr, workers)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"lint-server.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
@@ -0,0 +1,379 @@
+"""Deterministic foreshadowing query (M3+ extension point).
+
+Extracted from the heredoc in scripts/query-foreshadow.sh.
+
+Relevance is interval stabbing: every unresolved item becomes one or two
+chapter intervals (plan: target_resolve_range and the planted chapter;
+global: target_resolve_range, open-ended for short items so they stay
+relevant once overdue).  The intervals go into an SQLite R*Tree, built from
+global.json + the volume plan and kept in the lint cache dir
+(_compiled_config.cache_dir()), so a chapter query reads O(log n + k) rows
+instead of loading the index.  Freshness is a stat() of both files against
+the size/mtime stored with the index; the files are read and hashed only
+when that differs, and re-parsed only when their content hash changes.
+
+--range / --chapters answer many chapters from one index open (JSONL, one
+single-chapter result per line) and close with a range_summary of items
+entering / leaving relevance.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import _compiled_config
+
+# Bump when the index layout changes.
+_INDEX_KIND = "foreshadow-index-v2"
+
+# R*Tree coordinates are 32-bit ints; open (short) intervals end here.
+OPEN_END = 2**31 - 1
+
+# A source stat()ed within this long of its mtime may still be rewritten in the same
+# mtime tick, so its stat alone does not prove the index fresh.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+def _load_json(path: str) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        _die(f"query-foreshadow.sh: invalid JSON at {path}: {e}", 1)
+
+
+def _read_bytes(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _parse_json(raw: Optional[bytes], path: str) -> Any:
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        _die(f"query-foreshadow.sh: invalid JSON at {path}: {e}", 1)
+
+
+def _extract_items(data: Any, path: str) -> List[Dict[str, Any]]:
+    if data is None:
+        return []
+    if isinstance(data, list):
+        raw_items = data
+    elif isinstance(data, dict) and isinstance(data.get("foreshadowing"), list):
+        raw_items = data["foreshadowing"]
+    else:
+        _die(f"query-foreshadow.sh: unsupported schema at {path} (expected list or object.foreshadowing[])", 1)
+
+    items: List[Dict[str, Any]] = []
+    for it in raw_items:
+        if not isinstance(it, dict):
+            continue
+        foreshadow_id = it.get("id")
+        if not isinstance(foreshadow_id, str) or not foreshadow_id.strip():
+            continue
+        items.append(it)
+    return items
+
+
+def _as_range(value: Any) -> Optional[Tuple[int, int]]:
+    if not isinstance(value, list) or len(value) != 2:
+        return None
+    a, b = value[0], value[1]
+    if not isinstance(a, int) or not isinstance(b, int):
+        return None
+    if a > b:
+        return None
+    if a < 1:
+        return None
+    return (a, b)
+
+
+def _merge_missing(base: Dict[str, Any], fallback: Dict[str, Any], keys: List[str]) -> Dict[str, Any]:
+    out = dict(base)
+    for k in keys:
+        if k not in out or out.get(k) in (None, "", []):
+            if k in fallback and fallback.get(k) not in (None, "", []):
+                out[k] = fallback.get(k)
+    return out
+
+
+def _normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    # Keep a stable subset of fields; pass through unknown fields is intentionally avoided
+    # to keep output small and regression-friendly.
+    out: Dict[str, Any] = {"id": item.get("id")}
+    for k in [
+        "description",
+        "scope",
+        "status",
+        "planted_chapter",
+        "planted_storyline",
+        "target_resolve_range",
+        "last_updated_chapter",
+        "history",
+    ]:
+        if k in item:
+            out[k] = item.get(k)
+    return out
+
+
+def build_index(global_data: Any, plan_data: Any, global_path: str, plan_path: str) -> Dict[str, Any]:
+    """Index rows for global.json + the volume plan: output items by id and their intervals."""
+    global_by_id: Dict[str, Dict[str, Any]] = {str(it["id"]): it for it in _extract_items(global_data, global_path)}
+    plan_by_id: Dict[str, Dict[str, Any]] = {str(it["id"]): it for it in _extract_items(plan_data, plan_path)}
+
+    # One row per interval: (ref, start, end, from plan?, foreshadow id and, for open
+    # (short) intervals, the original resolve end used to count overdue items).
+    spans: List[Tuple[int, int, int, int, str, int]] = []
+
+    def add(start: int, end: int, is_plan: bool, foreshadow_id: str, resolve_end: int = -1) -> None:
+        spans.append((len(spans), min(start, OPEN_END), min(end, OPEN_END), int(is_plan), foreshadow_id, resolve_end))
+
+    for foreshadow_id, it in plan_by_id.items():
+        if it.get("status") == "resolved":
+            continue
+        planted_chapter = it.get("planted_chapter")
+        if isinstance(planted_chapter, int) and planted_chapter >= 1:
+            add(int(planted_chapter), int(planted_chapter), True, foreshadow_id)
+        r = _as_range(it.get("target_resolve_range"))
+        if r is not None:
+            add(r[0], r[1], True, foreshadow_id)
+    for foreshadow_id, it in global_by_id.items():
+        if it.get("status") == "resolved":
+            continue
+        r = _as_range(it.get("target_resolve_range"))
+        if r is None:
+            continue
+        if it.get("scope") == "short":
+            add(r[0], OPEN_END, False, foreshadow_id, r[1])
+        else:
+            add(r[0], r[1], False, foreshadow_id)
+
+    # Output items are stored pre-serialized; a query only decodes the ones it returns.
+    items: Dict[str, str] = {}
+    for foreshadow_id in {span[4] for span in spans}:
+        base = global_by_id.get(foreshadow_id) or plan_by_id.get(foreshadow_id) or {}
+        if not base:
+            continue
+        merged = base
+        if foreshadow_id in global_by_id and foreshadow_id in plan_by_id:
+            merged = _merge_missing(global_by_id[foreshadow_id], plan_by_id[foreshadow_id], ["description", "scope", "target_resolve_range"])
+        items[foreshadow_id] = json.dumps(_normalize_item(merged), ensure_ascii=False)
+
+    return {"items": items, "spans": spans}
+
+
+def _open_store(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30.0)
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS items (id TEXT PRIMARY KEY, item TEXT NOT NULL) WITHOUT ROWID;
+        CREATE VIRTUAL TABLE IF NOT EXISTS spans USING rtree_i32(ref, start, end, +is_plan, +foreshadow_id, +resolve_end);
+        """
+    )
+    return conn
+
+
+def _stat(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _refresh(conn: sqlite3.Connection, global_path: str, plan_path: str) -> sqlite3.Connection:
+    """Bring the index in *conn* up to date with the two files and return it."""
+    stats = [_stat(global_path), _stat(plan_path)]
+    checked_ns = time.time_ns()
+    row = conn.execute("SELECT value FROM meta WHERE key = 'sources'").fetchone()
+    stored = json.loads(row[0]) if row is not None else None
+    if (
+        stored is not None
+        and stored["stat"] == stats
+        and all(st is None or st[1] < stored["checked_ns"] - _RACY_WINDOW_NS for st in stats)
+    ):
+        return conn
+
+    raw_global = _read_bytes(global_path)
+    raw_plan = _read_bytes(plan_path)
+    # A missing file and an empty one must not share a key.
+    key_bytes = b"\0".join(b"-" if raw is None else b"+" + raw for raw in (raw_global, raw_plan))
+    digest = _compiled_config.config_key(_INDEX_KIND, key_bytes)
+    built = None
+    if stored is None or stored["digest"] != digest:
+        built = build_index(_parse_json(raw_global, global_path), _parse_json(raw_plan, plan_path), global_path, plan_path)
+    with conn:
+        if built is not None:
+            conn.execute("DELETE FROM items")
+            conn.execute("DELETE FROM spans")
+            conn.executemany("INSERT INTO items (id, item) VALUES (?, ?)", sorted(built["items"].items()))
+            conn.executemany("INSERT INTO spans VALUES (?, ?, ?, ?, ?, ?)", built["spans"])
+        # Stats taken before the read: a file changed meanwhile just fails the next stat check.
+        sources = {"stat": stats, "digest": digest, "checked_ns": checked_ns}
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('sources', ?)", (json.dumps(sources),))
+    return conn
+
+
+def load_index(global_path: str, plan_path: str) -> sqlite3.Connection:
+    """Index for the two files, rebuilt only when either file's bytes change.
+
+    Cache trouble is never fatal: the index is then built in memory.
+    """
+    directory = _compiled_config.cache_dir()
+    if directory is not None:
+        sources = f"{os.path.abspath(global_path)}\0{os.path.abspath(plan_path)}"
+        name = f"{_INDEX_KIND}-{hashlib.sha256(sources.encode('utf-8')).hexdigest()[:32]}.sqlite"
+        conn = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            conn = _open_store(os.path.join(directory, name))
+            return _refresh(conn, global_path, plan_path)
+        except (OSError, sqlite3.Error):
+            if conn is not None:
+                conn.close()
+    return _refresh(_open_store(":memory:"), global_path, plan_path)
+
+
+def query(index: sqlite3.Connection, lo: int, hi: int) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Items relevant to any chapter in [lo, hi] (sorted by id) and the stats block."""
+    plan_ids: Set[str] = set()
+    global_ids: Set[str] = set()
+    overdue_short = 0
+    rows = index.execute(
+        "SELECT is_plan, foreshadow_id, resolve_end FROM spans WHERE start <= ? AND end >= ?",
+        (min(hi, OPEN_END), min(lo, OPEN_END)),
+    )
+    for is_plan, foreshadow_id, resolve_end in rows:
+        if is_plan:
+            plan_ids.add(foreshadow_id)
+            continue
+        global_ids.add(foreshadow_id)
+        if resolve_end >= 0 and hi > resolve_end:
+            overdue_short += 1
+
+    items = []
+    for foreshadow_id in sorted(plan_ids | global_ids):
+        row = index.execute("SELECT item FROM items WHERE id = ?", (foreshadow_id,)).fetchone()
+        if row is not None:
+            items.append(json.loads(row[0]))
+    stats = {
+        "items": len(items),
+        "relevant_from_plan": len(plan_ids),
+        "relevant_from_global": len(global_ids),
+        "overdue_short": overdue_short,
+    }
+    return items, stats
+
+
+def _report(scope: Dict[str, int], volume: int, items: List[Dict[str, Any]], stats: Dict[str, int], global_path: str, plan_path: str) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"schema_version": 1, **scope}
+    out.update(
+        {
+            "volume": volume,
+            "items": items,  # sorted by id ascending (deterministic)
+            # stats.relevant_from_plan + stats.relevant_from_global may exceed stats.items
+            # because a single item can match relevance criteria from both sources.
+            "stats": stats,
+            "sources": {
+                "checkpoint": ".checkpoint.json",
+                "global": global_path,
+                "volume_plan": plan_path,
+            },
+        }
+    )
+    return out
+
+
+def range_summary(chapters: List[int], relevant: List[List[str]]) -> Dict[str, Any]:
+    """Which items enter / leave relevance across *chapters* (ascending), given each one's ids."""
+    transitions: List[Dict[str, Any]] = []
+    spans: Dict[str, Dict[str, int]] = {}
+    prev: Set[str] = set()
+    for chapter, ids in zip(chapters, relevant):
+        cur = set(ids)
+        entered = sorted(cur - prev)
+        left = sorted(prev - cur)
+        if entered or left:
+            transitions.append({"chapter": chapter, "entered": entered, "left": left})
+        for foreshadow_id in ids:
+            span = spans.setdefault(foreshadow_id, {"first_chapter": chapter, "last_chapter": chapter, "chapter_count": 0})
+            span["last_chapter"] = chapter
+            span["chapter_count"] += 1
+        prev = cur
+    return {
+        "type": "range_summary",
+        "chapters": len(chapters),
+        "from_chapter": chapters[0],
+        "to_chapter": chapters[-1],
+        "items_total": len(spans),
+        # Only chapters where the relevant set changes; the first lists its whole set as entered.
+        "transitions": transitions,
+        "items": [{"id": k, **spans[k]} for k in sorted(spans)],
+    }
+
+
+def main() -> None:
+    # argv: <chapter> | --span <from> <to> | --range <from> <to> | --chapters <n,n,...>
+    mode = sys.argv[1]
+    chapters: Optional[List[int]] = None
+    if mode == "--range":
+        chapters = list(range(int(sys.argv[2]), int(sys.argv[3]) + 1))
+    elif mode == "--chapters":
+        chapters = sorted({int(n) for n in sys.argv[2].split(",") if n})
+    elif mode == "--span":
+        lo, hi = int(sys.argv[2]), int(sys.argv[3])
+    else:
+        lo = hi = int(mode)
+
+    checkpoint = _load_json(".checkpoint.json")
+    if not isinstance(checkpoint, dict):
+        _die("query-foreshadow.sh: .checkpoint.json must be a JSON object", 1)
+    volume = checkpoint.get("current_volume")
+    if not isinstance(volume, int) or volume < 0:
+        _die("query-foreshadow.sh: .checkpoint.json.current_volume must be an int >= 0", 1)
+
+    global_path = "foreshadowing/global.json"
+    plan_path = f"volumes/vol-{volume:02d}/foreshadowing.json"
+
+    index = load_index(global_path, plan_path)
+
+    if chapters is not None:
+        # One index open for the whole range; per-chapter lines match the single-chapter output.
+        relevant: List[List[str]] = []
+        for chapter in chapters:
+            items, stats = query(index, chapter, chapter)
+            relevant.append([it["id"] for it in items])
+            sys.stdout.write(json.dumps(_report({"chapter": chapter}, volume, items, stats, global_path, plan_path), ensure_ascii=False) + "\n")
+        sys.stdout.write(json.dumps(range_summary(chapters, relevant), ensure_ascii=False) + "\n")
+        return
+
+    items, stats = query(index, lo, hi)
+    scope = {"from_chapter": lo, "to_chapter": hi} if mode == "--span" else {"chapter": lo}
+    sys.stdout.write(json.dumps(_report(scope, volume, items, stats, global_path, plan_path), ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"query-foreshadow.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
@@ -0,0 +1,68 @@
+"""Drill-down query over an archived run's rule -> chapter index (M3).
+
+Called by scripts/query-rule-index.sh.  Reads only <run_dir>/rule-index.json
+(written by run_regression.archive_run()), so "which chapters violated L2
+rule C-017 with high confidence" is answered without re-reading any
+evaluations/ file.
+"""
+
+import json
+import os
+import sys
+from typing import Any, List, Set
+
+import _common
+import _rule_index
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    _common.die(f"query-rule-index.sh: {msg}", exit_code)
+
+
+def _split(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def main() -> None:
+    run_dir = sys.argv[1]
+    layers = _split(sys.argv[2])
+    rule_patterns = _split(sys.argv[3])
+    confidences = _split(sys.argv[4])
+
+    index_path = os.path.join(run_dir, _rule_index.INDEX_FILE)
+    try:
+        data: Any = _common.load_json(index_path, missing_ok=True)
+    except Exception as e:
+        _die(f"invalid JSON at {index_path}: {e}", 1)
+    if data is None:
+        _die(f"missing {_rule_index.INDEX_FILE} in {run_dir} (archived before the rule index existed; re-run run-regression.sh)", 1)
+    if not isinstance(data, dict) or data.get("schema_version") != _rule_index.SCHEMA_VERSION or not isinstance(data.get("index"), dict):
+        _die(f"unsupported rule index at {index_path}", 1)
+
+    matches = _rule_index.query(data["index"], layers, rule_patterns, confidences)
+    chapters: Set[int] = set()
+    for m in matches:
+        chapters.update(m["chapters"])
+        m["count"] = len(m["chapters"])
+
+    out = {
+        "schema_version": 1,
+        "run_dir": os.path.abspath(run_dir),
+        "run_id": data.get("run_id"),
+        "project_path": data.get("project_path"),
+        "chapters_total": data.get("chapters_total"),
+        "filters": {"layers": layers, "rules": rule_patterns, "confidences": confidences},
+        "matches": matches,
+        "chapters": sorted(chapters),
+    }
+    sys.stdout.write(json.dumps(out, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"query-rule-index.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
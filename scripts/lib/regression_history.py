@@ -0,0 +1,408 @@
+"""Time-series store over archived regression runs (regression-history.sh).
+
+Every archived run dir (<runs-dir>/<run_id>/ from run-regression.sh, or
+<runs-dir>/<project>-<hash>/<run_id>/ from run-regression-batch.sh) is
+ingested once into an SQLite file under the runs dir: one row per run plus
+one (metric, value) row per numeric metric taken from its summary.json and
+report.json.  Queries only touch the store; each one first picks up run
+dirs that appeared since the last sync (a directory listing, no JSON read
+for runs already known).
+
+Metric names:
+  chapters_total, violations_total, score_overall_mean,
+  compliance_rate_any_violation, compliance_rate_high_confidence,
+  chapters_with_any_violation, chapters_with_high_confidence_violation,
+  score_dimensions.<dim>, violations_by_layer.<layer>,
+  violations_by_confidence.<confidence>, rule.<layer>.<rule_id>,
+  continuity.issues_total, foreshadowing.active_count,
+  foreshadowing.overdue_short_count, style_drift.drifts_count,
+  stage_latency.<by_stage|by_model>.<key>.<p50|p90|p99|tokens_total|output_tokens_per_sec>
+
+Changepoints are mean shifts found by binary segmentation: a series is
+split where the split removes the most squared error, and the split is
+kept when that reduction exceeds penalty * sigma^2 * ln(n) (sigma from the
+median absolute first difference, so the estimate ignores the shifts
+themselves) and the shift is at least --min-shift.  A mostly-constant
+series has a median difference of 0; sigma then falls back to the series
+standard deviation, so a lone blip is not reported as two shifts.
+"""
+
+import glob
+import json
+import math
+import os
+import sqlite3
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import _common
+
+_SCHEMA_VERSION = 1
+
+DEFAULT_DB_NAME = "history.sqlite"
+
+DEFAULT_METRICS = [
+    "compliance_rate_high_confidence",
+    "compliance_rate_any_violation",
+    "violations_total",
+    "score_overall_mean",
+    "score_dimensions.*",
+    "violations_by_layer.*",
+]
+
+# Run-dir siblings that are not runs (contribution cache, batch rollups, live watch runs).
+_SKIP_DIRS = {".cache", "fleet", "watch"}
+
+# Consistency constant: MAD of N(0, s^2) differences is 0.6745 * s * sqrt(2).
+_MAD_TO_SIGMA = 1.0 / (0.6745 * math.sqrt(2.0))
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    _common.die(f"regression-history.sh: {msg}", exit_code)
+
+
+def _load_json(path: str) -> Any:
+    try:
+        return _common.load_json(path, missing_ok=True)
+    except Exception as e:
+        _die(f"invalid JSON at {path}: {e}", 1)
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+def open_store(db_path: str) -> sqlite3.Connection:
+    """Open (creating if needed) the history store at *db_path*."""
+    parent = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            run_dir TEXT NOT NULL UNIQUE,
+            run_id TEXT,
+            project_path TEXT,
+            generated_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS runs_by_project ON runs (project_path, generated_at, run_id);
+        CREATE TABLE IF NOT EXISTS metrics (
+            name TEXT NOT NULL,
+            run INTEGER NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (name, run)
+        ) WITHOUT ROWID;
+        """
+    )
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if row is None:
+        conn.execute("INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (str(_SCHEMA_VERSION),))
+        conn.commit()
+    elif row[0] != str(_SCHEMA_VERSION):
+        conn.close()
+        _die(f"{db_path} has schema_version {row[0]}, expected {_SCHEMA_VERSION} (delete it and re-ingest)", 1)
+    return conn
+
+
+def _flatten_map(prefix: str, obj: Any) -> Iterator[Tuple[str, float]]:
+    if not isinstance(obj, dict):
+        return
+    for k, v in obj.items():
+        value = _common.as_float(v)
+        if value is not None:
+            yield f"{prefix}.{k}", value
+
+
+def run_metrics(summary: Dict[str, Any], report: Any) -> Dict[str, float]:
+    """Numeric metrics of one archived run (see the module docstring for names)."""
+    out: Dict[str, float] = {}
+
+    def put(name: str, value: Any) -> None:
+        v = _common.as_float(value)
+        if v is not None:
+            out[name] = v
+
+    put("chapters_total", summary.get("chapters_total"))
+    put("violations_total", summary.get("violations_total"))
+    comp = summary.get("compliance")
+    if isinstance(comp, dict):
+        for k in (
+            "compliance_rate_any_violation",
+            "compliance_rate_high_confidence",
+            "chapters_with_any_violation",
+            "chapters_with_high_confidence_violation",
+        ):
+            put(k, comp.get(k))
+    score = summary.get("score_overall")
+    if isinstance(score, dict):
+        put("score_overall_mean", score.get("mean"))
+    dims = summary.get("score_dimensions")
+    if isinstance(dims, dict):
+        for k, v in dims.items():
+            if isinstance(v, dict):
+                put(f"score_dimensions.{k}", v.get("mean"))
+    out.update(_flatten_map("violations_by_layer", summary.get("violations_by_layer")))
+    out.update(_flatten_map("violations_by_confidence", summary.get("violations_by_confidence")))
+    latency = summary.get("stage_latency")
+    if isinstance(latency, dict):
+        for group in ("by_stage", "by_model"):
+            entries = latency.get(group)
+            if not isinstance(entries, dict):
+                continue
+            for key, st in entries.items():
+                if not isinstance(st, dict):
+                    continue
+                duration = st.get("duration_ms") if isinstance(st.get("duration_ms"), dict) else {}
+                for q in ("p50", "p90", "p99"):
+                    put(f"stage_latency.{group}.{key}.{q}", duration.get(q))
+                tokens = st.get("tokens") if isinstance(st.get("tokens"), dict) else {}
+                put(f"stage_latency.{group}.{key}.tokens_total", tokens.get("total"))
+                put(f"stage_latency.{group}.{key}.output_tokens_per_sec", st.get("output_tokens_per_sec"))
+
+    if not isinstance(report, dict):
+        return out
+    spec_ls = report.get("spec_ls")
+    by_rule = spec_ls.get("violations_by_layer_rule_confidence") if isinstance(spec_ls, dict) else None
+    if isinstance(by_rule, dict):
+        for layer, rules in by_rule.items():
+            if not isinstance(rules, dict):
+                continue
+            for rule_id, conf_map in rules.items():
+                if isinstance(conf_map, dict):
+                    out[f"rule.{layer}.{rule_id}"] = float(sum(_common.as_float(v) or 0.0 for v in conf_map.values()))
+    continuity = report.get("continuity")
+    if isinstance(continuity, dict) and isinstance(continuity.get("stats"), dict):
+        put("continuity.issues_total", continuity["stats"].get("issues_total"))
+    foreshadowing = report.get("foreshadowing")
+    if isinstance(foreshadowing, dict):
+        put("foreshadowing.active_count", foreshadowing.get("active_count"))
+        put("foreshadowing.overdue_short_count", foreshadowing.get("overdue_short_count"))
+    style = report.get("style_drift")
+    if isinstance(style, dict):
+        put("style_drift.drifts_count", style.get("drifts_count"))
+    return out
+
+
+def find_run_dirs(runs_dir: str) -> List[str]:
+    """Run dirs (holding summary.json) directly under *runs_dir* or one project level below, relative paths."""
+    out: List[str] = []
+
+    def children(rel: str) -> List[str]:
+        try:
+            names = os.listdir(os.path.join(runs_dir, rel))
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+        # Skip dot-dirs and archive_run()'s tmp dirs (renamed into place once complete).
+        return sorted(n for n in names if not n.startswith((".", "tmp")) and n not in _SKIP_DIRS)
+
+    for name in children(""):
+        if not os.path.isdir(os.path.join(runs_dir, name)):
+            continue
+        if os.path.isfile(os.path.join(runs_dir, name, "summary.json")):
+            out.append(name)
+            continue
+        for sub in children(name):
+            if os.path.isfile(os.path.join(runs_dir, name, sub, "summary.json")):
+                out.append(f"{name}/{sub}")
+    return out
+
+
+def sync(conn: sqlite3.Connection, runs_dir: str) -> Dict[str, int]:
+    """Ingest run dirs under *runs_dir* not yet in the store."""
+    known = {row[0] for row in conn.execute("SELECT run_dir FROM runs")}
+    found = find_run_dirs(runs_dir)
+    ingested = 0
+    skipped = 0
+    with conn:
+        for rel in found:
+            if rel in known:
+                continue
+            summary = _load_json(os.path.join(runs_dir, rel, "summary.json"))
+            if not isinstance(summary, dict):
+                skipped += 1
+                continue
+            report = _load_json(os.path.join(runs_dir, rel, "report.json"))
+            cur = conn.execute(
+                "INSERT INTO runs (run_dir, run_id, project_path, generated_at) VALUES (?, ?, ?, ?)",
+                (rel, _common.as_str(summary.get("run_id")), _common.as_str(summary.get("project_path")), _common.as_str(summary.get("generated_at"))),
+            )
+            conn.executemany(
+                "INSERT INTO metrics (name, run, value) VALUES (?, ?, ?)",
+                [(name, cur.lastrowid, value) for name, value in sorted(run_metrics(summary, report).items())],
+            )
+            ingested += 1
+    return {"run_dirs_found": len(found), "ingested": ingested, "skipped_invalid": skipped}
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def load_series(
+    conn: sqlite3.Connection, project: Optional[str], last: int, patterns: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """Per project (oldest run first): the last *last* runs and each matching metric aligned to them."""
+    if project is not None:
+        projects = [project]
+    else:
+        projects = [row[0] for row in conn.execute("SELECT DISTINCT project_path FROM runs ORDER BY project_path")]
+
+    out: List[Dict[str, Any]] = []
+    for project_path in projects:
+        runs = conn.execute(
+            "SELECT id, run_id, generated_at, run_dir FROM runs WHERE project_path IS ?"
+            " ORDER BY generated_at DESC, run_id DESC LIMIT ?",
+            (project_path, last if last > 0 else -1),
+        ).fetchall()
+        runs.reverse()
+        if not runs:
+            continue
+        position = {row[0]: i for i, row in enumerate(runs)}
+        run_ids = [row[0] for row in runs]
+        placeholders = ",".join("?" * len(runs))
+        series: Dict[str, List[Optional[float]]] = {}
+        # One query per pattern: each is a (name, run) primary-key range lookup.
+        for pattern in patterns:
+            op = "GLOB" if glob.has_magic(pattern) else "="
+            for name, run, value in conn.execute(
+                f"SELECT name, run, value FROM metrics WHERE name {op} ? AND run IN ({placeholders})",
+                [pattern] + run_ids,
+            ):
+                values = series.get(name)
+                if values is None:
+                    values = series[name] = [None] * len(runs)
+                values[position[run]] = value
+        out.append(
+            {
+                "project_path": project_path,
+                "runs": [{"run_id": r[1], "generated_at": r[2], "run_dir": r[3]} for r in runs],
+                "series": {k: series[k] for k in sorted(series)},
+            }
+        )
+    return out
+
+
+def _segment_split(prefix: List[float], a: int, b: int, min_size: int) -> Tuple[int, float]:
+    """Best split k of values[a:b] into [a, k) + [k, b) and its reduction in squared error."""
+    n = b - a
+    total = prefix[b] - prefix[a]
+    best_k, best_gain = -1, 0.0
+    for k in range(a + min_size, b - min_size + 1):
+        n1 = k - a
+        s1 = prefix[k] - prefix[a]
+        # SSE(whole) - SSE(left) - SSE(right) = n1 * n2 / n * (mean1 - mean2)^2
+        diff = s1 / n1 - (total - s1) / (n - n1)
+        gain = n1 * (n - n1) / n * diff * diff
+        if gain > best_gain:
+            best_k, best_gain = k, gain
+    return best_k, best_gain
+
+
+def changepoints(values: Sequence[float], penalty: float, min_shift: float, min_size: int = 2) -> List[Dict[str, Any]]:
+    """Mean-shift changepoints of *values* by binary segmentation, in index order."""
+    n = len(values)
+    if n < 2 * min_size:
+        return []
+    diffs = sorted(abs(values[i + 1] - values[i]) for i in range(n - 1))
+    sigma = diffs[len(diffs) // 2] * _MAD_TO_SIGMA
+    # Shifts below float noise (e.g. in a constant series) are not changes.
+    eps = 1e-9 * (1.0 + max(abs(v) for v in values))
+    if sigma <= eps:
+        mean = sum(values) / n
+        sigma = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1))
+    threshold = penalty * sigma * sigma * math.log(n)
+    min_shift = max(min_shift, eps)
+
+    prefix = [0.0]
+    for v in values:
+        prefix.append(prefix[-1] + v)
+
+    found: List[int] = []
+    stack = [(0, n)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2 * min_size:
+            continue
+        k, gain = _segment_split(prefix, a, b, min_size)
+        if k < 0 or gain <= threshold:
+            continue
+        before = (prefix[k] - prefix[a]) / (k - a)
+        after = (prefix[b] - prefix[k]) / (b - k)
+        if abs(after - before) < min_shift:
+            continue
+        found.append(k)
+        stack.append((a, k))
+        stack.append((k, b))
+
+    found.sort()
+    bounds = [0] + found + [n]
+    out: List[Dict[str, Any]] = []
+    for i, k in enumerate(found):
+        # Report each shift against its neighbouring segments, not the segment it was split from.
+        a, b = bounds[i], bounds[i + 2]
+        before = (prefix[k] - prefix[a]) / (k - a)
+        after = (prefix[b] - prefix[k]) / (b - k)
+        out.append({"index": k, "mean_before": round(before, 6), "mean_after": round(after, 6), "shift": round(after - before, 6)})
+    return out
+
+
+def detect(project_series: Dict[str, Any], penalty: float, min_shift: float) -> List[Dict[str, Any]]:
+    """Changepoints of every series of one load_series() project entry, by metric then run order."""
+    runs = project_series["runs"]
+    out: List[Dict[str, Any]] = []
+    for name, series in project_series["series"].items():
+        # Runs missing the metric are left out of its series.
+        at = [i for i, v in enumerate(series) if v is not None]
+        for cp in changepoints([series[i] for i in at], penalty, min_shift):
+            run = runs[at[cp.pop("index")]]
+            out.append({"metric": name, "run_id": run["run_id"], "generated_at": run["generated_at"], **cp})
+    return out
+
+
+def main() -> None:
+    # argv: <command> <runs_dir> <db_path> <project> <last> <metrics> <penalty> <min_shift>
+    command = sys.argv[1]
+    runs_dir = os.path.abspath(sys.argv[2])
+    db_path = sys.argv[3] or os.path.join(runs_dir, DEFAULT_DB_NAME)
+    project = os.path.abspath(sys.argv[4]) if sys.argv[4] else None
+    last = int(sys.argv[5])
+    patterns = [p for p in sys.argv[6].split(",") if p] or DEFAULT_METRICS
+    penalty = float(sys.argv[7])
+    min_shift = float(sys.argv[8])
+
+    conn = open_store(db_path)
+    try:
+        sync_stats = sync(conn, runs_dir)
+        out: Dict[str, Any] = {
+            "schema_version": 1,
+            "generated_at": _common.iso_utc_now(),
+            "runs_dir": runs_dir,
+            "db_path": os.path.abspath(db_path),
+            "sync": sync_stats,
+        }
+        out["runs_total"] = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        if command == "trend":
+            out["projects"] = load_series(conn, project, last, patterns)
+        elif command == "changepoints":
+            out["params"] = {"last": last, "penalty": penalty, "min_shift": min_shift}
+            out["projects"] = [
+                {"project_path": p["project_path"], "runs": len(p["runs"]), "changepoints": detect(p, penalty, min_shift)}
+                for p in load_series(conn, project, last, patterns)
+            ]
+    finally:
+        conn.close()
+
+    sys.stdout.write(json.dumps(out, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"regression-history.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
@@ -0,0 +1,708 @@
+"""Deterministic-ish Chinese NER extractor (M3+ extension point).
+
+Extracted from the heredoc in scripts/run-ner.sh.
+"""
+
+import functools
+import json
+import re
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+
+def _die(msg: str, exit_code: int) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+def _truncate(s: str, limit: int = 160) -> str:
+    s = s.strip()
+    if len(s) <= limit:
+        return s
+    return s[: limit - 1] + "…"
+
+
+def _strip_markdown_lines(lines: Sequence[str]) -> List[Tuple[int, str]]:
+    """
+    Best-effort strip of non-narrative markdown:
+    - code fences
+    - headings
+    - horizontal rules
+    """
+    out: List[Tuple[int, str]] = []
+    in_fence = False
+    for idx, raw in enumerate(lines, start=1):
+        line = raw.rstrip("\n")
+        stripped = line.strip()
+
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        if stripped.startswith("#"):
+            continue
+        if stripped in {"---", "___", "***"}:
+            continue
+
+        if not stripped:
+            continue
+
+        out.append((idx, line))
+    return out
+
+
+LOCATION_SUFFIXES = [
+    "城",
+    "镇",
+    "村",
+    "山",
+    "岭",
+    "谷",
+    "林",
+    "森林",
+    "原",
+    "原野",
+    "宫",
+    "殿",
+    "府",
+    "楼",
+    "阁",
+    "寺",
+    "观",
+    "院",
+    "洞",
+    "湖",
+    "海",
+    "江",
+    "河",
+    "关",
+    "门",
+    "岛",
+    "州",
+    "国",
+    "郡",
+    "坊",
+    "街",
+    "巷",
+    "庄",
+    "堡",
+    "营",
+    "港",
+    "岸",
+    "崖",
+    "狱",
+]
+
+LOCATION_PREFIX_TRIGGERS = [
+    # prepositions / verbs that often prefix a location mention
+    "来到",
+    "到了",
+    "到达",
+    "进入",
+    "踏入",
+    "走进",
+    "走入",
+    "抵达",
+    "赶到",
+    "前往",
+    "奔向",
+    "穿过",
+    "越过",
+    "飞入",
+    "潜入",
+    "驶入",
+    "闯入",
+    "返回",
+    "回到",
+    "离开",
+    "在",
+    "于",
+    "往",
+    "向",
+    "朝",
+]
+
+SPEECH_VERBS = [
+    "说道",
+    "问道",
+    "答道",
+    "笑道",
+    "冷笑",
+    "喝道",
+    "低声",
+    "轻声",
+    "沉声",
+    "喃喃",
+    "叹道",
+    "怒道",
+    "喊道",
+]
+
+SPEECH_ENDINGS = [
+    "说道",
+    "问道",
+    "答道",
+    "笑道",
+    "喝道",
+    "叹道",
+    "怒道",
+    "喊道",
+    "道",
+]
+
+SPEECH_MODIFIERS = [
+    "低声",
+    "轻声",
+    "沉声",
+    "喃喃",
+    "冷笑",
+    "怒",
+    "叹",
+    "喝",
+    "笑",
+]
+
+COMMON_SURNAMES_1: Set[str] = set(
+    list(
+        "赵钱孙李周吴郑王冯陈褚卫蒋沈韩杨朱秦尤许何吕施张孔曹严华金魏陶姜戚谢邹喻柏水窦章云苏潘葛奚范彭郎鲁韦昌马苗凤花方俞任袁柳酆鲍史唐费廉岑薛雷贺倪汤滕殷罗毕郝邬安常乐于时傅皮卞齐康伍余元卜顾孟平黄和穆萧尹姚邵湛汪祁毛禹狄米贝明臧计伏成戴谈宋茅庞熊纪舒屈项祝董梁杜阮蓝闵席季麻强贾路娄危江童颜郭梅盛林刁钟徐邱骆高夏蔡田樊胡凌霍虞万支柯昝管卢莫经房裘缪干解应宗丁宣贲邓郁单杭洪包诸左石崔吉龚程嵇邢滑裴陆荣翁荀羊於惠甄曲家封芮羿储靳汲邴糜松井段富巫乌焦巴弓牧隗山谷车侯宓蓬全郗班仰秋仲伊宫宁仇栾暴甘钭厉戎祖武符刘景詹束龙叶幸司韶郜黎蓟薄印宿白怀蒲邰从鄂索咸籍赖卓蔺屠蒙池乔阴欎胥能苍双闻莘党翟谭贡劳逄姬申扶堵冉宰郦雍却璩桑桂濮牛寿通边扈燕冀郏浦尚农温别庄晏柴瞿阎充慕连茹习宦艾鱼容向古易慎戈廖庾终暨居衡步都耿满弘匡国文寇广禄阙东欧殳沃利蔚越夔隆师巩厍聂晁勾敖融冷訾辛阚那简饶空曾毋沙乜养鞠须丰巢关蒯相查后荆红游竺权逯盖益桓公"
+    )
+)
+
+COMMON_SURNAMES_2: Set[str] = {
+    "欧阳",
+    "司马",
+    "上官",
+    "诸葛",
+    "东方",
+    "南宫",
+    "西门",
+    "令狐",
+    "皇甫",
+    "尉迟",
+    "公孙",
+    "慕容",
+    "长孙",
+    "夏侯",
+    "轩辕",
+    "钟离",
+    "宇文",
+    "司徒",
+    "司空",
+    "太史",
+    "端木",
+    "申屠",
+    "公羊",
+    "澹台",
+    "公冶",
+    "宗政",
+    "濮阳",
+    "淳于",
+    "单于",
+    "太叔",
+    "仲孙",
+}
+
+CHAR_STOPWORDS: Set[str] = {
+    # very common generic mentions
+    "主角",
+    "众人",
+    "众",
+    "众妖",
+    "众修",
+    "人群",
+    "大家",
+    "所有人",
+    "他们",
+    "她们",
+    "我们",
+    "你们",
+    "自己",
+    "此时",
+    "这一刻",
+    "片刻",
+    "不久",
+    "然后",
+    "忽然",
+    "突然",
+    "因为",
+    "所以",
+    "同时",
+    "于是",
+    "但是",
+    "不过",
+    "如果",
+    "只是",
+    "仍然",
+    "仿佛",
+    "宛如",
+    "莫名",
+}
+
+
+TIME_RELATIVE = [
+    "翌日",
+    "次日",
+    "当日",
+    "当晚",
+    "今夜",
+    "昨夜",
+    "清晨",
+    "黎明",
+    "天明",
+    "天亮",
+    "正午",
+    "午后",
+    "黄昏",
+    "傍晚",
+    "夜里",
+    "午夜",
+    "半夜",
+    "三更",
+    "片刻后",
+    "不久后",
+    "数日后",
+    "几日后",
+    "三日后",
+]
+
+
+EVENT_TRIGGERS = [
+    "爆发",
+    "开战",
+    "大战",
+    "决战",
+    "身亡",
+    "死亡",
+    "失踪",
+    "现身",
+    "出现",
+    "突破",
+    "晋升",
+    "崩塌",
+    "坍塌",
+    "倒塌",
+    "结盟",
+    "背叛",
+    "叛变",
+    "揭露",
+    "曝光",
+    "宣布",
+    "宣告",
+]
+
+
+class Mention:
+    # The full line is kept and only truncated when a (capped) survivor is emitted.
+    __slots__ = ("line", "raw")
+
+    def __init__(self, line: int, raw: str) -> None:
+        self.line = line
+        self.raw = raw
+
+    @property
+    def snippet(self) -> str:
+        return _truncate(self.raw)
+
+
+class Entity:
+    __slots__ = ("text", "confidence", "mentions")
+
+    def __init__(self, text: str, confidence: str, mentions: List[Mention]) -> None:
+        self.text = text
+        self.confidence = confidence
+        self.mentions = mentions
+
+
+class _MentionStore:
+    """Up to `cap` distinct (line, snippet) mentions per key, in arrival order."""
+
+    __slots__ = ("by_key", "_seen", "_cap")
+
+    def __init__(self, cap: int = 5) -> None:
+        self.by_key: Dict[str, List[Mention]] = {}
+        self._seen: Dict[str, Set[Tuple[int, str]]] = {}
+        self._cap = cap
+
+    def add(self, key: str, line_no: int, snippet: str) -> None:
+        mentions = self.by_key.get(key)
+        if mentions is None:
+            self.by_key[key] = [Mention(line_no, snippet)]
+            self._seen[key] = {(line_no, snippet)}
+            return
+        if len(mentions) >= self._cap:
+            return
+        seen = self._seen[key]
+        if (line_no, snippet) in seen:
+            return
+        seen.add((line_no, snippet))
+        mentions.append(Mention(line_no, snippet))
+
+
+# ---------------------------------------------------------------------------
+# Precompiled patterns / lookup tables (built once at import, shared by every line)
+# ---------------------------------------------------------------------------
+
+_TIME_PATTERNS = [
+    # explicit year + optional season
+    re.compile(r"(?:第)?[0-9一二三四五六七八九十百千]{1,4}年(?:[春夏秋冬](?:初|中|末)?)?"),
+    # month/day-ish
+    re.compile(r"(?:第)?[0-9一二三四五六七八九十]{1,3}(?:月|日|天|旬)"),
+    # relative tokens
+    re.compile(r"(" + "|".join(map(re.escape, TIME_RELATIVE)) + r")"),
+]
+_TIME_HIGH_RE = re.compile(r"[0-9一二三四五六七八九十百千]+(年|月|日|天|旬|更|刻)")
+_TIME_RELATIVE_SET: Set[str] = set(TIME_RELATIVE)
+
+# Suffix lookup: slice the token's last n chars for each distinct suffix length.
+_LOCATION_SUFFIX_SET: Set[str] = set(LOCATION_SUFFIXES)
+_LOCATION_SUFFIX_LENS: List[int] = sorted({len(s) for s in LOCATION_SUFFIXES})
+_LOCATION_SUFFIX_RE = "|".join(sorted(map(re.escape, LOCATION_SUFFIXES), key=len, reverse=True))
+_LOCATION_PAT = re.compile(rf"([\u3400-\u9fff]{{2,10}}(?:{_LOCATION_SUFFIX_RE}))")
+_LOCATION_BRACKET_PAT = re.compile(r"【([^】]{2,12})】")
+_LOCATION_STRICT_CANDIDATE_PAT = re.compile(rf"^[\u3400-\u9fff]{{2,10}}(?:{_LOCATION_SUFFIX_RE})$")
+_LOCATION_LOOSE_CANDIDATE_PAT = re.compile(rf"^[\u3400-\u9fff]{{1,10}}(?:{_LOCATION_SUFFIX_RE})$")
+_LOCATION_WEAK_SINGLE: Set[str] = {"在", "于", "到", "往", "向", "朝"}
+
+# Prefer patterns like "林枫(沉声)道/说道/问道..." for high-confidence names.
+_SPEECH_NAME_PAT = re.compile(
+    r"(?:^|(?<=[，。！？；：、\s\"「『（]))([\u3400-\u9fff]{2,3})(?:(?:"
+    + "|".join(map(re.escape, SPEECH_MODIFIERS))
+    + r"))?(?:"
+    + "|".join(map(re.escape, SPEECH_ENDINGS))
+    + r")"
+)
+_SPEECH_VERB_RE = re.compile("|".join(map(re.escape, SPEECH_VERBS)))
+_CHAR_TOKEN_PAT = re.compile(r"([\u3400-\u9fff]{2,3})")
+# Every 2-3 char token matching ^[春夏秋冬][初中末]?$ or ^(?:初|仲|暮|孟)[春夏秋冬]$.
+_SEASON_TOKENS: Set[str] = {s + m for s in "春夏秋冬" for m in "初中末"} | {p + s for p in ("初", "仲", "暮", "孟") for s in "春夏秋冬"}
+_SPEECH_TAIL_CHARS: Set[str] = {"低", "轻", "沉", "喃", "冷", "怒", "叹", "喝", "笑"}
+
+_EVENT_TRIGGERS_TUPLE = tuple(EVENT_TRIGGERS)
+_EVENT_PAT = re.compile(r"([\u3400-\u9fff]{2,8}(?:" + "|".join(map(re.escape, EVENT_TRIGGERS)) + r"))")
+
+
+def _has_location_suffix(token: str) -> bool:
+    for n in _LOCATION_SUFFIX_LENS:
+        if token[-n:] in _LOCATION_SUFFIX_SET:
+            return True
+    return False
+
+
+def confidence_for_time(token: str) -> str:
+    if _TIME_HIGH_RE.search(token):
+        return "high"
+    if token in _TIME_RELATIVE_SET:
+        return "medium"
+    return "low"
+
+
+def confidence_for_location(token: str) -> str:
+    if len(token) >= 3 and _has_location_suffix(token):
+        return "high"
+    if token.startswith("【") and token.endswith("】"):
+        return "medium"
+    return "low"
+
+
+def confidence_for_character(name: str, freq: int, speech_hits: int) -> str:
+    if speech_hits >= 2:
+        return "high"
+    if freq >= 4:
+        return "medium"
+    return "low"
+
+
+def confidence_for_event(token: str) -> str:
+    if token.endswith(_EVENT_TRIGGERS_TUPLE):
+        return "medium"
+    return "low"
+
+
+def _sort_entities(entities: List[Entity]) -> List[Entity]:
+    # stable ordering: by mention count desc, then by text
+    return sorted(entities, key=lambda e: (-len(e.mentions), e.text))
+
+
+@functools.lru_cache(maxsize=65536)
+def _normalize_location(token: str) -> str:
+    token = token.strip()
+    if not token:
+        return token
+
+    # Strip the earliest trigger found in the token, but avoid
+    # corrupting real location names that start with a preposition-like
+    # character (e.g. "向阳村", "朝阳城", "于都城").
+    best_pos: Optional[int] = None
+    best_end: Optional[int] = None
+    for trig in LOCATION_PREFIX_TRIGGERS:
+        idx = token.find(trig)
+        if idx == -1:
+            continue
+        end = idx + len(trig)
+        if end >= len(token):
+            continue
+
+        candidate = token[end:]
+        if not candidate:
+            continue
+
+        is_weak = len(trig) == 1 and trig in _LOCATION_WEAK_SINGLE
+        if is_weak:
+            # Only strip weak single-char triggers when the remainder still
+            # looks like a >=3-char place name (>=2 chars before suffix).
+            if not _LOCATION_STRICT_CANDIDATE_PAT.match(candidate):
+                continue
+        else:
+            if not _LOCATION_LOOSE_CANDIDATE_PAT.match(candidate):
+                continue
+
+        if best_pos is None or idx < best_pos or (idx == best_pos and end > best_end):
+            best_pos = idx
+            best_end = end
+
+    if best_end is not None and best_end < len(token):
+        token = token[best_end:]
+
+    return token
+
+
+def _is_character_token(token: str) -> bool:
+    if token in CHAR_STOPWORDS:
+        return False
+    if _has_location_suffix(token):
+        return False
+    if token in _SEASON_TOKENS:
+        return False
+    if token.endswith("道") and token not in {"道长"}:
+        return False
+    if token[-1] in _SPEECH_TAIL_CHARS:
+        return False
+
+    # surname heuristic: reduce noise from arbitrary 2-3 char phrases
+    if len(token) == 2 and token[0] not in COMMON_SURNAMES_1:
+        return False
+    if len(token) == 3 and token[:2] not in COMMON_SURNAMES_2 and token[0] not in COMMON_SURNAMES_1:
+        return False
+    return True
+
+
+class _Extraction:
+    """Counts + mentions for all four entity kinds, filled by one pass over the lines.
+
+    With track_lines, char_lines also records every line each character candidate occurs on
+    (used by the volume mode's alias clustering).
+    """
+
+    def __init__(self, track_lines: bool = False) -> None:
+        self.time_counts: Dict[str, int] = {}
+        self.time_mentions = _MentionStore()
+        self.loc_counts: Dict[str, int] = {}
+        self.loc_mentions = _MentionStore()
+        self.char_counts: Dict[str, int] = {}
+        self.char_speech_hits: Dict[str, int] = {}
+        self.char_mentions = _MentionStore()
+        self.char_lines: Optional[Dict[str, Set[int]]] = {} if track_lines else None
+        self.event_counts: Dict[str, int] = {}
+        self.event_mentions = _MentionStore()
+
+    def scan_line(self, line_no: int, line: str) -> None:
+        # time markers
+        counts, mentions = self.time_counts, self.time_mentions
+        for pat in _TIME_PATTERNS:
+            for m in pat.finditer(line):
+                token = m.group(0).strip()
+                if not token:
+                    continue
+                counts[token] = counts.get(token, 0) + 1
+                mentions.add(token, line_no, line)
+
+        # locations
+        counts, mentions = self.loc_counts, self.loc_mentions
+        for m in _LOCATION_PAT.finditer(line):
+            token = _normalize_location(m.group(0))
+            if not token or not _has_location_suffix(token):
+                continue
+            counts[token] = counts.get(token, 0) + 1
+            mentions.add(token, line_no, line)
+        for m in _LOCATION_BRACKET_PAT.finditer(line):
+            inner = m.group(1).strip()
+            # only treat bracket tokens as location if it looks like one
+            if not inner or not _has_location_suffix(inner):
+                continue
+            token = f"【{inner}】"
+            counts[token] = counts.get(token, 0) + 1
+            mentions.add(token, line_no, line)
+
+        # character candidates
+        counts, speech_hits, mentions = self.char_counts, self.char_speech_hits, self.char_mentions
+        char_lines = self.char_lines
+        # high-confidence: name + speech verb patterns
+        for m in _SPEECH_NAME_PAT.finditer(line):
+            token = m.group(1).strip()
+            if not token or token in CHAR_STOPWORDS:
+                continue
+            counts[token] = counts.get(token, 0) + 2
+            speech_hits[token] = speech_hits.get(token, 0) + 2
+            mentions.add(token, line_no, line)
+            if char_lines is not None:
+                char_lines.setdefault(token, set()).add(line_no)
+        has_speech: Optional[bool] = None
+        for m in _CHAR_TOKEN_PAT.finditer(line):
+            token = m.group(0)
+            if not _is_character_token(token):
+                continue
+            counts[token] = counts.get(token, 0) + 1
+            if has_speech is None:
+                has_speech = bool(_SPEECH_VERB_RE.search(line)) or ("“" in line and "”" in line)
+            if has_speech:
+                speech_hits[token] = speech_hits.get(token, 0) + 1
+            mentions.add(token, line_no, line)
+            if char_lines is not None:
+                char_lines.setdefault(token, set()).add(line_no)
+
+        # events
+        counts, mentions = self.event_counts, self.event_mentions
+        for m in _EVENT_PAT.finditer(line):
+            token = m.group(0).strip()
+            if not token or token in CHAR_STOPWORDS:
+                continue
+            counts[token] = counts.get(token, 0) + 1
+            mentions.add(token, line_no, line)
+
+    def characters(self) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, List[Mention]]]:
+        # filter: require min frequency
+        kept = {k for k, v in self.char_counts.items() if v >= 2 or self.char_speech_hits.get(k, 0) >= 1}
+        counts = {k: self.char_counts[k] for k in kept}
+        # keep mentions only for kept tokens
+        by_key = self.char_mentions.by_key
+        mentions = {k: by_key[k] for k in kept if k in by_key}
+        speech_hits = {k: self.char_speech_hits.get(k, 0) for k in kept}
+        return counts, speech_hits, mentions
+
+    def events(self) -> Tuple[Dict[str, int], Dict[str, List[Mention]]]:
+        # limit extremely noisy outputs
+        counts = {k: v for k, v in self.event_counts.items() if len(k) <= 18}
+        by_key = self.event_mentions.by_key
+        mentions = {k: by_key[k] for k in counts.keys() if k in by_key}
+        return counts, mentions
+
+
+def _extract(lines: Iterable[Tuple[int, str]], track_lines: bool = False) -> _Extraction:
+    ex = _Extraction(track_lines)
+    for line_no, line in lines:
+        ex.scan_line(line_no, line)
+    return ex
+
+
+def scan_text(raw: str, track_lines: bool = False) -> _Extraction:
+    """Raw (unthresholded) extraction over chapter text *raw*, markdown stripped.
+
+    With *track_lines* the extraction also records the lines each character
+    token appears on (used by the volume mode's alias clustering).
+    """
+    return _extract(_strip_markdown_lines(raw.splitlines()), track_lines=track_lines)
+
+
+def normalize_time_marker(text: str) -> str:
+    # TODO: implement actual time normalization; currently identity mapping
+    return text
+
+
+def _build_entities(
+    counts: Dict[str, int],
+    mentions: Dict[str, List[Mention]],
+    confidence_fn: Union[Callable[[str], str], Callable[[str, int, int], str]],
+    extra: Optional[Dict[str, int]] = None,
+    limit: int = 30,
+) -> List[Entity]:
+    items: List[Tuple[str, int]] = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    out: List[Entity] = []
+    for text, _cnt in items:
+        if len(out) >= limit:
+            break
+        ms = mentions.get(text, [])
+        conf = confidence_fn(text) if extra is None else confidence_fn(text, counts[text], extra.get(text, 0))
+        out.append(Entity(text=text, confidence=conf, mentions=ms))
+    return _sort_entities(out)
+
+
+def read_chapter(chapter_path: str) -> str:
+    try:
+        with open(chapter_path, "r", encoding="utf-8-sig") as f:
+            return f.read()
+    except Exception as e:
+        _die(f"run-ner.sh: failed to read chapter: {e}", 1)
+
+
+def ner_text(raw: str, chapter_path: str) -> Dict[str, Any]:
+    """run-ner.sh report for chapter text *raw* (already decoded, BOM stripped)."""
+    ex = scan_text(raw)
+    time_counts, time_mentions = ex.time_counts, ex.time_mentions.by_key
+    loc_counts, loc_mentions = ex.loc_counts, ex.loc_mentions.by_key
+    char_counts, char_speech_hits, char_mentions = ex.characters()
+    event_counts, event_mentions = ex.events()
+
+    characters = _build_entities(char_counts, char_mentions, confidence_for_character, extra=char_speech_hits, limit=30)
+    locations = _build_entities(loc_counts, loc_mentions, confidence_for_location, limit=30)
+    time_markers = _build_entities(time_counts, time_mentions, confidence_for_time, limit=20)
+    events = _build_entities(event_counts, event_mentions, confidence_for_event, limit=20)
+
+    out: Dict[str, Any] = {
+        "schema_version": 1,
+        "chapter_path": chapter_path,
+        "entities": {
+            "characters": [
+                {
+                    "text": e.text,
+                    "slug_id": None,
+                    "confidence": e.confidence,
+                    "mentions": [{"line": m.line, "snippet": m.snippet} for m in e.mentions],
+                }
+                for e in characters
+            ],
+            "locations": [
+                {
+                    "text": e.text,
+                    "confidence": e.confidence,
+                    "mentions": [{"line": m.line, "snippet": m.snippet} for m in e.mentions],
+                }
+                for e in locations
+            ],
+            "time_markers": [
+                {
+                    "text": e.text,
+                    "normalized": normalize_time_marker(e.text),
+                    "confidence": e.confidence,
+                    "mentions": [{"line": m.line, "snippet": m.snippet} for m in e.mentions],
+                }
+                for e in time_markers
+            ],
+            "events": [
+                {
+                    "text": e.text,
+                    "confidence": e.confidence,
+                    "mentions": [{"line": m.line, "snippet": m.snippet} for m in e.mentions],
+                }
+                for e in events
+            ],
+        },
+    }
+    return out
+
+
+def main() -> None:
+    chapter_path = sys.argv[1]
+    out = ner_text(read_chapter(chapter_path), chapter_path)
+    sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"run-ner.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
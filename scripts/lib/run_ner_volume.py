@@ -0,0 +1,288 @@
+"""Volume-level NER: one entity roster for a whole volume / chapter range (run-ner.sh --volume).
+
+Every chapter goes through the same extractor as run-ner.sh (in parallel with
+--jobs), but the raw per-chapter candidates are merged first and the
+character frequency threshold (count >= 2 or any speech hit) is applied to
+the volume totals, so names that appear once in each of several chapters are
+kept.
+
+Character aliases are clustered: a candidate alias must have a known alias
+shape for a full name (林枫 -> 枫哥 / 林公子 / 小林 ...), appear mostly in
+chapters where that name also appears, and (almost) never on the same line
+as it.  Aliases are candidates for LLM verification, like everything else
+run-ner.sh emits.
+"""
+
+import json
+import sys
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import _lint_batch
+import run_ner
+
+_LIMITS = {"characters": 100, "locations": 100, "time_markers": 50, "events": 50}
+_MENTION_CAP = 5
+
+# Honorific / kinship suffixes that turn a surname or given name into an alias.
+_ALIAS_TITLES = [
+    "哥",
+    "兄",
+    "弟",
+    "姐",
+    "妹",
+    "公子",
+    "少爷",
+    "少",
+    "小姐",
+    "姑娘",
+    "大哥",
+    "师兄",
+    "师弟",
+    "师姐",
+    "师妹",
+    "前辈",
+    "先生",
+    "大人",
+]
+_ALIAS_TITLE_SET: Set[str] = set(_ALIAS_TITLES)
+# Share of the rarer name's chapters that must also contain the other name.
+_ALIAS_MIN_OVERLAP = 0.5
+# Two names on the same line are usually two people; allow a little extractor noise.
+_ALIAS_MAX_SAME_LINE_RATIO = 0.1
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    sys.stderr.write(msg.rstrip() + "\n")
+    raise SystemExit(exit_code)
+
+
+def _split_name(name: str) -> Optional[Tuple[str, str]]:
+    if len(name) >= 3 and name[:2] in run_ner.COMMON_SURNAMES_2:
+        return name[:2], name[2:]
+    if len(name) >= 2 and name[0] in run_ner.COMMON_SURNAMES_1:
+        return name[0], name[1:]
+    return None
+
+
+def alias_forms(name: str) -> Set[str]:
+    """Alias shapes of a surname + given-name *name*, e.g. 林枫 -> 枫哥, 林公子, 小林, 阿枫."""
+    parts = _split_name(name)
+    if parts is None:
+        return set()
+    surname, given = parts
+    if given in _ALIAS_TITLE_SET:
+        # Already an alias (林公子); do not derive aliases of aliases.
+        return set()
+    forms = {"小" + given[-1], "阿" + given[-1], "老" + surname, "小" + surname}
+    if len(given) >= 2:
+        forms.add(given)
+    for title in _ALIAS_TITLES:
+        forms.add(surname + title)
+        forms.add(given + title)
+    forms.discard(name)
+    return forms
+
+
+def _store_mentions(store: Any) -> Dict[str, List[List[Any]]]:
+    return {k: [[m.line, m.snippet] for m in v] for k, v in store.by_key.items()}
+
+
+def _chapter_partial(_compiled: Any, path: str) -> Dict[str, Any]:
+    """Raw (unthresholded) extraction results for one chapter."""
+    raw = run_ner.read_chapter(path)
+    ex = run_ner.scan_text(raw, track_lines=True)
+    char_lines = ex.char_lines or {}
+    same_line: Dict[str, int] = {}
+    for name, lines in char_lines.items():
+        for alias in alias_forms(name):
+            other = char_lines.get(alias)
+            if other is not None:
+                same_line[f"{name}\t{alias}"] = len(lines & other)
+    return {
+        "chapter": _lint_batch.chapter_no_from_path(path),
+        "time_markers": [ex.time_counts, _store_mentions(ex.time_mentions)],
+        "locations": [ex.loc_counts, _store_mentions(ex.loc_mentions)],
+        "events": [ex.event_counts, _store_mentions(ex.event_mentions)],
+        "characters": [ex.char_counts, _store_mentions(ex.char_mentions)],
+        "speech_hits": ex.char_speech_hits,
+        "lines": {k: len(v) for k, v in char_lines.items()},
+        "same_line": same_line,
+    }
+
+
+class _Totals:
+    """Volume totals for one entity kind."""
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+        self.chapters: Dict[str, List[int]] = {}
+        self.mentions: Dict[str, List[Dict[str, Any]]] = {}
+
+    def add(self, chapter: int, counts: Dict[str, int], mentions: Dict[str, List[List[Any]]]) -> None:
+        for key, n in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+            self.chapters.setdefault(key, []).append(chapter)
+        for key, items in mentions.items():
+            kept = self.mentions.setdefault(key, [])
+            for line, snippet in items[: _MENTION_CAP - len(kept)]:
+                kept.append({"chapter": chapter, "line": line, "snippet": snippet})
+
+    def describe(self, key: str) -> Dict[str, Any]:
+        chapters = self.chapters[key]
+        return {
+            "count": self.counts[key],
+            "chapter_count": len(chapters),
+            "first_chapter": chapters[0],
+            "last_chapter": chapters[-1],
+            "mentions": self.mentions.get(key, []),
+        }
+
+
+def _ranked(counts: Dict[str, int], keys: Any, limit: int) -> List[str]:
+    return sorted(keys, key=lambda k: (-counts[k], k))[:limit]
+
+
+def _cluster_characters(
+    chars: _Totals, speech_hits: Dict[str, int], lines: Dict[str, int], same_line: Dict[str, int]
+) -> List[Dict[str, Any]]:
+    kept = {k for k, v in chars.counts.items() if v >= 2 or speech_hits.get(k, 0) >= 1}
+
+    parent = {k: k for k in kept}
+
+    def find(k: str) -> str:
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    alias_of: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for name in sorted(kept):
+        for alias in alias_forms(name):
+            if alias not in kept:
+                continue
+            name_chapters = set(chars.chapters[name])
+            alias_chapters = set(chars.chapters[alias])
+            shared = len(name_chapters & alias_chapters)
+            overlap = shared / min(len(name_chapters), len(alias_chapters))
+            together = same_line.get(f"{name}\t{alias}", 0)
+            ratio = together / max(1, min(lines.get(name, 0), lines.get(alias, 0)))
+            if shared == 0 or overlap < _ALIAS_MIN_OVERLAP or ratio > _ALIAS_MAX_SAME_LINE_RATIO:
+                continue
+            evidence = {"shared_chapters": shared, "overlap": round(overlap, 3), "same_line": together}
+            # An alias shape can fit several full names (小林: 林枫 / 林婉儿); keep the most frequent.
+            prev = alias_of.get(alias)
+            if prev is not None and (chars.counts[prev[0]], prev[0]) >= (chars.counts[name], name):
+                continue
+            alias_of[alias] = (name, evidence)
+    for alias, (name, _evidence) in sorted(alias_of.items()):
+        parent[find(alias)] = find(name)
+
+    members: Dict[str, List[str]] = {}
+    for k in kept:
+        members.setdefault(find(k), []).append(k)
+
+    clusters = []
+    for group in members.values():
+        # Canonical: a member that is nobody's alias (a full name), most frequent first.
+        heads = [k for k in group if k not in alias_of] or group
+        canonical = min(heads, key=lambda k: (-chars.counts[k], k))
+        total = sum(chars.counts[k] for k in group)
+        total_speech = sum(speech_hits.get(k, 0) for k in group)
+        chapter_set = sorted({c for k in group for c in chars.chapters[k]})
+        entry = {
+            "text": canonical,
+            "slug_id": None,
+            "confidence": run_ner.confidence_for_character(canonical, total, total_speech),
+            "count": total,
+            "chapter_count": len(chapter_set),
+            "first_chapter": chapter_set[0],
+            "last_chapter": chapter_set[-1],
+            "aliases": [],
+            "mentions": chars.mentions.get(canonical, []),
+        }
+        for k in _ranked(chars.counts, [k for k in group if k != canonical], len(group)):
+            alias_entry: Dict[str, Any] = {"text": k, **chars.describe(k)}
+            if k in alias_of:
+                alias_entry["alias_of"] = alias_of[k][0]
+                alias_entry.update(alias_of[k][1])
+            entry["aliases"].append(alias_entry)
+        clusters.append(entry)
+    clusters.sort(key=lambda e: (-e["count"], e["text"]))
+    return clusters[: _LIMITS["characters"]]
+
+
+def volume_report(paths: List[str], jobs: int) -> Dict[str, Any]:
+    totals = {kind: _Totals() for kind in ("characters", "locations", "time_markers", "events")}
+    speech_hits: Dict[str, int] = {}
+    lines: Dict[str, int] = {}
+    same_line: Dict[str, int] = {}
+    chapters: List[int] = []
+
+    for partial in _lint_batch.lint_chapters(_chapter_partial, None, paths, jobs):
+        chapter = partial["chapter"]
+        chapters.append(chapter)
+        for kind, t in totals.items():
+            t.add(chapter, *partial[kind])
+        for src, dst in ((partial["speech_hits"], speech_hits), (partial["lines"], lines), (partial["same_line"], same_line)):
+            for k, n in src.items():
+                dst[k] = dst.get(k, 0) + n
+
+    def plain(kind: str, confidence_fn: Any, keys: Any) -> List[Dict[str, Any]]:
+        t = totals[kind]
+        out = []
+        for key in _ranked(t.counts, keys, _LIMITS[kind]):
+            entry: Dict[str, Any] = {"text": key}
+            if kind == "time_markers":
+                entry["normalized"] = run_ner.normalize_time_marker(key)
+            entry["confidence"] = confidence_fn(key)
+            entry.update(t.describe(key))
+            out.append(entry)
+        return out
+
+    events = totals["events"]
+    return {
+        "schema_version": 1,
+        "mode": "volume",
+        "scope": {"chapters": len(chapters), "from_chapter": chapters[0], "to_chapter": chapters[-1]},
+        "entities": {
+            "characters": _cluster_characters(totals["characters"], speech_hits, lines, same_line),
+            "locations": plain("locations", run_ner.confidence_for_location, totals["locations"].counts),
+            "time_markers": plain("time_markers", run_ner.confidence_for_time, totals["time_markers"].counts),
+            # limit extremely noisy outputs
+            "events": plain("events", run_ner.confidence_for_event, [k for k in events.counts if len(k) <= 18]),
+        },
+    }
+
+
+def main() -> None:
+    jobs = int(sys.argv[1])
+    lo = int(sys.argv[2]) if sys.argv[2] else 1
+    hi = int(sys.argv[3]) if sys.argv[3] else sys.maxsize
+
+    # One file per chapter number, as in entity-index.sh: a second file for the same
+    # chapter (e.g. from two directory args) would double-count it.
+    by_chapter: Dict[int, str] = {}
+    for path in _lint_batch.expand_chapters(sys.argv[4:]):
+        chapter = _lint_batch.chapter_no_from_path(path)
+        if chapter is None:
+            _die(f"run-ner.sh: cannot infer chapter number from file name: {path}", 1)
+        if not lo <= chapter <= hi:
+            continue
+        if chapter in by_chapter:
+            _die(f"run-ner.sh: chapter {chapter} matched by two files: {by_chapter[chapter]} and {path}", 1)
+        by_chapter[chapter] = path
+    if not by_chapter:
+        _die("run-ner.sh: no chapter files matched", 1)
+
+    out = volume_report([by_chapter[c] for c in sorted(by_chapter)], jobs)
+    sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"run-ner.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
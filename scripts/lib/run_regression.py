@@ -5,16 +5,24 @@ Reads existing project outputs (evaluations/logs/etc) and summarizes
 regression-friendly metrics.
 """
 
+import glob
+import hashlib
 import json
 import os
 import re
 import shutil
+import signal
 import sys
 import tempfile
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import _common
+import _quantile_sketch
+import _rule_index
+import eval_store
 
 
 # ---------------------------------------------------------------------------
@@ -34,8 +42,7 @@ def _load_json(path: str) -> Any:
 
 
 def _timestamp_id() -> str:
-    now = datetime.now(timezone.utc)
-    return now.strftime("%Y%m%dT%H%M%S") + f"_{now.strftime('%f')[:4]}Z"
+    return _common.timestamp_id()
 
 
 def _mkdir(path: str) -> None:
@@ -46,6 +53,120 @@ def _severity_rank(v: str) -> int:
     return {"high": 0, "medium": 1, "low": 2}.get(v, 9)
 
 
+# ---------------------------------------------------------------------------
+# Per-chapter contribution cache
+# ---------------------------------------------------------------------------
+
+# Bump when the shape of a cached contribution changes.
+_CACHE_SCHEMA_VERSION = 2
+
+# Files modified this recently may still change within the same mtime tick;
+# their entries are stored without a stat fast-path so the next run rehashes.
+_CACHE_RACY_WINDOW_NS = 2_000_000_000
+
+
+class _ContributionCache:
+    """On-disk cache of extracted per-chapter contributions.
+
+    Entries are keyed by absolute path and validated by (mtime_ns, size); on a
+    stat mismatch the file is re-read and its sha256 compared before falling
+    back to a full JSON parse + extraction.  An empty *path* keeps the cache
+    in memory only (watch mode with --no-cache).
+
+    *blocks* (set by watch mode) keeps per-block partial aggregates between
+    runs of the same process; see _fold_blocks().
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.old: Dict[str, Dict[str, Any]] = {"evals": {}, "logs": {}}
+        self.new: Dict[str, Dict[str, Any]] = {"evals": {}, "logs": {}}
+        self.blocks: Optional[Dict[str, Dict[int, Tuple[Any, Dict[str, Any]]]]] = None
+        if not path:
+            return
+        try:
+            obj = _common.load_json(path, missing_ok=True)
+        except Exception:
+            obj = None  # corrupt cache: rebuild from scratch
+        if isinstance(obj, dict) and obj.get("schema_version") == _CACHE_SCHEMA_VERSION:
+            for section in self.old:
+                entries = obj.get(section)
+                if isinstance(entries, dict):
+                    self.old[section] = entries
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        payload = {"schema_version": _CACHE_SCHEMA_VERSION, **self.new}
+        _common.write_json_atomic(self.path, payload)
+
+    def roll(self) -> None:
+        """Make this run's entries the baseline of the next run (same process)."""
+        self.old = self.new
+        self.new = {"evals": {}, "logs": {}}
+
+
+def _cache_path(runs_dir: str, project_dir_abs: str) -> str:
+    key = hashlib.sha256(project_dir_abs.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(os.path.abspath(runs_dir), ".cache", f"contributions-{key}.json")
+
+
+def _cache_entry(st: os.stat_result, digest: str, value: Any) -> Dict[str, Any]:
+    racy = time.time_ns() - st.st_mtime_ns < _CACHE_RACY_WINDOW_NS
+    return {
+        "mtime_ns": None if racy else st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+        "value": value,
+    }
+
+
+def _cache_probe(cache: _ContributionCache, section: str, path: str) -> Tuple[bool, Any]:
+    """Serve *path* from *cache* when unchanged.  Returns (hit, contribution)."""
+    prev = cache.old[section].get(path)
+    if not isinstance(prev, dict):
+        return (False, None)
+    try:
+        st = os.stat(path)
+        if prev.get("mtime_ns") == st.st_mtime_ns and prev.get("size") == st.st_size:
+            cache.new[section][path] = prev
+            return (True, prev.get("value"))
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return (False, None)
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != prev.get("sha256"):
+        return (False, None)
+    cache.new[section][path] = _cache_entry(st, digest, prev.get("value"))
+    return (True, prev.get("value"))
+
+
+def _parse_json_bytes(path: str, data: bytes) -> Any:
+    try:
+        return json.loads(data.decode("utf-8"))
+    except Exception as e:
+        _die(f"invalid JSON at {path}: {e}", 1)
+
+
+def _read_contribution(
+    path: str,
+    extract: Callable[[Any], Optional[Dict[str, Any]]],
+    want_entry: bool,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Parse *path* and extract its contribution.  Returns (contribution, cache entry or None)."""
+    if not want_entry:
+        return (extract(_load_json(path)), None)
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return (extract(None), None)
+    value = extract(_parse_json_bytes(path, data))
+    return (value, _cache_entry(st, hashlib.sha256(data).hexdigest(), value))
+
+
 def _summarize_continuity(report: Any) -> Optional[Dict[str, Any]]:
     if report is None:
         return None
@@ -217,114 +338,463 @@ def _summarize_ai_blacklist(project_dir: str) -> Optional[Dict[str, Any]]:
     }
 
 
-def _summarize_logs(project_dir: str) -> Dict[str, Any]:
-    logs_dir = os.path.join(project_dir, "logs")
-    if not os.path.isdir(logs_dir):
-        return {"present": False}
+def _log_contribution(obj: Any) -> Optional[Dict[str, Any]]:
+    """Extract one chapter log's contribution to the logs summary (cacheable)."""
+    if not isinstance(obj, dict):
+        return None
+    stage_models: List[str] = []
+    # [stage name, model, duration_ms, input_tokens, output_tokens]; missing numbers are None.
+    stage_records: List[List[Any]] = []
+    stages = obj.get("stages")
+    if isinstance(stages, list):
+        for st in stages:
+            if not isinstance(st, dict):
+                continue
+            m = _common.as_str(st.get("model"))
+            if m:
+                stage_models.append(m)
+            stage_records.append(
+                [
+                    _common.as_str(st.get("name")) or "unknown",
+                    m or "unknown",
+                    _common.as_float(st.get("duration_ms")),
+                    _common.as_int(st.get("input_tokens")),
+                    _common.as_int(st.get("output_tokens")),
+                ]
+            )
+
+    judge_models: List[str] = []
+    judges = obj.get("judges")
+    if isinstance(judges, dict):
+        for role in ("primary", "secondary"):
+            judge = judges.get(role)
+            if isinstance(judge, dict):
+                m = _common.as_str(judge.get("model"))
+                if m:
+                    judge_models.append(m)
+
+    return {
+        "gate": _common.as_str(obj.get("gate_decision")) or "unknown",
+        "revisions": _common.as_int(obj.get("revisions")),
+        "force_passed": obj.get("force_passed") is True,
+        "stage_models": stage_models,
+        "stage_records": stage_records,
+        "judge_models": judge_models,
+    }
+
+
+def _find_log_files(logs_dir: str) -> List[str]:
     log_files = []
     for name in os.listdir(logs_dir):
         if re.match(r"^chapter-\d+-log\.json$", name):
             log_files.append(os.path.join(logs_dir, name))
     log_files.sort()
+    return log_files
 
-    stages_by_model: Dict[str, int] = {}
-    judge_models: Dict[str, int] = {}
-    gate_decisions: Dict[str, int] = {}
-    revisions_sum = 0
-    force_passed_count = 0
 
-    for path in log_files:
-        obj = _load_json(path)
-        if not isinstance(obj, dict):
-            continue
-        gate = _common.as_str(obj.get("gate_decision")) or "unknown"
-        gate_decisions[gate] = gate_decisions.get(gate, 0) + 1
-
-        rev = _common.as_int(obj.get("revisions"))
-        if rev is not None:
-            revisions_sum += rev
-        if obj.get("force_passed") is True:
-            force_passed_count += 1
-
-        stages = obj.get("stages")
-        if isinstance(stages, list):
-            for st in stages:
-                if not isinstance(st, dict):
-                    continue
-                m = _common.as_str(st.get("model"))
-                if m:
-                    stages_by_model[m] = stages_by_model.get(m, 0) + 1
+# ---------------------------------------------------------------------------
+# Stage latency / token throughput (mergeable across shards and projects)
+# ---------------------------------------------------------------------------
 
-        judges = obj.get("judges")
-        if isinstance(judges, dict):
-            primary = judges.get("primary")
-            if isinstance(primary, dict):
-                m = _common.as_str(primary.get("model"))
-                if m:
-                    judge_models[m] = judge_models.get(m, 0) + 1
-            secondary = judges.get("secondary")
-            if isinstance(secondary, dict):
-                m = _common.as_str(secondary.get("model"))
-                if m:
-                    judge_models[m] = judge_models.get(m, 0) + 1
+_LATENCY_QUANTILES = (0.5, 0.9, 0.99)
 
+
+def _new_stage_stats() -> Dict[str, Any]:
     return {
-        "present": True,
-        "chapter_logs_count": len(log_files),
-        "gate_decisions": dict(sorted(gate_decisions.items())),
-        "revisions_sum": revisions_sum,
-        "force_passed_count": force_passed_count,
-        "stages_by_model": dict(sorted(stages_by_model.items())),
-        "judge_models": dict(sorted(judge_models.items())),
+        "stages": 0,
+        "duration_ms": _quantile_sketch.new_sketch(),
+        "duration_ms_sum": 0.0,
+        "tokens_reported": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        # Output tokens and duration of stages reporting both (tokens/sec denominator).
+        "rate_output_tokens": 0,
+        "rate_duration_ms": 0.0,
+    }
+
+
+def _add_stage_record(stats: Dict[str, Any], duration_ms: Optional[float], input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+    stats["stages"] += 1
+    if duration_ms is not None and duration_ms >= 0:
+        _quantile_sketch.add(stats["duration_ms"], duration_ms)
+        stats["duration_ms_sum"] += duration_ms
+    if input_tokens is not None or output_tokens is not None:
+        stats["tokens_reported"] += 1
+        stats["input_tokens"] += input_tokens or 0
+        stats["output_tokens"] += output_tokens or 0
+    if output_tokens is not None and duration_ms is not None and duration_ms > 0:
+        stats["rate_output_tokens"] += output_tokens
+        stats["rate_duration_ms"] += duration_ms
+
+
+def _merge_stage_stats(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    for key, value in src.items():
+        if key == "duration_ms":
+            _quantile_sketch.merge(dst[key], value)
+        else:
+            dst[key] += value
+
+
+def new_stage_latency() -> Dict[str, Any]:
+    """Empty stage latency aggregate: stage stats keyed by stage name and by model."""
+    return {"by_stage": {}, "by_model": {}}
+
+
+def merge_stage_latency(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    for group in ("by_stage", "by_model"):
+        for key, stats in src[group].items():
+            if key not in dst[group]:
+                dst[group][key] = _new_stage_stats()
+            _merge_stage_stats(dst[group][key], stats)
+
+
+def _stage_stats_report(stats: Dict[str, Any]) -> Dict[str, Any]:
+    sketch = stats["duration_ms"]
+    duration = None
+    if sketch["count"] > 0:
+        p50, p90, p99 = _quantile_sketch.quantiles(sketch, _LATENCY_QUANTILES)
+        duration = {
+            "n": sketch["count"],
+            "p50": round(p50, 1),
+            "p90": round(p90, 1),
+            "p99": round(p99, 1),
+            "mean": round(stats["duration_ms_sum"] / sketch["count"], 1),
+            "max": round(sketch["max"], 1),
+            "total": round(stats["duration_ms_sum"], 1),
+        }
+    rate = None
+    if stats["rate_duration_ms"] > 0:
+        rate = round(stats["rate_output_tokens"] / (stats["rate_duration_ms"] / 1000.0), 2)
+    return {
+        "stages": stats["stages"],
+        "duration_ms": duration,
+        "tokens": {
+            "reported": stats["tokens_reported"],
+            "input_total": stats["input_tokens"],
+            "output_total": stats["output_tokens"],
+            "total": stats["input_tokens"] + stats["output_tokens"],
+        },
+        "output_tokens_per_sec": rate,
     }
 
 
-def _get_rule_id(layer: str, item: Dict[str, Any]) -> str:
-    if layer == "L1":
-        return _common.as_str(item.get("rule_id")) or "UNKNOWN"
-    if layer == "L2":
-        return _common.as_str(item.get("contract_id")) or _common.as_str(item.get("rule_id")) or "UNKNOWN"
-    if layer == "L3":
-        return _common.as_str(item.get("objective_id")) or _common.as_str(item.get("rule_id")) or "UNKNOWN"
-    if layer == "LS":
-        return _common.as_str(item.get("rule_id")) or "UNKNOWN"
-    return _common.as_str(item.get("rule_id")) or "UNKNOWN"
+def stage_latency_report(agg: Dict[str, Any]) -> Dict[str, Any]:
+    """Per stage and per model: stage count, duration_ms p50/p90/p99 (sketch, ~1% relative error), tokens, output tokens/sec."""
+    return {
+        "quantile_relative_accuracy": _quantile_sketch.RELATIVE_ACCURACY,
+        "by_stage": {k: _stage_stats_report(agg["by_stage"][k]) for k in sorted(agg["by_stage"])},
+        "by_model": {k: _stage_stats_report(agg["by_model"][k]) for k in sorted(agg["by_model"])},
+    }
+
 
+def _new_log_aggregate() -> Dict[str, Any]:
+    return {
+        "gate_decisions": {},
+        "revisions_sum": 0,
+        "force_passed_count": 0,
+        "stages_by_model": {},
+        "judge_models": {},
+        "stage_latency": new_stage_latency(),
+    }
 
-def _norm_confidence(v: Any) -> str:
-    s = _common.as_str(v)
-    if not s:
-        return "unknown"
-    s = s.lower()
-    if s in {"high", "medium", "low"}:
-        return s
-    return "unknown"
+
+def _add_log_contribution(agg: Dict[str, Any], _key: Any, c: Optional[Dict[str, Any]]) -> None:
+    if c is None:
+        return
+    gate = c["gate"]
+    agg["gate_decisions"][gate] = agg["gate_decisions"].get(gate, 0) + 1
+    if c["revisions"] is not None:
+        agg["revisions_sum"] += c["revisions"]
+    if c["force_passed"]:
+        agg["force_passed_count"] += 1
+    for m in c["stage_models"]:
+        agg["stages_by_model"][m] = agg["stages_by_model"].get(m, 0) + 1
+    for m in c["judge_models"]:
+        agg["judge_models"][m] = agg["judge_models"].get(m, 0) + 1
+    latency = agg["stage_latency"]
+    for name, model, duration_ms, input_tokens, output_tokens in c["stage_records"]:
+        for group, key in (("by_stage", name), ("by_model", model)):
+            stats = latency[group].get(key)
+            if stats is None:
+                stats = latency[group][key] = _new_stage_stats()
+            _add_stage_record(stats, duration_ms, input_tokens, output_tokens)
+
+
+def _merge_log_aggregates(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    dst["revisions_sum"] += src["revisions_sum"]
+    dst["force_passed_count"] += src["force_passed_count"]
+    for key in ("gate_decisions", "stages_by_model", "judge_models"):
+        _merge_counts(dst[key], src[key])
+    merge_stage_latency(dst["stage_latency"], src["stage_latency"])
+
+
+def _merge_counts(dst: Dict[str, int], src: Dict[str, int]) -> None:
+    for k, v in src.items():
+        dst[k] = dst.get(k, 0) + v
+
+
+def _summarize_logs(
+    project_dir: str, cache: Optional[_ContributionCache] = None, jobs: int = 1
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Logs summary and the raw stage latency aggregate (mergeable across projects)."""
+    logs_dir = os.path.join(project_dir, "logs")
+    if not os.path.isdir(logs_dir):
+        return ({"present": False}, new_stage_latency())
+    log_files = _find_log_files(logs_dir)
+
+    agg = _aggregate("logs", [(path, path) for path in log_files], cache, jobs)
+
+    summary = {
+        "present": True,
+        "chapter_logs_count": len(log_files),
+        "gate_decisions": dict(sorted(agg["gate_decisions"].items())),
+        "revisions_sum": agg["revisions_sum"],
+        "force_passed_count": agg["force_passed_count"],
+        "stages_by_model": dict(sorted(agg["stages_by_model"].items())),
+        "judge_models": dict(sorted(agg["judge_models"].items())),
+        "stage_latency": stage_latency_report(agg["stage_latency"]),
+    }
+    return (summary, agg["stage_latency"])
 
 
-def _norm_status(v: Any) -> str:
-    s = _common.as_str(v)
-    if not s:
-        return "unknown"
-    return s.lower()
+_VIOLATION_STATUSES = {"violation", "violation_suspected"}
 
 
 def _is_violation_status(status: str) -> bool:
-    return status in {"violation", "violation_suspected"}
+    return status in _VIOLATION_STATUSES
 
 
-def _is_high_conf_violation(layer: str, item: Dict[str, Any]) -> bool:
-    status = _norm_status(item.get("status"))
-    if status != "violation":
-        return False
-    conf = _norm_confidence(item.get("confidence"))
-    if conf != "high":
+def _is_high_conf_violation(layer: str, status: str, confidence: str, constraint_type: Optional[str]) -> bool:
+    if status != "violation" or confidence != "high":
         return False
     if layer != "LS":
         return True
-    constraint_type = _common.as_str(item.get("constraint_type"))
-    if constraint_type is None or constraint_type == "hard":
-        return True
-    return False
+    return constraint_type is None or constraint_type == "hard"
+
+
+def _contribution_from_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Contribution of one eval_store record (the same record extract_record() builds from the JSON)."""
+    if not record["is_object"]:
+        return None
+    violations: List[List[str]] = []  # [layer, rule_id, confidence]
+    high_conf_violation = False
+    for layer, rule_id, status, confidence, constraint_type in record["checks"]:
+        if _is_violation_status(status):
+            violations.append([layer, rule_id, confidence])
+        if _is_high_conf_violation(layer, status, confidence, constraint_type):
+            high_conf_violation = True
+
+    return {
+        "overall": record["overall"],
+        "dimension_scores": dict(record["dimension_scores"]),
+        "violations": violations,
+        "high_conf_violation": high_conf_violation,
+    }
+
+
+def _eval_contribution(obj: Any) -> Optional[Dict[str, Any]]:
+    """Extract one chapter eval's contribution to the Spec+LS/score aggregates (cacheable)."""
+    if not isinstance(obj, dict):
+        return None
+    return _contribution_from_record(
+        {
+            "is_object": True,
+            "overall": _common.extract_overall(obj),
+            "dimension_scores": _common.extract_dimension_scores(obj),
+            "checks": _common.extract_check_rows(obj),
+        }
+    )
+
+
+def _new_eval_aggregate() -> Dict[str, Any]:
+    return {
+        "violations_total": 0,
+        "chapters_with_any_violation": set(),
+        "chapters_with_high_conf_violation": set(),
+        "violations_by_conf": {"high": 0, "medium": 0, "low": 0, "unknown": 0},
+        "violations_by_layer": {"L1": 0, "L2": 0, "L3": 0, "LS": 0, "unknown": 0},
+        "by_rule": {},  # layer -> rule_id -> confidence -> count
+        "chapters_by_rule": {},  # layer -> rule_id -> confidence -> chapter set (rule index)
+        # Scores are kept per (chapter, path) rather than as running sums so
+        # that partial aggregates merge exactly: means are summed in chapter order.
+        "overall_by_chapter": {},
+        "dims_by_chapter": {},  # dim -> (chapter, path) -> score
+    }
+
+
+def _add_eval_contribution(agg: Dict[str, Any], key: Tuple[int, str], c: Optional[Dict[str, Any]]) -> None:
+    if c is None:
+        return
+    chapter = key[0]
+    if c["overall"] is not None:
+        agg["overall_by_chapter"][key] = c["overall"]
+    for k, v in c["dimension_scores"].items():
+        agg["dims_by_chapter"].setdefault(k, {})[key] = float(v)
+
+    by_rule = agg["by_rule"]
+    chapters_by_rule = agg["chapters_by_rule"]
+    for layer, rule_id, conf in c["violations"]:
+        agg["violations_total"] += 1
+        agg["violations_by_conf"][conf] = agg["violations_by_conf"].get(conf, 0) + 1
+        agg["violations_by_layer"][layer] = agg["violations_by_layer"].get(layer, 0) + 1
+        by_rule.setdefault(layer, {}).setdefault(rule_id, {}).setdefault(conf, 0)
+        by_rule[layer][rule_id][conf] += 1
+        chapters_by_rule.setdefault(layer, {}).setdefault(rule_id, {}).setdefault(conf, set()).add(chapter)
+
+    if c["violations"]:
+        agg["chapters_with_any_violation"].add(chapter)
+    if c["high_conf_violation"]:
+        agg["chapters_with_high_conf_violation"].add(chapter)
+
+
+def _merge_eval_aggregates(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    dst["violations_total"] += src["violations_total"]
+    dst["chapters_with_any_violation"] |= src["chapters_with_any_violation"]
+    dst["chapters_with_high_conf_violation"] |= src["chapters_with_high_conf_violation"]
+    _merge_counts(dst["violations_by_conf"], src["violations_by_conf"])
+    _merge_counts(dst["violations_by_layer"], src["violations_by_layer"])
+    for layer, rules in src["by_rule"].items():
+        dst_rules = dst["by_rule"].setdefault(layer, {})
+        for rule_id, conf_map in rules.items():
+            _merge_counts(dst_rules.setdefault(rule_id, {}), conf_map)
+    for layer, rules in src["chapters_by_rule"].items():
+        dst_rules = dst["chapters_by_rule"].setdefault(layer, {})
+        for rule_id, conf_map in rules.items():
+            dst_confs = dst_rules.setdefault(rule_id, {})
+            for conf, chapters in conf_map.items():
+                dst_confs.setdefault(conf, set()).update(chapters)
+    dst["overall_by_chapter"].update(src["overall_by_chapter"])
+    for k, by_chapter in src["dims_by_chapter"].items():
+        dst["dims_by_chapter"].setdefault(k, {}).update(by_chapter)
+
+
+# section -> (extract, new aggregate, add contribution, merge aggregates)
+_SECTIONS: Dict[str, Tuple[Callable[..., Any], ...]] = {
+    "evals": (_eval_contribution, _new_eval_aggregate, _add_eval_contribution, _merge_eval_aggregates),
+    "logs": (_log_contribution, _new_log_aggregate, _add_log_contribution, _merge_log_aggregates),
+}
+
+
+def _extract_shard(section: str, items: List[Tuple[Any, str]], want_entries: bool) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Parse a shard of files into a partial aggregate.  Runs in pool workers."""
+    extract, new_aggregate, add, _merge = _SECTIONS[section]
+    agg = new_aggregate()
+    entries: Dict[str, Any] = {}
+    for key, path in items:
+        value, entry = _read_contribution(path, extract, want_entries)
+        add(agg, key, value)
+        if entry is not None:
+            entries[path] = entry
+    return (agg, entries)
+
+
+def _shard(items: List[Tuple[Any, str]], jobs: int) -> List[List[Tuple[Any, str]]]:
+    # A few shards per worker keeps the pool busy when file sizes are uneven.
+    size = max(1, -(-len(items) // (jobs * 4)))
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+# Files of a section are spread over this many blocks by path hash (watch mode).
+_FOLD_BLOCKS = 256
+
+
+def _fold_blocks(
+    section: str, items: List[Tuple[Any, str]], entries: Dict[str, Any], blocks: Dict[str, Dict[int, Tuple[Any, Dict[str, Any]]]]
+) -> Dict[str, Any]:
+    """Aggregate of *items* from the cached contributions, re-folding only changed blocks.
+
+    Items are partitioned by a hash of their path, so adding or deleting a
+    file only touches its own block.  A block whose (key, path, sha256) list
+    matches the previous run (kept in *blocks*) reuses its partial
+    aggregate; the partials are then merged, which costs O(blocks) merges
+    instead of one add per file.  *entries* are this run's cache entries.
+    """
+    _extract, new_aggregate, add, merge = _SECTIONS[section]
+    members: Dict[int, List[Tuple[Any, str]]] = {}
+    for key, path in items:
+        members.setdefault(zlib.crc32(path.encode("utf-8")) % _FOLD_BLOCKS, []).append((key, path))
+
+    prev_blocks = blocks.get(section, {})
+    fresh: Dict[int, Tuple[Any, Dict[str, Any]]] = {}
+    agg = new_aggregate()
+    for block in sorted(members):
+        block_items = members[block]
+        # Files that vanished mid-run have no entry and contribute nothing.
+        sig = tuple((key, path, entries[path]["sha256"] if path in entries else None) for key, path in block_items)
+        prev = prev_blocks.get(block)
+        if prev is not None and prev[0] == sig:
+            part = prev[1]
+        else:
+            part = new_aggregate()
+            for key, path in block_items:
+                entry = entries.get(path)
+                add(part, key, entry["value"] if entry is not None else None)
+        fresh[block] = (sig, part)
+        merge(agg, part)
+    blocks[section] = fresh
+    return agg
+
+
+def _aggregate(section: str, items: List[Tuple[Any, str]], cache: Optional[_ContributionCache], jobs: int) -> Dict[str, Any]:
+    """Aggregate (key, path) items of *section*, serving unchanged files from *cache*.
+
+    With jobs > 1 the cache misses are parsed across a process pool; partial
+    aggregates are order-independent, so the result matches the serial path.
+    A cache with *blocks* (watch mode) folds through _fold_blocks() instead.
+    """
+    _extract, new_aggregate, add, merge = _SECTIONS[section]
+    agg = new_aggregate()
+    blocks = cache.blocks if cache is not None else None
+
+    pending: List[Tuple[Any, str]] = []
+    for key, path in items:
+        if cache is not None:
+            hit, value = _cache_probe(cache, section, path)
+            if hit:
+                if blocks is None:
+                    add(agg, key, value)
+                continue
+        pending.append((key, path))
+
+    want_entries = cache is not None
+    if jobs > 1 and len(pending) > 1:
+        shards = _shard(pending, jobs)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(shards))) as pool:
+            n = len(shards)
+            results = list(pool.map(_extract_shard, [section] * n, shards, [want_entries] * n))
+    else:
+        results = [_extract_shard(section, pending, want_entries)]
+
+    for part, entries in results:
+        merge(agg, part)
+        if cache is not None:
+            cache.new[section].update(entries)
+    if cache is not None and blocks is not None:
+        return _fold_blocks(section, items, cache.new[section], blocks)
+    return agg
+
+
+def _chapter_records(agg: Dict[str, Any], chapters: List[int]) -> List[Dict[str, Any]]:
+    """One record per chapter (ascending): overall score and distinct [layer, rule_id, confidence] violations."""
+    overall_by_chapter: Dict[int, float] = {}
+    for (ch, _path), v in sorted(agg["overall_by_chapter"].items()):
+        overall_by_chapter[ch] = v
+    violations_by_chapter: Dict[int, List[List[str]]] = {}
+    for layer, rules in agg["chapters_by_rule"].items():
+        for rule_id, conf_map in rules.items():
+            for conf, chs in conf_map.items():
+                for ch in chs:
+                    violations_by_chapter.setdefault(ch, []).append([layer, rule_id, conf])
+    high = agg["chapters_with_high_conf_violation"]
+    return [
+        {
+            "chapter": ch,
+            "overall": overall_by_chapter.get(ch),
+            "violations": sorted(violations_by_chapter.get(ch, [])),
+            "high_conf_violation": ch in high,
+        }
+        for ch in sorted(set(chapters))
+    ]
 
 
 def _format_md_report(data: Dict[str, Any]) -> str:
@@ -352,6 +822,18 @@ def _format_md_report(data: Dict[str, Any]) -> str:
             lines.append(f"- {it.get('layer')} {it.get('rule_id')}: {it.get('count')}")
         lines.append("")
 
+    latency = summary.get("stage_latency")
+    if isinstance(latency, dict) and latency.get("by_stage"):
+        lines.append("## Stage Latency (logs/chapter-*-log.json)")
+        lines.append("")
+        for name, st in latency["by_stage"].items():
+            d = st.get("duration_ms") or {}
+            lines.append(
+                f"- {name}: {st.get('stages')} stages, p50/p90/p99 {d.get('p50')}/{d.get('p90')}/{d.get('p99')} ms, "
+                f"tokens {st['tokens']['total']}, {st.get('output_tokens_per_sec')} output tok/s"
+            )
+        lines.append("")
+
     if data.get("continuity") is not None:
         lines.append("## Continuity (logs/continuity/latest.json)")
         lines.append("")
@@ -378,15 +860,28 @@ def _format_md_report(data: Dict[str, Any]) -> str:
     return "\n".join(lines).rstrip() + "\n"
 
 
-def main() -> None:
-    project_dir = sys.argv[1]
-    labels_path = sys.argv[2].strip()
-    runs_dir = sys.argv[3]
-    archive = int(sys.argv[4]) == 1
-    include_continuity = int(sys.argv[5]) == 1
-    include_foreshadowing = int(sys.argv[6]) == 1
-    include_style = int(sys.argv[7]) == 1
-
+def build_run(
+    project_dir: str,
+    labels_path: str,
+    runs_dir: str,
+    *,
+    include_continuity: bool = True,
+    include_foreshadowing: bool = True,
+    include_style: bool = True,
+    use_cache: bool = True,
+    save_cache: bool = True,
+    jobs: int = 1,
+    use_eval_store: bool = False,
+    cache: Optional[_ContributionCache] = None,
+) -> Dict[str, Any]:
+    """Compute one project's regression run (config, summary, report) without writing it.
+
+    The contribution cache under runs_dir is read when *use_cache* and only
+    written back when *save_cache* (callers pass False for --no-archive).
+    With *use_eval_store* the eval aggregates come from the project's eval_store
+    (refreshed from changed eval files first) instead of the contribution cache.
+    A *cache* passed in is used instead of the one under runs_dir (saved only with *save_cache*).
+    """
     project_dir_abs = os.path.abspath(project_dir)
 
     eval_dir = os.path.join(project_dir_abs, "evaluations")
@@ -406,70 +901,38 @@ def main() -> None:
         last_completed = max(chapters)
 
     # Spec+LS compliance aggregation.
-    violations_total = 0
-    chapters_with_any_violation = set()
-    chapters_with_high_conf_violation = set()
-
-    violations_by_conf: Dict[str, int] = {"high": 0, "medium": 0, "low": 0, "unknown": 0}
-    violations_by_layer: Dict[str, int] = {"L1": 0, "L2": 0, "L3": 0, "LS": 0, "unknown": 0}
+    if cache is None and use_cache:
+        cache = _ContributionCache(_cache_path(runs_dir, project_dir_abs))
+    if use_eval_store:
+        try:
+            # Only violation rows feed the aggregates (high-confidence ones are a subset).
+            records, _refresh = eval_store.load_project(
+                project_dir_abs, fields=("dimension_scores", "checks"), check_statuses=sorted(_VIOLATION_STATUSES)
+            )
+        except ValueError as e:
+            _die(str(e), 1)
+        if cache is not None:
+            # Evals are not read through the cache this run; keep its entries for the next one.
+            cache.new["evals"] = cache.old["evals"]
+        agg = _new_eval_aggregate()
+        for ch, path in eval_items:
+            _add_eval_contribution(agg, (ch, path), _contribution_from_record(records[path]))
+    else:
+        agg = _aggregate("evals", [((ch, path), path) for ch, path in eval_items], cache, jobs)
 
-    by_rule: Dict[str, Dict[str, Dict[str, int]]] = {}  # layer -> rule_id -> confidence -> count
+    violations_total = agg["violations_total"]
+    chapters_with_any_violation = agg["chapters_with_any_violation"]
+    chapters_with_high_conf_violation = agg["chapters_with_high_conf_violation"]
+    violations_by_conf = agg["violations_by_conf"]
+    violations_by_layer = agg["violations_by_layer"]
+    by_rule = agg["by_rule"]
 
-    overall_scores: List[float] = []
+    overall_scores = [agg["overall_by_chapter"][ch] for ch in sorted(agg["overall_by_chapter"])]
     dim_sums: Dict[str, float] = {}
     dim_counts: Dict[str, int] = {}
-
-    for chapter, path in eval_items:
-        obj = _load_json(path)
-        if not isinstance(obj, dict):
-            continue
-
-        overall = _common.extract_overall(obj)
-        if overall is not None:
-            overall_scores.append(overall)
-
-        scores = _common.extract_dimension_scores(obj)
-        for k, v in scores.items():
-            dim_sums[k] = dim_sums.get(k, 0.0) + float(v)
-            dim_counts[k] = dim_counts.get(k, 0) + 1
-
-        cv = _common.extract_contract_verification(obj)
-        layer_map = {
-            "L1": cv.get("l1_checks"),
-            "L2": cv.get("l2_checks"),
-            "L3": cv.get("l3_checks"),
-            "LS": cv.get("ls_checks"),
-        }
-
-        chapter_any_violation = False
-        chapter_high_violation = False
-
-        for layer, checks in layer_map.items():
-            if not isinstance(checks, list):
-                continue
-            for it in checks:
-                if not isinstance(it, dict):
-                    continue
-                status = _norm_status(it.get("status"))
-                conf = _norm_confidence(it.get("confidence"))
-
-                if _is_violation_status(status):
-                    chapter_any_violation = True
-                    violations_total += 1
-                    violations_by_conf[conf] = violations_by_conf.get(conf, 0) + 1
-                    violations_by_layer[layer] = violations_by_layer.get(layer, 0) + 1
-
-                    rule_id = _get_rule_id(layer, it)
-                    by_rule.setdefault(layer, {}).setdefault(rule_id, {}).setdefault(conf, 0)
-                    by_rule[layer][rule_id][conf] += 1
-
-                if _is_high_conf_violation(layer, it):
-                    chapter_high_violation = True
-
-        if chapter_any_violation:
-            chapters_with_any_violation.add(chapter)
-        if chapter_high_violation:
-            chapters_with_high_conf_violation.add(chapter)
+    for k, by_chapter in agg["dims_by_chapter"].items():
+        dim_sums[k] = sum(by_chapter[ch] for ch in sorted(by_chapter))
+        dim_counts[k] = len(by_chapter)
 
     def _rate(ok: int, total: int) -> float:
         if total <= 0:
@@ -515,7 +978,9 @@ def main() -> None:
         style_summary = _summarize_style_drift(_load_json(os.path.join(project_dir_abs, "style-drift.json")))
 
     blacklist_summary = _summarize_ai_blacklist(project_dir_abs)
-    logs_summary = _summarize_logs(project_dir_abs)
+    logs_summary, stage_latency = _summarize_logs(project_dir_abs, cache, jobs)
+    if cache is not None and save_cache:
+        cache.save()
 
     run_id = _timestamp_id()
     generated_at = _common.iso_utc_now()
@@ -554,6 +1019,7 @@ def main() -> None:
         "violations_by_layer": violations_by_layer,
         "score_overall": score_summary,
         "score_dimensions": dim_summary,
+        "stage_latency": logs_summary.get("stage_latency"),
     }
 
     report = {
@@ -578,37 +1044,271 @@ def main() -> None:
         "logs": logs_summary,
     }
 
-    out_json = json.dumps(report, ensure_ascii=False, sort_keys=True) + "\n"
-    sys.stdout.write(out_json)
+    rule_index = {
+        "schema_version": _rule_index.SCHEMA_VERSION,
+        "run_id": run_id,
+        "generated_at": generated_at,
+        "project_path": project_dir_abs,
+        "chapters_total": chapters_total,
+        "encoding": "delta",
+        "index": _rule_index.build_index(agg["chapters_by_rule"]),
+    }
+
+    return {
+        "run_id": run_id,
+        "config": config_snapshot,
+        "summary": summary_metrics,
+        "report": report,
+        "rule_index": rule_index,
+        "chapter_records": _chapter_records(agg, chapters),
+        "report_md_data": {
+            "metrics": summary_metrics,
+            "top_rules": top_rules[:10],
+            "continuity": continuity_summary,
+            "foreshadowing": foreshadow_summary,
+            "style_drift": style_summary,
+        },
+        # Unrounded totals so callers (e.g. the batch driver) can pool means exactly.
+        "totals": {
+            "overall_sum": sum(overall_scores),
+            "overall_n": len(overall_scores),
+            "overall_min": min(overall_scores) if overall_scores else None,
+            "overall_max": max(overall_scores) if overall_scores else None,
+            "dim_sums": dim_sums,
+            "dim_counts": dim_counts,
+            "stage_latency": stage_latency,
+        },
+    }
+
+
+# Per-chapter records of an archived run, one JSON object per line in ascending
+# chapter order (read as a stream by compare-regression-runs.sh --chapters).
+CHAPTERS_FILE = "chapters.jsonl"
+
+
+def _run_files(run: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(file name, content) of every artifact of *run*."""
+
+    def _json(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, sort_keys=True) + "\n"
+
+    return [
+        ("config.json", _json(run["config"])),
+        ("summary.json", _json(run["summary"])),
+        ("report.json", _json(run["report"])),
+        ("report.md", _format_md_report(run["report_md_data"])),
+        (_rule_index.INDEX_FILE, _json(run["rule_index"])),
+        (CHAPTERS_FILE, "".join(_json(record) for record in run["chapter_records"])),
+    ]
 
-    if not archive:
-        return
 
-    run_dir = os.path.join(os.path.abspath(runs_dir), run_id)
+def archive_run(runs_dir: str, run: Dict[str, Any]) -> str:
+    """Write *run* under runs_dir/<run_id>/ atomically (tmp dir + os.rename).  Returns the run dir."""
     parent_dir = os.path.abspath(runs_dir)
+    run_dir = os.path.join(parent_dir, run["run_id"])
     _mkdir(parent_dir)
     tmp_dir = tempfile.mkdtemp(dir=parent_dir)
 
     try:
-        with open(os.path.join(tmp_dir, "config.json"), "w", encoding="utf-8") as f:
-            f.write(json.dumps(config_snapshot, ensure_ascii=False, sort_keys=True) + "\n")
-        with open(os.path.join(tmp_dir, "summary.json"), "w", encoding="utf-8") as f:
-            f.write(json.dumps(summary_metrics, ensure_ascii=False, sort_keys=True) + "\n")
-        with open(os.path.join(tmp_dir, "report.json"), "w", encoding="utf-8") as f:
-            f.write(out_json)
-        with open(os.path.join(tmp_dir, "report.md"), "w", encoding="utf-8") as f:
-            report_data = {
-                "metrics": summary_metrics,
-                "top_rules": top_rules[:10],
-                "continuity": continuity_summary,
-                "foreshadowing": foreshadow_summary,
-                "style_drift": style_summary,
-            }
-            f.write(_format_md_report(report_data))
+        for name, text in _run_files(run):
+            with open(os.path.join(tmp_dir, name), "w", encoding="utf-8") as f:
+                f.write(text)
         os.rename(tmp_dir, run_dir)
     except Exception:
         shutil.rmtree(tmp_dir, ignore_errors=True)
         raise
+    return run_dir
+
+
+# ---------------------------------------------------------------------------
+# Watch mode
+# ---------------------------------------------------------------------------
+
+# Project files (besides evaluations/ and logs/) that feed a run.
+_WATCH_FILES = (
+    ".checkpoint.json",
+    "ai-blacklist.json",
+    "style-drift.json",
+    os.path.join("foreshadowing", "global.json"),
+    os.path.join("logs", "continuity", "latest.json"),
+)
+
+
+def watch_dir(runs_dir: str, project_dir_abs: str) -> str:
+    """Where watch mode keeps a project's live run files (<runs-dir>/watch/<project>-<hash>/)."""
+    digest = hashlib.sha256(project_dir_abs.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(os.path.abspath(runs_dir), "watch", f"{os.path.basename(project_dir_abs)}-{digest}")
+
+
+def _input_signature(project_dir_abs: str) -> List[Tuple[str, int, int]]:
+    """(path, mtime_ns, size) of every input file, sorted; changes whenever an input is added, modified or deleted."""
+    paths = [os.path.join(project_dir_abs, rel) for rel in _WATCH_FILES]
+    paths += glob.glob(os.path.join(project_dir_abs, "volumes", "vol-*", "foreshadowing.json"))
+    sig: List[Tuple[str, int, int]] = []
+    for rel in ("evaluations", "logs"):
+        try:
+            with os.scandir(os.path.join(project_dir_abs, rel)) as it:
+                for entry in it:
+                    if entry.name.startswith("chapter-") and entry.is_file():
+                        st = entry.stat()
+                        sig.append((entry.path, st.st_mtime_ns, st.st_size))
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        sig.append((path, st.st_mtime_ns, st.st_size))
+    sig.sort()
+    return sig
+
+
+_WATCH_TMP_PREFIX = ".tmp-"
+
+# Longest stretch watch() sleeps before rechecking its stop flag.
+_WATCH_STOP_POLL_S = 0.1
+
+
+def _write_text_atomic(path: str, text: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=_WATCH_TMP_PREFIX)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        # Only left behind when the write or rename failed.
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def watch(project_dir: str, labels_path: str, runs_dir: str, interval: float, **options: Any) -> None:
+    """Rebuild the project's run whenever an input changes, until SIGINT / SIGTERM.
+
+    Per-file contributions stay in an in-process contribution cache, so each
+    rebuild parses only the eval/log files added or modified since the last
+    one; deleted files simply drop out.  The aggregates are kept as per-block
+    partials (_fold_blocks()), so a rebuild re-folds only the blocks holding
+    changed files and merges the rest; aggregates are not un-merged (sets,
+    sketch min/max and float sums cannot be subtracted exactly).  Still
+    O(chapters) per rebuild: the input poll stats every file, and report.json
+    and chapters.jsonl list every chapter.  Each file of the run dir is
+    replaced atomically; one JSON line per rebuild goes to stdout.  The
+    contribution cache file is written once, on stop.
+
+    SIGINT / SIGTERM only set a stop flag that is checked between rebuilds, so
+    a signal never interrupts a rebuild or a file rewrite (forked --jobs
+    workers inherit the handler and finish their shard too).
+    """
+    project_dir_abs = os.path.abspath(project_dir)
+    out_dir = watch_dir(runs_dir, project_dir_abs)
+    os.makedirs(out_dir, exist_ok=True)
+    # Temp files of a previous watcher that was killed outright (SIGKILL).
+    for name in os.listdir(out_dir):
+        if name.startswith(_WATCH_TMP_PREFIX):
+            os.unlink(os.path.join(out_dir, name))
+    use_cache = options.pop("use_cache", True)
+    cache = _ContributionCache(_cache_path(runs_dir, project_dir_abs) if use_cache else "")
+    cache.blocks = {}
+
+    stop = {"requested": False}
+
+    def _stop(_signum: int, _frame: Any) -> None:
+        stop["requested"] = True
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    last_sig: Optional[List[Tuple[str, int, int]]] = None
+    while not stop["requested"]:
+        sig = _input_signature(project_dir_abs)
+        if sig != last_sig:
+            last_sig = sig
+            started = time.monotonic()
+            try:
+                run = build_run(project_dir_abs, labels_path, runs_dir, cache=cache, save_cache=False, **options)
+            except SystemExit as e:
+                # Validation failure (e.g. an eval file caught mid-write): keep the
+                # previous run files and retry on the next change.
+                cache.new = {"evals": dict(cache.old["evals"]), "logs": dict(cache.old["logs"])}
+                if e.code != 1:
+                    raise
+            else:
+                for name, text in _run_files(run):
+                    _write_text_atomic(os.path.join(out_dir, name), text)
+                summary = run["summary"]
+                update = {
+                    "type": "update",
+                    "run_id": run["run_id"],
+                    "generated_at": summary["generated_at"],
+                    "run_dir": out_dir,
+                    "chapters_total": summary["chapters_total"],
+                    "compliance": summary["compliance"],
+                    "violations_total": summary["violations_total"],
+                    "score_overall": summary["score_overall"],
+                    "elapsed_ms": round((time.monotonic() - started) * 1000.0, 1),
+                }
+                sys.stdout.write(json.dumps(update, ensure_ascii=False, sort_keys=True) + "\n")
+                sys.stdout.flush()
+            cache.roll()
+        deadline = time.monotonic() + interval
+        while not stop["requested"]:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, _WATCH_STOP_POLL_S))
+    # The last rebuild's entries (rolled into .old) seed the next run.
+    cache.new = cache.old
+    cache.save()
+
+
+def main() -> None:
+    project_dir = sys.argv[1]
+    labels_path = sys.argv[2].strip()
+    runs_dir = sys.argv[3]
+    archive = int(sys.argv[4]) == 1
+    include_continuity = int(sys.argv[5]) == 1
+    include_foreshadowing = int(sys.argv[6]) == 1
+    include_style = int(sys.argv[7]) == 1
+    use_cache = int(sys.argv[8]) == 1 if len(sys.argv) > 8 else True
+    jobs = int(sys.argv[9]) if len(sys.argv) > 9 else 1
+    use_eval_store = len(sys.argv) > 10 and sys.argv[10] == "1"
+    watch_interval = float(sys.argv[11]) if len(sys.argv) > 11 else 0.0
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    if watch_interval > 0:
+        watch(
+            project_dir,
+            labels_path,
+            runs_dir,
+            watch_interval,
+            include_continuity=include_continuity,
+            include_foreshadowing=include_foreshadowing,
+            include_style=include_style,
+            use_cache=use_cache,
+            jobs=jobs,
+            use_eval_store=use_eval_store,
+        )
+        return
+
+    run = build_run(
+        project_dir,
+        labels_path,
+        runs_dir,
+        include_continuity=include_continuity,
+        include_foreshadowing=include_foreshadowing,
+        include_style=include_style,
+        use_cache=use_cache,
+        save_cache=archive,
+        jobs=jobs,
+        use_eval_store=use_eval_store,
+    )
+
+    sys.stdout.write(json.dumps(run["report"], ensure_ascii=False, sort_keys=True) + "\n")
+
+    if archive:
+        archive_run(runs_dir, run)
 
 
 if __name__ == "__main__":
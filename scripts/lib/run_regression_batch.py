@@ -0,0 +1,312 @@
+"""Batch regression runner over many novel projects (M3).
+
+Runs run_regression.build_run() for each project on one bounded process pool,
+archives every project's run through run_regression.archive_run(), and emits a
+fleet-level rollup (compliance, score means, top rules, stage latency
+percentiles pooled by merging each project's sketches, per-project wall time).
+"""
+
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import _common
+import run_regression
+
+
+def _die(msg: str, exit_code: int = 1) -> None:
+    _common.die(f"run-regression-batch.sh: {msg}", exit_code)
+
+
+def _expand_projects(patterns: List[str]) -> List[str]:
+    """Expand globs (when quoted past the shell) and dedupe by absolute path, preserving order.
+
+    Non-directory glob matches are skipped quietly.  An explicit path that does
+    not exist is a validation failure (a mistyped project must not silently drop
+    out of the rollup); an explicit non-directory, e.g. a file from a glob the
+    shell expanded, is skipped with a warning.
+    """
+    out: List[str] = []
+    seen = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            candidates = sorted(glob.glob(pattern))
+        else:
+            if not os.path.exists(pattern):
+                _die(f"project dir not found: {pattern}", 1)
+            if not os.path.isdir(pattern):
+                sys.stderr.write(f"run-regression-batch.sh: warning: not a directory, skipped: {pattern}\n")
+            candidates = [pattern]
+        for path in candidates:
+            if not os.path.isdir(path):
+                continue
+            abs_path = os.path.abspath(path)
+            if abs_path in seen:
+                continue
+            seen.add(abs_path)
+            out.append(abs_path)
+    return out
+
+
+def _project_runs_dir(runs_dir: str, project_dir_abs: str) -> str:
+    # Basename for readability + path hash so same-named projects never share a dir.
+    digest = hashlib.sha256(project_dir_abs.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(os.path.abspath(runs_dir), f"{os.path.basename(project_dir_abs)}-{digest}")
+
+
+def _run_project(project_dir_abs: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Pool worker: build (and optionally archive) one project's run.  Never raises."""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"project_path": project_dir_abs}
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            run = run_regression.build_run(
+                project_dir_abs,
+                options["labels_path"],
+                options["runs_dir"],
+                include_continuity=options["include_continuity"],
+                include_foreshadowing=options["include_foreshadowing"],
+                include_style=options["include_style"],
+                use_cache=options["use_cache"],
+                save_cache=options["archive"],
+            )
+            run_dir = None
+            if options["archive"]:
+                run_dir = run_regression.archive_run(_project_runs_dir(options["runs_dir"], project_dir_abs), run)
+    except SystemExit:
+        result["status"] = "error"
+        result["error"] = stderr.getvalue().strip() or "run-regression.sh: failed"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"run-regression.sh: unexpected error: {e}"
+    else:
+        result["status"] = "ok"
+        result["run_id"] = run["run_id"]
+        result["run_dir"] = run_dir
+        result["summary"] = run["summary"]
+        result["totals"] = run["totals"]
+        result["by_rule"] = run["report"]["spec_ls"]["violations_by_layer_rule_confidence"]
+    result["wall_time_ms"] = int(round((time.perf_counter() - started) * 1000))
+    return result
+
+
+def _merge_counts(dst: Dict[str, int], src: Dict[str, int]) -> None:
+    for k, v in src.items():
+        dst[k] = dst.get(k, 0) + v
+
+
+def _rate(ok: int, total: int) -> float:
+    if total <= 0:
+        return 0.0
+    return ok / total
+
+
+def _rollup(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [r for r in results if r["status"] == "ok"]
+
+    chapters_total = 0
+    chapters_any = 0
+    chapters_high = 0
+    violations_total = 0
+    violations_by_conf: Dict[str, int] = {}
+    violations_by_layer: Dict[str, int] = {}
+    rule_counts: Dict[Tuple[str, str], int] = {}
+    rule_projects: Dict[Tuple[str, str], int] = {}
+    overall_sum = 0.0
+    overall_n = 0
+    overall_min: Optional[float] = None
+    overall_max: Optional[float] = None
+    dim_sums: Dict[str, float] = {}
+    dim_counts: Dict[str, int] = {}
+    stage_latency = run_regression.new_stage_latency()
+
+    for r in ok:
+        summary = r["summary"]
+        comp = summary["compliance"]
+        chapters_total += comp["chapters_total"]
+        chapters_any += comp["chapters_with_any_violation"]
+        chapters_high += comp["chapters_with_high_confidence_violation"]
+        violations_total += summary["violations_total"]
+        _merge_counts(violations_by_conf, summary["violations_by_confidence"])
+        _merge_counts(violations_by_layer, summary["violations_by_layer"])
+
+        for layer, rules in r["by_rule"].items():
+            for rule_id, conf_map in rules.items():
+                key = (layer, rule_id)
+                rule_counts[key] = rule_counts.get(key, 0) + sum(conf_map.values())
+                rule_projects[key] = rule_projects.get(key, 0) + 1
+
+        totals = r["totals"]
+        overall_sum += totals["overall_sum"]
+        overall_n += totals["overall_n"]
+        if totals["overall_min"] is not None:
+            overall_min = totals["overall_min"] if overall_min is None else min(overall_min, totals["overall_min"])
+            overall_max = totals["overall_max"] if overall_max is None else max(overall_max, totals["overall_max"])
+        for k, v in totals["dim_sums"].items():
+            dim_sums[k] = dim_sums.get(k, 0.0) + v
+            dim_counts[k] = dim_counts.get(k, 0) + totals["dim_counts"][k]
+        run_regression.merge_stage_latency(stage_latency, totals["stage_latency"])
+
+    top_rules = [
+        {"layer": layer, "rule_id": rule_id, "count": count, "projects": rule_projects[(layer, rule_id)]}
+        for (layer, rule_id), count in rule_counts.items()
+    ]
+    top_rules.sort(key=lambda x: (-int(x["count"]), str(x["layer"]), str(x["rule_id"])))
+
+    score_summary = None
+    if overall_n > 0:
+        score_summary = {
+            "n": overall_n,
+            "mean": round(overall_sum / overall_n, 4),
+            "min": round(overall_min, 4) if overall_min is not None else None,
+            "max": round(overall_max, 4) if overall_max is not None else None,
+        }
+
+    project_rates = [r["summary"]["compliance"]["compliance_rate_high_confidence"] for r in ok]
+
+    projects: List[Dict[str, Any]] = []
+    for r in results:
+        row: Dict[str, Any] = {
+            "project_path": r["project_path"],
+            "status": r["status"],
+            "wall_time_ms": r["wall_time_ms"],
+        }
+        if r["status"] == "ok":
+            summary = r["summary"]
+            score = summary.get("score_overall")
+            row.update(
+                {
+                    "run_id": r["run_id"],
+                    "run_dir": r["run_dir"],
+                    "chapters_total": summary["chapters_total"],
+                    "compliance_rate_any_violation": summary["compliance"]["compliance_rate_any_violation"],
+                    "compliance_rate_high_confidence": summary["compliance"]["compliance_rate_high_confidence"],
+                    "violations_total": summary["violations_total"],
+                    "score_overall_mean": score.get("mean") if isinstance(score, dict) else None,
+                }
+            )
+        else:
+            row["error"] = r["error"]
+        projects.append(row)
+
+    return {
+        "projects_total": len(results),
+        "projects_ok": len(ok),
+        "projects_failed": len(results) - len(ok),
+        "compliance": {
+            "chapters_total": chapters_total,
+            "chapters_with_any_violation": chapters_any,
+            "chapters_with_high_confidence_violation": chapters_high,
+            "compliance_rate_any_violation": round(_rate(chapters_total - chapters_any, chapters_total), 6),
+            "compliance_rate_high_confidence": round(_rate(chapters_total - chapters_high, chapters_total), 6),
+            "project_mean_compliance_rate_high_confidence": (
+                round(sum(project_rates) / len(project_rates), 6) if project_rates else None
+            ),
+        },
+        "violations_total": violations_total,
+        "violations_by_confidence": dict(sorted(violations_by_conf.items())),
+        "violations_by_layer": dict(sorted(violations_by_layer.items())),
+        "score_overall": score_summary,
+        "score_dimensions": {
+            k: {"n": dim_counts[k], "mean": round(dim_sums[k] / dim_counts[k], 4)}
+            for k in sorted(dim_sums.keys())
+            if dim_counts[k] > 0
+        },
+        "stage_latency": run_regression.stage_latency_report(stage_latency),
+        "top_rules": top_rules[:50],
+        "projects": projects,
+    }
+
+
+def _archive_fleet(runs_dir: str, run_id: str, fleet_json: str) -> None:
+    parent_dir = os.path.join(os.path.abspath(runs_dir), "fleet")
+    os.makedirs(parent_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent_dir)
+    try:
+        with open(os.path.join(tmp_dir, "fleet.json"), "w", encoding="utf-8") as f:
+            f.write(fleet_json)
+        os.rename(tmp_dir, os.path.join(parent_dir, run_id))
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def main() -> None:
+    labels_path = sys.argv[1].strip()
+    runs_dir = sys.argv[2]
+    archive = int(sys.argv[3]) == 1
+    include_continuity = int(sys.argv[4]) == 1
+    include_foreshadowing = int(sys.argv[5]) == 1
+    include_style = int(sys.argv[6]) == 1
+    use_cache = int(sys.argv[7]) == 1
+    jobs = int(sys.argv[8])
+    patterns = sys.argv[9:]
+
+    projects = _expand_projects(patterns)
+    if not projects:
+        _die("no project directories matched", 1)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(projects))
+
+    options = {
+        "labels_path": labels_path,
+        "runs_dir": runs_dir,
+        "archive": archive,
+        "include_continuity": include_continuity,
+        "include_foreshadowing": include_foreshadowing,
+        "include_style": include_style,
+        "use_cache": use_cache,
+    }
+
+    started = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_run_project, projects, [options] * len(projects)))
+    else:
+        results = [_run_project(p, options) for p in projects]
+    wall_time_ms = int(round((time.perf_counter() - started) * 1000))
+
+    for r in results:
+        if r["status"] != "ok":
+            sys.stderr.write(f"run-regression-batch.sh: {r['project_path']}: {r['error']}\n")
+
+    run_id = _common.timestamp_id()
+    fleet = {
+        "schema_version": 1,
+        "run_id": run_id,
+        "generated_at": _common.iso_utc_now(),
+        "runs_dir": os.path.abspath(runs_dir) if archive else None,
+        "jobs": jobs,
+        "wall_time_ms": wall_time_ms,
+        **_rollup(results),
+    }
+
+    fleet_json = json.dumps(fleet, ensure_ascii=False, sort_keys=True) + "\n"
+    sys.stdout.write(fleet_json)
+
+    if archive:
+        _archive_fleet(runs_dir, run_id, fleet_json)
+
+    if fleet["projects_failed"] > 0:
+        raise SystemExit(3)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SystemExit:
+        raise
+    except Exception as e:
+        sys.stderr.write(f"run-regression-batch.sh: unexpected error: {e}\n")
+        raise SystemExit(2)
@@ -3,10 +3,13 @@
 # Deterministic AI-blacklist linter (M3+ extension point).
 #
 # Usage:
-#   lint-blacklist.sh <chapter.md> <ai-blacklist.json>
+#   lint-blacklist.sh [--incremental <state.json>] <chapter.md> <ai-blacklist.json>
+#   lint-blacklist.sh --batch [--jobs <n>] <ai-blacklist.json> <chapter.md|chapters_dir>...
 #
 # Output:
 #   stdout JSON (exit 0 on success)
+#   --batch: stdout JSONL, one per-chapter report per line (chapter order), then a final
+#            {"type": "volume_aggregate", ...} line with volume-level totals and top hits.
 #
 # Exit codes:
 #   0 = success (valid JSON emitted to stdout)
@@ -20,11 +23,61 @@
 #     - ai-blacklist.json.exemptions.words (list[str])
 #
 # - Hit rate is computed as "hits per 1000 non-whitespace characters" (次/千字).
+# - Implementation: lib/lint_blacklist.py (hit counting via the shared lib/_phrase_matcher.py automaton).
+# - The compiled config is cached by content hash (lib/_compiled_config.py) under
+#   $NOVEL_LINT_CACHE_DIR or ${XDG_CACHE_HOME:-~/.cache}/novel/lint; NOVEL_LINT_CACHE_DIR="" disables it.
+# - --batch loads ai-blacklist.json once for all chapters; a chapters_dir contributes its chapter-NNN.md files.
+#   --jobs fans chapters out across worker processes (0 = CPU count; default: 1).
+# - --incremental keeps per-paragraph partial results in <state.json> (created/updated atomically)
+#   and re-lints only paragraphs that changed since the last run; output equals a full lint.
 
 set -euo pipefail
 
+if [ "${1:-}" = "--batch" ]; then
+  shift 1
+  jobs=1
+  if [ "${1:-}" = "--jobs" ]; then
+    [ "$#" -ge 2 ] || { echo "lint-blacklist.sh: error: --jobs requires a value" >&2; exit 1; }
+    jobs="$2"
+    shift 2
+  fi
+  if [ "$#" -lt 2 ]; then
+    echo "Usage: lint-blacklist.sh --batch [--jobs <n>] <ai-blacklist.json> <chapter.md|chapters_dir>..." >&2
+    exit 1
+  fi
+  if ! [[ "$jobs" =~ ^[0-9]+$ ]]; then
+    echo "lint-blacklist.sh: --jobs must be an int >= 0 (got: $jobs)" >&2
+    exit 1
+  fi
+  blacklist_path="$1"
+  shift 1
+  if [ ! -f "$blacklist_path" ]; then
+    echo "lint-blacklist.sh: blacklist file not found: $blacklist_path" >&2
+    exit 1
+  fi
+  for chapter_arg in "$@"; do
+    if [ ! -e "$chapter_arg" ]; then
+      echo "lint-blacklist.sh: chapter file or dir not found: $chapter_arg" >&2
+      exit 1
+    fi
+  done
+  if ! command -v python3 >/dev/null 2>&1; then
+    echo "lint-blacklist.sh: python3 is required but not found" >&2
+    exit 2
+  fi
+  SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+  exec python3 "$SCRIPT_DIR/lib/lint_blacklist.py" --batch "$jobs" "$blacklist_path" "$@"
+fi
+
+state_path=""
+if [ "${1:-}" = "--incremental" ]; then
+  [ "$#" -ge 2 ] || { echo "lint-blacklist.sh: error: --incremental requires a value" >&2; exit 1; }
+  state_path="$2"
+  shift 2
+fi
+
 if [ "$#" -ne 2 ]; then
-  echo "Usage: lint-blacklist.sh <chapter.md> <ai-blacklist.json>" >&2
+  echo "Usage: lint-blacklist.sh [--incremental <state.json>] <chapter.md> <ai-blacklist.json>" >&2
   exit 1
 fi
 
@@ -46,156 +99,5 @@ if ! command -v python3 >/dev/null 2>&1; then
   exit 2
 fi
 
-python3 - "$chapter_path" "$blacklist_path" <<'PY'
-import json
-import re
-import sys
-from typing import Any, Dict, List, Set
-
-
-def _die(msg: str, exit_code: int = 1) -> None:
-    sys.stderr.write(msg.rstrip() + "\n")
-    raise SystemExit(exit_code)
-
-
-def _load_json(path: str) -> Any:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        _die(f"lint-blacklist.sh: invalid JSON at {path}: {e}", 1)
-
-
-def _as_str_list(value: Any) -> List[str]:
-    if value is None:
-        return []
-    if not isinstance(value, list):
-        return []
-    out: List[str] = []
-    for item in value:
-        if isinstance(item, str) and item.strip():
-            out.append(item.strip())
-    return out
-
-
-def _get_whitelist_words(blacklist: Dict[str, Any]) -> Set[str]:
-    words: List[str] = []
-
-    whitelist = blacklist.get("whitelist")
-    if isinstance(whitelist, list):
-        words.extend(_as_str_list(whitelist))
-    elif isinstance(whitelist, dict):
-        words.extend(_as_str_list(whitelist.get("words")))
-
-    exemptions = blacklist.get("exemptions")
-    if isinstance(exemptions, dict):
-        words.extend(_as_str_list(exemptions.get("words")))
-
-    return set(words)
-
-
-def _unique_preserve_order(items: List[str]) -> List[str]:
-    seen: Set[str] = set()
-    out: List[str] = []
-    for item in items:
-        if item in seen:
-            continue
-        seen.add(item)
-        out.append(item)
-    return out
-
-
-def main() -> None:
-    chapter_path = sys.argv[1]
-    blacklist_path = sys.argv[2]
-
-    blacklist = _load_json(blacklist_path)
-    if not isinstance(blacklist, dict):
-        _die("lint-blacklist.sh: ai-blacklist.json must be a JSON object", 1)
-
-    words = blacklist.get("words")
-    if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
-        _die("lint-blacklist.sh: ai-blacklist.json.words must be a list of strings", 1)
-
-    whitelist = _get_whitelist_words(blacklist)
-
-    effective_words = [w.strip() for w in words if isinstance(w, str) and w.strip() and w.strip() not in whitelist]
-    effective_words = list(dict.fromkeys(effective_words))  # dedup preserving order
-
-    # Sort by length descending to match longest phrases first
-    effective_words.sort(key=lambda w: -len(w))
-
-    try:
-        with open(chapter_path, "r", encoding="utf-8") as f:
-            text = f.read()
-    except Exception as e:
-        _die(f"lint-blacklist.sh: failed to read chapter: {e}", 1)
-
-    lines = text.splitlines()
-    non_ws_chars = len(re.sub(r"\s+", "", text))
-
-    # Use a working copy for masking matched phrases
-    masked_text = text
-
-    hits: List[Dict[str, Any]] = []
-    total_hits = 0
-
-    for word in effective_words:
-        count = masked_text.count(word)
-        if count <= 0:
-            continue
-        total_hits += count
-
-        # Collect line numbers and snippets from ORIGINAL text
-        line_numbers: List[int] = []
-        snippets: List[str] = []
-        for idx, line in enumerate(lines, start=1):
-            if word in line:
-                line_numbers.append(idx)
-                if len(snippets) < 5:
-                    snippet = line.strip()
-                    if len(snippet) > 160:
-                        snippet = snippet[:160] + "…"
-                    snippets.append(snippet)
-
-        hits.append(
-            {
-                "word": word,
-                "count": count,
-                "lines": line_numbers[:20],
-                "snippets": snippets,
-            }
-        )
-
-        # Mask matched word in working copy to prevent substring double-counting
-        masked_text = masked_text.replace(word, "\x00" * len(word))
-
-    hits.sort(key=lambda x: (-int(x["count"]), str(x["word"])))
-
-    hits_per_kchars = 0.0
-    if non_ws_chars > 0:
-        hits_per_kchars = total_hits / (non_ws_chars / 1000.0)
-
-    out: Dict[str, Any] = {
-        "chapter_path": chapter_path,
-        "blacklist_path": blacklist_path,
-        "chars": non_ws_chars,
-        "blacklist_words_count": len(words),
-        "whitelist_words_count": len(whitelist),
-        "effective_words_count": len(effective_words),
-        "total_hits": total_hits,
-        "hits_per_kchars": round(hits_per_kchars, 3),
-        "hits": hits,
-    }
-
-    sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
-
-
-try:
-    main()
-except SystemExit:
-    raise
-except Exception as e:
-    sys.stderr.write(f"lint-blacklist.sh: unexpected error: {e}\n")
-    raise SystemExit(2)
-PY
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+python3 "$SCRIPT_DIR/lib/lint_blacklist.py" ${state_path:+--incremental "$state_path"} "$chapter_path" "$blacklist_path"
@@ -0,0 +1,83 @@
+#!/usr/bin/env bash
+#
+# Persistent lint server for the deterministic linters (keeps compiled configs warm).
+#
+# Usage:
+#   lint-server.sh [--socket <path>] [--workers <n>]
+#
+# Protocol:
+#   Line-delimited JSON-RPC 2.0 on stdin/stdout (default) or on a Unix socket (--socket).
+#   Methods (results are exactly the JSON the matching script prints):
+#     lint_blacklist    {"chapter_path", "blacklist_path", "text"?}           -> lint-blacklist.sh
+#     lint_cliche       {"chapter_path", "config_path", "text"?}              -> lint-cliche.sh
+#     lint_readability  {"chapter_path", "profile_path", "chapter_no", "text"?} -> lint-readability.sh
+#     run_ner           {"chapter_path", "text"?}                             -> run-ner.sh
+#     ping, shutdown
+#
+# Exit codes:
+#   0 = clean shutdown (stdin EOF, "shutdown" request, or SIGTERM/SIGINT on a socket server)
+#   1 = validation failure (bad args, socket path in use)
+#   2 = script exception (unexpected runtime error)
+#
+# Notes:
+# - "text" lints an in-memory draft; chapter_path is then only echoed in the report.
+# - Configs are reloaded when their mtime/size changes; no restart needed after edits.
+# - Script validation failures are returned as JSON-RPC errors (code -32001 = script exit 1,
+#   -32002 = script exit 2) carrying the script's stderr message.
+# - --workers bounds concurrent requests on stdin/stdout (0 = CPU count; default: 4); a socket
+#   server handles each connection on its own thread.
+# - Implementation: lib/lint_server.py.
+
+set -euo pipefail
+
+usage() {
+  cat >&2 <<'USAGE'
+Usage:
+  lint-server.sh [--socket <path>] [--workers <n>]
+
+Options:
+  --socket <path>   Listen on a Unix socket instead of stdin/stdout
+  --workers <n>     Max concurrent requests on stdin/stdout (0 = CPU count; default: 4)
+  -h, --help        Show help
+USAGE
+}
+
+socket_path=""
+workers=4
+
+while [ "$#" -gt 0 ]; do
+  case "$1" in
+    --socket)
+      [ "$#" -ge 2 ] || { echo "lint-server.sh: error: --socket requires a value" >&2; exit 1; }
+      socket_path="$2"
+      shift 2
+      ;;
+    --workers)
+      [ "$#" -ge 2 ] || { echo "lint-server.sh: error: --workers requires a value" >&2; exit 1; }
+      workers="$2"
+      shift 2
+      ;;
+    -h|--help)
+      usage
+      exit 0
+      ;;
+    *)
+      echo "lint-server.sh: unknown arg: $1" >&2
+      usage
+      exit 1
+      ;;
+  esac
+done
+
+if ! [[ "$workers" =~ ^[0-9]+$ ]]; then
+  echo "lint-server.sh: --workers must be an int >= 0 (got: $workers)" >&2
+  exit 1
+fi
+
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "lint-server.sh: python3 is required but not found" >&2
+  exit 2
+fi
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+exec python3 "$SCRIPT_DIR/lib/lint_server.py" "$socket_path" "$workers"
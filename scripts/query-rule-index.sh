@@ -0,0 +1,90 @@
+#!/usr/bin/env bash
+#
+# Rule -> chapter drill-down over an archived regression run (M3).
+#
+# Usage:
+#   query-rule-index.sh <run_dir> [--layer <L1,...>] [--rule <id|glob,...>] [--confidence <high,...>]
+#
+# Output:
+#   stdout JSON (exit 0 on success): one match per (layer, rule_id, confidence) with its sorted
+#   chapter list and count, plus the union of matched chapters.
+#
+# Exit codes:
+#   0 = success (valid JSON emitted to stdout)
+#   1 = validation failure (bad args, missing/invalid rule-index.json)
+#   2 = script exception (unexpected runtime error)
+#
+# Notes:
+# - Reads <run_dir>/rule-index.json, written next to report.json by run-regression.sh and
+#   run-regression-batch.sh: layer -> rule_id -> confidence -> chapters with at least one such
+#   violation (status violation / violation_suspected), delta-encoded. No eval file is read.
+# - Every filter is optional; omitted filters match everything.
+# - Runs archived before the index existed have no rule-index.json; re-run to get one.
+# - Implementation: lib/query_rule_index.py.
+
+set -euo pipefail
+
+usage() {
+  cat >&2 <<'USAGE'
+Usage:
+  query-rule-index.sh <run_dir> [--layer <L1,...>] [--rule <id|glob,...>] [--confidence <high,...>]
+
+Options:
+  --layer <L1,...>         Layers to include (L1, L2, L3, LS, unknown)
+  --rule <id|glob,...>     Rule ids or globs (e.g. C-017, 'C-0*')
+  --confidence <c,...>     Confidences to include (high, medium, low, unknown)
+USAGE
+}
+
+if [ "$#" -lt 1 ]; then
+  usage
+  exit 1
+fi
+case "$1" in
+  -h|--help)
+    usage
+    exit 0
+    ;;
+esac
+
+run_dir="$1"
+shift 1
+layers=""
+rules=""
+confidences=""
+
+while [ "$#" -gt 0 ]; do
+  case "$1" in
+    --layer|--rule|--confidence)
+      [ "$#" -ge 2 ] || { echo "query-rule-index.sh: error: $1 requires a value" >&2; exit 1; }
+      case "$1" in
+        --layer) layers="$2" ;;
+        --rule) rules="$2" ;;
+        --confidence) confidences="$2" ;;
+      esac
+      shift 2
+      ;;
+    -h|--help)
+      usage
+      exit 0
+      ;;
+    *)
+      echo "query-rule-index.sh: unknown arg: $1" >&2
+      usage
+      exit 1
+      ;;
+  esac
+done
+
+if [ ! -d "$run_dir" ]; then
+  echo "query-rule-index.sh: run dir not found: $run_dir" >&2
+  exit 1
+fi
+
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "query-rule-index.sh: python3 is required but not found" >&2
+  exit 1
+fi
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+python3 "$SCRIPT_DIR/lib/query_rule_index.py" "$run_dir" "$layers" "$rules" "$confidences"
@@ -0,0 +1,145 @@
+#!/usr/bin/env bash
+#
+# Time-series history over archived regression runs (M3).
+#
+# Usage:
+#   regression-history.sh ingest [--runs-dir <dir>] [--db <file>]
+#   regression-history.sh trend [--runs-dir <dir>] [--db <file>] [--project <dir>] [--last <n>] [--metric <name,...>]
+#   regression-history.sh changepoints [--runs-dir <dir>] [--db <file>] [--project <dir>] [--last <n>]
+#                                      [--metric <name,...>] [--penalty <x>] [--min-shift <x>]
+#
+# Output:
+#   stdout JSON (exit 0 on success)
+#   ingest:       how many run dirs were found / newly ingested.
+#   trend:        per project, the last --last runs (oldest first) and one value list per metric,
+#                 aligned with the runs (null where a run lacks the metric).
+#   changepoints: per project, mean shifts per metric with the first run after the shift and the
+#                 mean before/after.
+#
+# Exit codes:
+#   0 = success (valid JSON emitted to stdout)
+#   1 = validation failure (bad args, invalid JSON in a run dir, incompatible store)
+#   2 = script exception (unexpected runtime error)
+#
+# Notes:
+# - The store is SQLite at <runs-dir>/history.sqlite by default (derived data; delete it to rebuild).
+# - Every command first ingests run dirs it has not seen (run-regression.sh and
+#   run-regression-batch.sh layouts); each run's summary.json/report.json is read once. Run
+#   `ingest` once to backfill existing archives.
+# - --metric takes exact names or globs (e.g. 'score_dimensions.*', 'rule.L1.*'); default:
+#   compliance rates, violations_total, score_overall_mean, score_dimensions.*, violations_by_layer.*.
+#   Metric names are listed in lib/regression_history.py.
+# - Implementation: lib/regression_history.py.
+
+set -euo pipefail
+
+usage() {
+  cat >&2 <<'USAGE'
+Usage:
+  regression-history.sh ingest [--runs-dir <dir>] [--db <file>]
+  regression-history.sh trend [--runs-dir <dir>] [--db <file>] [--project <dir>] [--last <n>] [--metric <name,...>]
+  regression-history.sh changepoints [--runs-dir <dir>] [--db <file>] [--project <dir>] [--last <n>]
+                                     [--metric <name,...>] [--penalty <x>] [--min-shift <x>]
+
+Options:
+  --runs-dir <dir>     Archived runs base dir (default: eval/runs)
+  --db <file>          History store (default: <runs-dir>/history.sqlite)
+  --project <dir>      Only runs of this project (default: every project, reported separately)
+  --last <n>           Most recent runs per project (0 = all; default: 50)
+  --metric <name,...>  Metric names or globs (default: headline compliance/score/layer metrics)
+  --penalty <x>        Changepoint penalty, in units of noise variance * ln(runs) (default: 3)
+  --min-shift <x>      Ignore mean shifts smaller than this (default: 0)
+USAGE
+}
+
+if [ "$#" -lt 1 ]; then
+  usage
+  exit 1
+fi
+
+command="$1"
+shift 1
+case "$command" in
+  ingest|trend|changepoints) ;;
+  -h|--help)
+    usage
+    exit 0
+    ;;
+  *)
+    echo "regression-history.sh: unknown command: $command" >&2
+    usage
+    exit 1
+    ;;
+esac
+
+runs_dir="eval/runs"
+db_path=""
+project_dir=""
+last=50
+metrics=""
+penalty=3
+min_shift=0
+
+while [ "$#" -gt 0 ]; do
+  case "$1" in
+    --runs-dir|--db|--project|--last|--metric|--penalty|--min-shift)
+      [ "$#" -ge 2 ] || { echo "regression-history.sh: error: $1 requires a value" >&2; exit 1; }
+      case "$1" in
+        --runs-dir) runs_dir="$2" ;;
+        --db) db_path="$2" ;;
+        --project) project_dir="$2" ;;
+        --last) last="$2" ;;
+        --metric) metrics="$2" ;;
+        --penalty) penalty="$2" ;;
+        --min-shift) min_shift="$2" ;;
+      esac
+      shift 2
+      ;;
+    -h|--help)
+      usage
+      exit 0
+      ;;
+    *)
+      echo "regression-history.sh: unknown arg: $1" >&2
+      usage
+      exit 1
+      ;;
+  esac
+done
+
+if [ ! -d "$runs_dir" ]; then
+  echo "regression-history.sh: runs dir not found: $runs_dir" >&2
+  exit 1
+fi
+if [ -n "$project_dir" ] && [ ! -d "$project_dir" ]; then
+  echo "regression-history.sh: project dir not found: $project_dir" >&2
+  exit 1
+fi
+if ! [[ "$last" =~ ^[0-9]+$ ]]; then
+  echo "regression-history.sh: --last must be an int >= 0 (got: $last)" >&2
+  exit 1
+fi
+if ! [[ "$penalty" =~ ^[0-9]+([.][0-9]+)?$ ]]; then
+  echo "regression-history.sh: --penalty must be a number >= 0 (got: $penalty)" >&2
+  exit 1
+fi
+if ! [[ "$min_shift" =~ ^[0-9]+([.][0-9]+)?$ ]]; then
+  echo "regression-history.sh: --min-shift must be a number >= 0 (got: $min_shift)" >&2
+  exit 1
+fi
+
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "regression-history.sh: python3 is required but not found" >&2
+  exit 1
+fi
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+python3 "$SCRIPT_DIR/lib/regression_history.py" \
+  "$command" \
+  "$runs_dir" \
+  "$db_path" \
+  "$project_dir" \
+  "$last" \
+  "$metrics" \
+  "$penalty" \
+  "$min_shift"
@@ -0,0 +1,140 @@
+#!/usr/bin/env bash
+#
+# Batch regression runner over many novel projects (M3).
+#
+# Usage:
+#   run-regression-batch.sh [options] <project_dir|glob>...
+#
+# Output:
+#   stdout JSON fleet rollup (exit 0 on success, exit 3 when some projects failed)
+#
+# Exit codes:
+#   0 = success (valid JSON emitted to stdout)
+#   1 = validation failure (bad args, no matching projects, explicit project path not found)
+#   2 = script exception (unexpected runtime error)
+#   3 = some projects failed (the rollup is still emitted and archived; failures are listed in it
+#       and on stderr)
+#
+# Notes:
+# - Runs every project in one python3 process tree on a bounded worker pool (--jobs).
+# - Each project's run is archived atomically under <runs-dir>/<project>-<hash>/<timestamp>/
+#   (same files as run-regression.sh); the rollup goes to <runs-dir>/fleet/<timestamp>/fleet.json.
+# - Quote globs (e.g. 'novels/*') to let the script expand them; unquoted globs work too.
+#   Glob matches that are not directories are skipped; an explicit path that does not exist is
+#   rejected, and one that is not a directory is skipped with a warning on stderr.
+
+set -euo pipefail
+
+usage() {
+  cat >&2 <<'USAGE'
+Usage:
+  run-regression-batch.sh [options] <project_dir|glob>...
+
+Options:
+  --labels <file>     Optional: labeled dataset JSONL (recorded in each run's config)
+  --runs-dir <dir>    Output base dir for archived runs (default: eval/runs)
+  --jobs <n>          Max projects processed concurrently (0 = CPU count; default: 0)
+  --no-archive        Do not write anything under <runs-dir> (run artifacts or cache updates); only print the rollup JSON to stdout
+  --no-cache          Re-parse every eval/log file (skip <runs-dir>/.cache/)
+  --no-continuity     Skip reading logs/continuity/latest.json even if present
+  --no-foreshadowing  Skip reading foreshadowing/global.json even if present
+  --no-style          Skip reading style-drift.json even if present
+  -h, --help          Show help
+USAGE
+}
+
+labels_path=""
+runs_dir="eval/runs"
+jobs=0
+archive=1
+use_cache=1
+include_continuity=1
+include_foreshadowing=1
+include_style=1
+projects=()
+
+while [ "$#" -gt 0 ]; do
+  case "$1" in
+    --labels)
+      [ "$#" -ge 2 ] || { echo "run-regression-batch.sh: error: --labels requires a value" >&2; exit 1; }
+      labels_path="$2"
+      shift 2
+      ;;
+    --runs-dir)
+      [ "$#" -ge 2 ] || { echo "run-regression-batch.sh: error: --runs-dir requires a value" >&2; exit 1; }
+      runs_dir="$2"
+      shift 2
+      ;;
+    --jobs)
+      [ "$#" -ge 2 ] || { echo "run-regression-batch.sh: error: --jobs requires a value" >&2; exit 1; }
+      jobs="$2"
+      shift 2
+      ;;
+    --no-archive)
+      archive=0
+      shift 1
+      ;;
+    --no-cache)
+      use_cache=0
+      shift 1
+      ;;
+    --no-continuity)
+      include_continuity=0
+      shift 1
+      ;;
+    --no-foreshadowing)
+      include_foreshadowing=0
+      shift 1
+      ;;
+    --no-style)
+      include_style=0
+      shift 1
+      ;;
+    -h|--help)
+      usage
+      exit 0
+      ;;
+    -*)
+      echo "run-regression-batch.sh: unknown arg: $1" >&2
+      usage
+      exit 1
+      ;;
+    *)
+      projects+=("$1")
+      shift 1
+      ;;
+  esac
+done
+
+if [ "${#projects[@]}" -eq 0 ]; then
+  echo "run-regression-batch.sh: at least one project dir (or glob) is required" >&2
+  usage
+  exit 1
+fi
+
+if ! [[ "$jobs" =~ ^[0-9]+$ ]]; then
+  echo "run-regression-batch.sh: --jobs must be an int >= 0 (got: $jobs)" >&2
+  exit 1
+fi
+
+if [ -n "$labels_path" ] && [ ! -f "$labels_path" ]; then
+  echo "run-regression-batch.sh: labels file not found: $labels_path" >&2
+  exit 1
+fi
+
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "run-regression-batch.sh: python3 is required but not found" >&2
+  exit 1
+fi
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+python3 "$SCRIPT_DIR/lib/run_regression_batch.py" \
+  "$labels_path" \
+  "$runs_dir" \
+  "$archive" \
+  "$include_continuity" \
+  "$include_foreshadowing" \
+  "$include_style" \
+  "$use_cache" \
+  "$jobs" \
+  "${projects[@]}"
@@ -3,10 +3,13 @@
 # Regression runner for M2 outputs (M3).
 #
 # Usage:
-#   run-regression.sh --project <novel_project_dir> [--labels <labels.jsonl>] [--runs-dir <dir>] [--no-archive]
+#   run-regression.sh --project <novel_project_dir> [--labels <labels.jsonl>] [--runs-dir <dir>] [--no-archive] [--no-cache] [--jobs <n>] [--eval-store]
+#   run-regression.sh --project <novel_project_dir> --watch [--interval <sec>] [options]
 #
 # Output:
 #   stdout JSON (exit 0 on success)
+#   --watch: stdout JSONL, one {"type": "update", ...} line (compliance, violations_total,
+#   score_overall, elapsed_ms) per rebuild; runs until SIGINT / SIGTERM (exit 0).
 #
 # Exit codes:
 #   0 = success (valid JSON emitted to stdout)
@@ -16,19 +19,43 @@
 # Notes:
 # - Reads existing project outputs (evaluations/logs/etc) and summarizes regression-friendly metrics.
 # - Archives outputs under eval/runs/<timestamp>/ by default (recommended to be gitignored).
+# - Caches per-chapter eval/log extractions under <runs-dir>/.cache/ so re-runs only parse changed
+#   files; report.json is identical with or without the cache (use --no-cache to bypass it). With
+#   --no-archive an existing cache is still read but not updated.
+# - Archived runs also get rule-index.json: layer -> rule_id -> confidence -> violating chapters
+#   (delta-encoded), queried with query-rule-index.sh without re-reading evaluations/.
+# - --eval-store reads chapter evals from the project's consolidated eval store instead (only
+#   changed eval files are re-extracted into it); report.json is identical either way.
+# - logs.stage_latency (also in summary.json): per stage name and per model, stage count,
+#   duration_ms p50/p90/p99 (mergeable log-bucket sketch, ~1% relative error) / mean / max / total,
+#   input/output/total tokens and output tokens/sec, from logs/chapter-*-log.json stages[].
+# - --watch polls evaluations/, logs/, foreshadowing/global.json, style-drift.json (and the other
+#   inputs) every --interval seconds (default 0.5) and, after any add/modify/delete, rebuilds the
+#   run from per-file contributions kept in memory (only changed files are parsed; aggregates are
+#   re-folded only for the blocks of files that changed), atomically replacing each file of
+#   <runs-dir>/watch/<project>-<hash>/ (same files as an archived run; not ingested by
+#   regression-history.sh). A rebuild still costs O(chapters) for the poll and the rewritten
+#   report/chapters files. The contribution cache is saved once, when the watcher stops. No
+#   timestamped run is archived in this mode.
 
 set -euo pipefail
 
 usage() {
   cat >&2 <<'EOF'
 Usage:
-  run-regression.sh --project <novel_project_dir> [--labels <labels.jsonl>] [--runs-dir <dir>] [--no-archive]
+  run-regression.sh --project <novel_project_dir> [--labels <labels.jsonl>] [--runs-dir <dir>] [--no-archive] [--no-cache] [--jobs <n>] [--eval-store]
+  run-regression.sh --project <novel_project_dir> --watch [--interval <sec>] [options]
 
 Options:
   --project <dir>     Novel project directory (must contain evaluations/)
   --labels <file>     Optional: labeled dataset JSONL (for traceability; future metrics can use it)
   --runs-dir <dir>    Output base dir for archived runs (default: eval/runs)
-  --no-archive        Do not write run artifacts; only print JSON to stdout
+  --no-archive        Do not write anything under <runs-dir> (run artifacts or cache updates); only print JSON to stdout
+  --no-cache          Re-parse every eval/log file (skip <runs-dir>/.cache/)
+  --jobs <n>          Parse eval/log files across n worker processes (0 = CPU count; default: 1)
+  --eval-store        Read evals from <project>/logs/eval-store.sqlite (refreshed first; see eval-store.sh)
+  --watch             Keep running; rebuild <runs-dir>/watch/<project>-<hash>/ whenever inputs change
+  --interval <sec>    Watch poll interval in seconds (default: 0.5)
   --no-continuity     Skip reading logs/continuity/latest.json even if present
   --no-foreshadowing  Skip reading foreshadowing/global.json even if present
   --no-style          Skip reading style-drift.json even if present
@@ -43,6 +70,11 @@ archive=1
 include_continuity=1
 include_foreshadowing=1
 include_style=1
+use_cache=1
+jobs=1
+use_eval_store=0
+watch=0
+interval=0.5
 
 while [ "$#" -gt 0 ]; do
   case "$1" in
@@ -77,6 +109,28 @@ while [ "$#" -gt 0 ]; do
       include_style=0
       shift 1
       ;;
+    --no-cache)
+      use_cache=0
+      shift 1
+      ;;
+    --jobs)
+      [ "$#" -ge 2 ] || { echo "run-regression.sh: error: --jobs requires a value" >&2; exit 1; }
+      jobs="$2"
+      shift 2
+      ;;
+    --eval-store)
+      use_eval_store=1
+      shift 1
+      ;;
+    --watch)
+      watch=1
+      shift 1
+      ;;
+    --interval)
+      [ "$#" -ge 2 ] || { echo "run-regression.sh: error: --interval requires a value" >&2; exit 1; }
+      interval="$2"
+      shift 2
+      ;;
     -h|--help)
       usage
       exit 0
@@ -100,6 +154,20 @@ if [ ! -d "$project_dir" ]; then
   exit 1
 fi
 
+if ! [[ "$jobs" =~ ^[0-9]+$ ]]; then
+  echo "run-regression.sh: --jobs must be an int >= 0 (got: $jobs)" >&2
+  exit 1
+fi
+
+if ! [[ "$interval" =~ ^[0-9]+([.][0-9]+)?$ ]] || [[ "$interval" =~ ^0+([.]0+)?$ ]]; then
+  echo "run-regression.sh: --interval must be a number > 0 (got: $interval)" >&2
+  exit 1
+fi
+watch_interval=0
+if [ "$watch" -eq 1 ]; then
+  watch_interval="$interval"
+fi
+
 if [ -n "$labels_path" ] && [ ! -f "$labels_path" ]; then
   echo "run-regression.sh: labels file not found: $labels_path" >&2
   exit 1
@@ -111,12 +179,17 @@ if ! command -v python3 >/dev/null 2>&1; then
 fi
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
-python3 "$SCRIPT_DIR/lib/run_regression.py" \
+# exec so that SIGINT / SIGTERM reach the Python process directly (--watch runs until signalled).
+exec python3 "$SCRIPT_DIR/lib/run_regression.py" \
   "$project_dir" \
   "$labels_path" \
   "$runs_dir" \
   "$archive" \
   "$include_continuity" \
   "$include_foreshadowing" \
-  "$include_style"
+  "$include_style" \
+  "$use_cache" \
+  "$jobs" \
+  "$use_eval_store" \
+  "$watch_interval"
 
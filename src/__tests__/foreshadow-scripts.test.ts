@@ -0,0 +1,97 @@
+import assert from "node:assert/strict";
+import { execFile } from "node:child_process";
+import { mkdir, mkdtemp, writeFile } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import test from "node:test";
+import { fileURLToPath } from "node:url";
+import { promisify } from "node:util";
+
+const execFileAsync = promisify(execFile);
+
+const queryForeshadowPath = fileURLToPath(new URL("../../scripts/query-foreshadow.sh", import.meta.url));
+
+async function queryForeshadow(projectDir: string, args: string[]): Promise<Record<string, unknown>> {
+  const { stdout } = await execFileAsync("bash", [queryForeshadowPath, ...args], { cwd: projectDir });
+  return JSON.parse(stdout.trim()) as Record<string, unknown>;
+}
+
+function idsOf(report: Record<string, unknown>): string[] {
+  return (report.items as Array<{ id: string }>).map((it) => it.id);
+}
+
+async function makeProject(): Promise<string> {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-query-foreshadow-script-test-"));
+  await mkdir(join(rootDir, "foreshadowing"), { recursive: true });
+  await mkdir(join(rootDir, "volumes", "vol-01"), { recursive: true });
+  await writeFile(join(rootDir, ".checkpoint.json"), `${JSON.stringify({ current_volume: 1 })}\n`, "utf8");
+  await writeFile(
+    join(rootDir, "foreshadowing", "global.json"),
+    `${JSON.stringify({
+      foreshadowing: [
+        { id: "long-a", scope: "long", status: "planted", target_resolve_range: [300, 320] },
+        { id: "short-b", scope: "short", status: "advanced", target_resolve_range: [10, 12] },
+        { id: "done-c", scope: "medium", status: "resolved", target_resolve_range: [300, 310] }
+      ]
+    })}\n`,
+    "utf8"
+  );
+  await writeFile(
+    join(rootDir, "volumes", "vol-01", "foreshadowing.json"),
+    `${JSON.stringify({
+      foreshadowing: [{ id: "plan-d", scope: "medium", status: "planted", planted_chapter: 5, target_resolve_range: [40, 45] }]
+    })}\n`,
+    "utf8"
+  );
+  return rootDir;
+}
+
+test("query-foreshadow.sh answers chapter and span queries from the interval index", async () => {
+  const projectDir = await makeProject();
+
+  const planted = await queryForeshadow(projectDir, ["5"]);
+  assert.equal(planted.chapter, 5);
+  assert.deepEqual(idsOf(planted), ["plan-d"]);
+
+  // Short items stay relevant once overdue.
+  const overdue = await queryForeshadow(projectDir, ["305"]);
+  assert.deepEqual(idsOf(overdue), ["long-a", "short-b"]);
+  assert.deepEqual(overdue.stats, { items: 2, relevant_from_plan: 0, relevant_from_global: 2, overdue_short: 1 });
+
+  const span = await queryForeshadow(projectDir, ["--span", "1-11"]);
+  assert.equal(span.from_chapter, 1);
+  assert.equal(span.to_chapter, 11);
+  assert.deepEqual(idsOf(span), ["plan-d", "short-b"]);
+
+  // Edits to global.json invalidate the cached index.
+  await writeFile(
+    join(projectDir, "foreshadowing", "global.json"),
+    `${JSON.stringify({ foreshadowing: [{ id: "long-a", scope: "long", status: "resolved", target_resolve_range: [300, 320] }] })}\n`,
+    "utf8"
+  );
+  assert.deepEqual(idsOf(await queryForeshadow(projectDir, ["305"])), []);
+});
+
+test("query-foreshadow.sh --range streams per-chapter results and a range summary", async () => {
+  const projectDir = await makeProject();
+
+  const { stdout } = await execFileAsync("bash", [queryForeshadowPath, "--range", "4-11"], { cwd: projectDir });
+  const lines = stdout.trim().split("\n").map((line) => JSON.parse(line) as Record<string, unknown>);
+  assert.equal(lines.length, 9);
+
+  // Per-chapter lines are exactly the single-chapter output.
+  assert.deepEqual(lines[1], await queryForeshadow(projectDir, ["5"]));
+  assert.deepEqual(lines.slice(0, 8).map((line) => line.chapter), [4, 5, 6, 7, 8, 9, 10, 11]);
+
+  const summary = lines[8];
+  assert.equal(summary.type, "range_summary");
+  assert.deepEqual(summary.transitions, [
+    { chapter: 5, entered: ["plan-d"], left: [] },
+    { chapter: 6, entered: [], left: ["plan-d"] },
+    { chapter: 10, entered: ["short-b"], left: [] }
+  ]);
+  assert.deepEqual(summary.items, [
+    { id: "plan-d", first_chapter: 5, last_chapter: 5, chapter_count: 1 },
+    { id: "short-b", first_chapter: 10, last_chapter: 11, chapter_count: 2 }
+  ]);
+});
@@ -0,0 +1,186 @@
+import assert from "node:assert/strict";
+import { execFile } from "node:child_process";
+import { mkdir, mkdtemp, writeFile } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import test from "node:test";
+import { fileURLToPath } from "node:url";
+import { promisify } from "node:util";
+
+const execFileAsync = promisify(execFile);
+
+function scriptPath(name: string): string {
+  return fileURLToPath(new URL(`../../scripts/${name}`, import.meta.url));
+}
+
+async function runScript(name: string, args: string[]): Promise<Record<string, unknown>> {
+  const { stdout } = await execFileAsync("bash", [scriptPath(name), ...args], { maxBuffer: 10 * 1024 * 1024 });
+  return JSON.parse(stdout.trim()) as Record<string, unknown>;
+}
+
+// Reference semantics: count each phrase in priority order, then mask it so
+// shorter phrases never double-count inside a longer hit.
+function referenceCounts(text: string, words: string[]): Map<string, number> {
+  let masked = text;
+  const out = new Map<string, number>();
+  for (const word of words) {
+    const count = masked.split(word).length - 1;
+    if (count > 0) out.set(word, count);
+    masked = masked.replaceAll(word, "\u0000".repeat(word.length));
+  }
+  return out;
+}
+
+function hitCounts(report: Record<string, unknown>): Map<string, number> {
+  const hits = report.hits as Array<{ word: string; count: number }>;
+  return new Map(hits.map((h): [string, number] => [h.word, h.count]));
+}
+
+const CHAPTER_TEXT = [
+  "嘴角微扬起来，一时间嘴角嘴角微扬。",
+  "啊啊啊啊啊，啊啊啊。莫名其妙莫名",
+  "",
+  "嘴角微扬起 微扬起扬起 一时一时间时间",
+  "嘴角".repeat(50)
+].join("\n");
+
+test("lint-blacklist.sh hit counts match longest-first masking semantics", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-lint-blacklist-script-test-"));
+  const chapterPath = join(rootDir, "chapter-007.md");
+  const configPath = join(rootDir, "ai-blacklist.json");
+  const words = ["嘴角", "微扬", "嘴角微扬", "扬起", "一时间", "时间", "一时", "啊", "啊啊", "莫名", "莫名其妙"];
+  await writeFile(chapterPath, CHAPTER_TEXT, "utf8");
+  await writeFile(configPath, JSON.stringify({ words, whitelist: ["啊"] }), "utf8");
+
+  const report = await runScript("lint-blacklist.sh", [chapterPath, configPath]);
+
+  const effective = words.filter((w) => w !== "啊").sort((a, b) => b.length - a.length);
+  const expected = referenceCounts(CHAPTER_TEXT, effective);
+  assert.deepEqual(hitCounts(report), expected);
+  assert.equal(report.total_hits, [...expected.values()].reduce((a, b) => a + b, 0));
+});
+
+test("lint-cliche.sh hit counts match longest-first masking semantics with exemptions", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-lint-cliche-script-test-"));
+  const chapterPath = join(rootDir, "chapter-007.md");
+  const configPath = join(rootDir, "web-novel-cliche-lint.json");
+  await writeFile(chapterPath, CHAPTER_TEXT, "utf8");
+  await writeFile(
+    configPath,
+    JSON.stringify({
+      schema_version: 1,
+      words: ["嘴角微扬", "啊啊", "微扬起", "扬起"],
+      categories: { a: ["嘴角", "一时间"], b: ["一时", "时间"] },
+      exemptions: { exact: ["嘴角微扬起"], regex: ["啊{3}"] }
+    }),
+    "utf8"
+  );
+
+  const report = await runScript("lint-cliche.sh", [chapterPath, configPath]);
+
+  const exempted = CHAPTER_TEXT.replaceAll("嘴角微扬起", "\u0000".repeat(5)).replace(/啊{3}/gu, (m) => "\u0000".repeat(m.length));
+  const effective = ["嘴角微扬", "啊啊", "微扬起", "扬起", "嘴角", "一时间", "一时", "时间"].sort((a, b) =>
+    b.length !== a.length ? b.length - a.length : a < b ? -1 : a > b ? 1 : 0
+  );
+  const expected = referenceCounts(exempted, effective);
+  assert.deepEqual(hitCounts(report), expected);
+  assert.equal(report.total_hits, [...expected.values()].reduce((a, b) => a + b, 0));
+});
+
+test("lint-blacklist.sh --batch streams per-chapter JSONL plus a volume aggregate", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-lint-blacklist-batch-test-"));
+  const chaptersDir = join(rootDir, "chapters");
+  const configPath = join(rootDir, "ai-blacklist.json");
+  await mkdir(chaptersDir);
+  await writeFile(join(chaptersDir, "chapter-002.md"), "嘴角微扬。一时间。", "utf8");
+  await writeFile(join(chaptersDir, "chapter-010.md"), CHAPTER_TEXT, "utf8");
+  await writeFile(join(chaptersDir, "chapter-001.md"), "平平无奇的一章。", "utf8");
+  await writeFile(configPath, JSON.stringify({ words: ["嘴角", "嘴角微扬", "一时间"] }), "utf8");
+
+  const { stdout } = await execFileAsync("bash", [scriptPath("lint-blacklist.sh"), "--batch", "--jobs", "2", configPath, chaptersDir], {
+    maxBuffer: 10 * 1024 * 1024
+  });
+  const lines = stdout
+    .trim()
+    .split("\n")
+    .map((l) => JSON.parse(l) as Record<string, unknown>);
+
+  assert.equal(lines.length, 4);
+  const reports = lines.slice(0, 3);
+  assert.deepEqual(
+    reports.map((r) => r.chapter_path),
+    ["chapter-001.md", "chapter-002.md", "chapter-010.md"].map((name) => join(chaptersDir, name))
+  );
+  for (const report of reports) {
+    const single = await runScript("lint-blacklist.sh", [String(report.chapter_path), configPath]);
+    assert.deepEqual(report, single);
+  }
+
+  const aggregate = lines[3];
+  assert.equal(aggregate.type, "volume_aggregate");
+  assert.equal(aggregate.chapters, 3);
+  assert.equal(aggregate.chapters_with_hits, 2);
+  assert.equal(aggregate.total_hits, reports.reduce((sum, r) => sum + Number(r.total_hits), 0));
+  assert.equal(aggregate.chars, reports.reduce((sum, r) => sum + Number(r.chars), 0));
+  const top = aggregate.top_words as Array<{ word: string; count: number; chapters: number }>;
+  const expected = referenceCounts(CHAPTER_TEXT, ["嘴角微扬", "一时间", "嘴角"]);
+  assert.deepEqual(top[0], { word: "嘴角", count: expected.get("嘴角"), chapters: 1 });
+});
+
+test("lint-server.sh answers JSON-RPC lint requests with the scripts' JSON", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-lint-server-test-"));
+  const chapterPath = join(rootDir, "chapter-007.md");
+  const configPath = join(rootDir, "ai-blacklist.json");
+  await writeFile(chapterPath, CHAPTER_TEXT, "utf8");
+  await writeFile(configPath, JSON.stringify({ words: ["嘴角", "嘴角微扬", "一时间"] }), "utf8");
+
+  const requests = [
+    { jsonrpc: "2.0", id: 1, method: "lint_blacklist", params: { chapter_path: chapterPath, blacklist_path: configPath } },
+    { jsonrpc: "2.0", id: 2, method: "run_ner", params: { chapter_path: chapterPath } },
+    { jsonrpc: "2.0", id: 3, method: "lint_blacklist", params: { chapter_path: join(rootDir, "missing.md"), blacklist_path: configPath } },
+    { jsonrpc: "2.0", id: 4, method: "shutdown" }
+  ];
+  const child = execFile("bash", [scriptPath("lint-server.sh")], { maxBuffer: 10 * 1024 * 1024 });
+  let stdout = "";
+  child.stdout?.on("data", (chunk: string) => {
+    stdout += chunk;
+  });
+  const exited = new Promise<number | null>((resolve) => child.on("close", resolve));
+  child.stdin?.end(requests.map((r) => JSON.stringify(r)).join("\n") + "\n");
+  assert.equal(await exited, 0);
+
+  const responses = new Map(
+    stdout
+      .trim()
+      .split("\n")
+      .map((l) => JSON.parse(l) as { id: number; result?: Record<string, unknown>; error?: { code: number; message: string } })
+      .map((r): [number, typeof r] => [r.id, r])
+  );
+  assert.deepEqual(responses.get(1)?.result, await runScript("lint-blacklist.sh", [chapterPath, configPath]));
+  assert.deepEqual(responses.get(2)?.result, await runScript("run-ner.sh", [chapterPath]));
+  assert.equal(responses.get(3)?.error?.code, -32001);
+  assert.match(String(responses.get(3)?.error?.message), /^lint-blacklist\.sh: chapter file not found: /);
+  assert.deepEqual(responses.get(4)?.result, { ok: true });
+});
+
+test("lint-cliche.sh --incremental matches a full lint across paragraph edits", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-lint-cliche-incremental-test-"));
+  const chapterPath = join(rootDir, "chapter-003.md");
+  const configPath = join(rootDir, "web-novel-cliche-lint.json");
+  const statePath = join(rootDir, "state.json");
+  await writeFile(
+    configPath,
+    JSON.stringify({ schema_version: 1, words: ["嘴角微扬", "扬起"], categories: { a: ["嘴角", "一时间"] }, exemptions: { regex: ["啊{3}"] } }),
+    "utf8"
+  );
+
+  const drafts = [CHAPTER_TEXT, CHAPTER_TEXT.replace("莫名其妙", "嘴角微扬\n\n一时间"), "一时间\n\n" + CHAPTER_TEXT.slice(20)];
+  for (const draft of drafts) {
+    await writeFile(chapterPath, draft, "utf8");
+    const full = await runScript("lint-cliche.sh", [chapterPath, configPath]);
+    const incremental = await runScript("lint-cliche.sh", ["--incremental", statePath, chapterPath, configPath]);
+    delete full.generated_at;
+    delete incremental.generated_at;
+    assert.deepEqual(incremental, full);
+  }
+});
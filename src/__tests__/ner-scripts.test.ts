@@ -0,0 +1,126 @@
+import assert from "node:assert/strict";
+import { execFile } from "node:child_process";
+import { mkdir, mkdtemp, rm, writeFile } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import test from "node:test";
+import { fileURLToPath } from "node:url";
+import { promisify } from "node:util";
+
+const execFileAsync = promisify(execFile);
+
+function scriptPath(name: string): string {
+  return fileURLToPath(new URL(`../../scripts/${name}`, import.meta.url));
+}
+
+async function runScript(name: string, args: string[]): Promise<Record<string, unknown>> {
+  const { stdout } = await execFileAsync("bash", [scriptPath(name), ...args], { maxBuffer: 10 * 1024 * 1024 });
+  return JSON.parse(stdout.trim()) as Record<string, unknown>;
+}
+
+type IndexMatch = { type: string; text: string; first_seen: number; last_seen: number; chapter_count: number };
+
+function matchesOf(report: Record<string, unknown>, i: number): IndexMatch[] {
+  const results = report.results as Array<{ matches: IndexMatch[] }>;
+  return results[i].matches;
+}
+
+test("entity-index.sh indexes run-ner.sh entities per chapter and re-indexes only changed chapters", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-entity-index-script-test-"));
+  const chaptersDir = join(rootDir, "chapters");
+  const indexPath = join(rootDir, "logs", "entity-index.sqlite");
+  await mkdir(chaptersDir, { recursive: true });
+  await writeFile(join(chaptersDir, "chapter-001.md"), "林枫来到北冥城。\n\n“走吧。”林枫说道。\n", "utf8");
+  await writeFile(join(chaptersDir, "chapter-002.md"), "翌日，苏婉儿踏入青云山。\n\n“小心。”苏婉儿低声道。\n", "utf8");
+
+  const first = await runScript("entity-index.sh", ["update", indexPath, chaptersDir]);
+  assert.equal(first.chapters_indexed, 2);
+
+  const located = await runScript("entity-index.sh", ["query", "--type", "locations", indexPath, "北冥城"]);
+  assert.deepEqual(
+    matchesOf(located, 0).map((m) => [m.text, m.first_seen, m.last_seen]),
+    [["北冥城", 1, 1]]
+  );
+
+  // Chapter 2 now also visits 北冥城; chapter 1 is untouched and must be skipped.
+  await writeFile(join(chaptersDir, "chapter-002.md"), "翌日，苏婉儿回到北冥城。\n\n“小心。”苏婉儿低声道。\n", "utf8");
+  const second = await runScript("entity-index.sh", ["update", indexPath, chaptersDir]);
+  assert.equal(second.chapters_indexed, 1);
+  assert.equal(second.chapters_unchanged, 1);
+
+  const both = await runScript("entity-index.sh", ["query", indexPath, "北冥城", "青云山"]);
+  assert.deepEqual(
+    matchesOf(both, 0).map((m) => [m.text, m.first_seen, m.last_seen, m.chapter_count]),
+    [["北冥城", 1, 2, 2]]
+  );
+  assert.deepEqual(matchesOf(both, 1), []);
+
+  const prefixed = await runScript("entity-index.sh", ["query", "--prefix", "--type", "locations", indexPath, "北"]);
+  assert.deepEqual(
+    matchesOf(prefixed, 0).map((m) => m.text),
+    ["北冥城"]
+  );
+
+  // Deleting chapter 1 drops everything it contributed.
+  await rm(join(chaptersDir, "chapter-001.md"));
+  const third = await runScript("entity-index.sh", ["update", indexPath, chaptersDir]);
+  assert.equal(third.chapters_removed, 1);
+  assert.equal(third.chapters_total, 1);
+  const afterDelete = await runScript("entity-index.sh", ["query", "--type", "locations", indexPath, "北冥城"]);
+  assert.deepEqual(
+    matchesOf(afterDelete, 0).map((m) => [m.text, m.first_seen, m.last_seen, m.chapter_count]),
+    [["北冥城", 2, 2, 1]]
+  );
+});
+
+test("run-ner.sh --volume thresholds merged counts and clusters aliases across chapters", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-ner-volume-script-test-"));
+  const chaptersDir = join(rootDir, "chapters");
+  await mkdir(chaptersDir, { recursive: true });
+  const chapters = [
+    "那天，林枫道：“走吧。”\n\n北冥城外，枫哥道：“好。”\n",
+    "次日，林枫道：“嗯。”\n\n忽然，林公子道：“小心。”\n",
+    "清晨，林枫道：“嗯。”\n\n随后，枫哥道：“嗯。”\n",
+    "那天，韩立，来到青云山。\n",
+    "后来，韩立，离开青云山。\n"
+  ];
+  for (const [i, text] of chapters.entries()) {
+    await writeFile(join(chaptersDir, `chapter-00${i + 1}.md`), text, "utf8");
+  }
+
+  // A single chapter mentions 韩立 once: below the per-chapter threshold.
+  const single = await runScript("run-ner.sh", [join(chaptersDir, "chapter-004.md")]);
+  const singleEntities = single.entities as Record<string, Array<{ text: string }>>;
+  assert.deepEqual(singleEntities.characters, []);
+
+  const volume = await runScript("run-ner.sh", ["--volume", "--jobs", "2", chaptersDir]);
+  assert.deepEqual(volume.scope, { chapters: 5, from_chapter: 1, to_chapter: 5 });
+  const characters = (volume.entities as Record<string, unknown>).characters as Array<{
+    text: string;
+    chapter_count: number;
+    aliases: Array<{ text: string; alias_of?: string }>;
+  }>;
+  const byText = new Map(characters.map((c) => [c.text, c]));
+
+  assert.equal(byText.get("韩立")?.chapter_count, 2);
+  assert.deepEqual(
+    byText.get("林枫")?.aliases.map((a) => [a.text, a.alias_of]),
+    [
+      ["枫哥", "林枫"],
+      ["林公子", "林枫"]
+    ]
+  );
+  assert.equal(byText.has("枫哥"), false);
+
+  // The same chapter number from two directories would be counted twice.
+  const otherDir = join(rootDir, "other");
+  await mkdir(otherDir, { recursive: true });
+  await writeFile(join(otherDir, "chapter-004.md"), chapters[3], "utf8");
+  await assert.rejects(
+    execFileAsync("bash", [scriptPath("run-ner.sh"), "--volume", chaptersDir, otherDir]),
+    (err: unknown) => {
+      const { code, stderr } = err as { code?: number; stderr?: string };
+      return code === 1 && /chapter 4 matched by two files/.test(stderr ?? "");
+    }
+  );
+});
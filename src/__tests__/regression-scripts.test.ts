@@ -0,0 +1,236 @@
+import assert from "node:assert/strict";
+import { execFile, spawn } from "node:child_process";
+import { once } from "node:events";
+import { mkdir, mkdtemp, readdir, readFile, rm, writeFile } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import { createInterface } from "node:readline";
+import test from "node:test";
+import { fileURLToPath } from "node:url";
+import { promisify } from "node:util";
+
+const execFileAsync = promisify(execFile);
+
+function scriptPath(name: string): string {
+  return fileURLToPath(new URL(`../../scripts/${name}`, import.meta.url));
+}
+
+async function runScript(name: string, args: string[]): Promise<Record<string, unknown>> {
+  const { stdout } = await execFileAsync("bash", [scriptPath(name), ...args], { maxBuffer: 10 * 1024 * 1024 });
+  return JSON.parse(stdout.trim()) as Record<string, unknown>;
+}
+
+type ArchivedRun = {
+  highConfidence: number;
+  violations: number;
+  scoreMean?: number;
+  byLayer: Record<string, number>;
+};
+
+async function archiveRun(runsDir: string, projectDir: string, index: number, run: ArchivedRun): Promise<void> {
+  const runId = `2026-01-0${index + 1}T000000Z`;
+  const runDir = join(runsDir, runId);
+  await mkdir(runDir, { recursive: true });
+  const summary: Record<string, unknown> = {
+    run_id: runId,
+    generated_at: `2026-01-0${index + 1}T00:00:00Z`,
+    project_path: projectDir,
+    chapters_total: 10,
+    violations_total: run.violations,
+    compliance: { compliance_rate_high_confidence: run.highConfidence },
+    violations_by_layer: run.byLayer
+  };
+  if (run.scoreMean !== undefined) summary.score_overall = { mean: run.scoreMean };
+  await writeFile(join(runDir, "summary.json"), `${JSON.stringify(summary)}\n`, "utf8");
+}
+
+test("regression-history.sh backfills archived runs, aligns trends and finds mean shifts", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-regression-history-script-test-"));
+  const runsDir = join(rootDir, "runs");
+  const projectDir = join(rootDir, "project");
+  await mkdir(projectDir, { recursive: true });
+  // High-confidence compliance drops after run 3; violations_total has one blip at run 5.
+  const runs: ArchivedRun[] = [
+    { highConfidence: 0.9, violations: 10, scoreMean: 4.0, byLayer: { L1: 1, L2: 2, L3: 3 } },
+    { highConfidence: 0.91, violations: 10, byLayer: { L1: 1, L2: 2, L3: 3 } },
+    { highConfidence: 0.9, violations: 10, scoreMean: 4.1, byLayer: { L1: 1, L2: 2, L3: 3 } },
+    { highConfidence: 0.6, violations: 10, scoreMean: 4.0, byLayer: { L1: 1, L2: 2, L3: 3 } },
+    { highConfidence: 0.61, violations: 11, scoreMean: 4.1, byLayer: { L1: 1, L2: 2, L3: 3 } }
+  ];
+  for (const [i, run] of runs.entries()) await archiveRun(runsDir, projectDir, i, run);
+
+  const ingested = await runScript("regression-history.sh", ["ingest", "--runs-dir", runsDir]);
+  assert.deepEqual(ingested.sync, { run_dirs_found: 5, ingested: 5, skipped_invalid: 0 });
+
+  // A new archive is picked up by the next query; known runs are not re-read.
+  await archiveRun(runsDir, projectDir, 5, { highConfidence: 0.6, violations: 10, scoreMean: 4.0, byLayer: { L1: 1, L2: 2, L3: 3 } });
+  const trend = await runScript("regression-history.sh", [
+    "trend",
+    "--runs-dir",
+    runsDir,
+    "--project",
+    projectDir,
+    "--metric",
+    "score_overall_mean,violations_by_layer.L[12]"
+  ]);
+  assert.deepEqual(trend.sync, { run_dirs_found: 6, ingested: 1, skipped_invalid: 0 });
+  const projects = trend.projects as Array<{ runs: Array<{ run_id: string }>; series: Record<string, Array<number | null>> }>;
+  assert.equal(projects.length, 1);
+  assert.equal(projects[0].runs.length, 6);
+  assert.equal(projects[0].runs[0].run_id, "2026-01-01T000000Z");
+  assert.deepEqual(projects[0].series, {
+    score_overall_mean: [4.0, null, 4.1, 4.0, 4.1, 4.0],
+    "violations_by_layer.L1": [1, 1, 1, 1, 1, 1],
+    "violations_by_layer.L2": [2, 2, 2, 2, 2, 2]
+  });
+
+  const detected = await runScript("regression-history.sh", [
+    "changepoints",
+    "--runs-dir",
+    runsDir,
+    "--metric",
+    "compliance_rate_high_confidence,violations_total"
+  ]);
+  const changepoints = (detected.projects as Array<{ changepoints: Array<Record<string, unknown>> }>)[0].changepoints;
+  assert.deepEqual(
+    changepoints.map((cp) => [cp.metric, cp.run_id, cp.shift]),
+    [["compliance_rate_high_confidence", "2026-01-04T000000Z", -0.3]]
+  );
+});
+
+async function writeEval(projectDir: string, chapter: number, overall: number, violation: boolean): Promise<void> {
+  const evalObj = {
+    chapter,
+    eval_used: {
+      overall,
+      contract_verification: {
+        l1_checks: [{ rule_id: "W-001", status: violation ? "violation" : "pass", confidence: "high" }]
+      }
+    }
+  };
+  const name = `chapter-${String(chapter).padStart(3, "0")}-eval.json`;
+  await writeFile(join(projectDir, "evaluations", name), `${JSON.stringify(evalObj)}\n`, "utf8");
+}
+
+test("run-regression.sh --watch rebuilds on added and deleted evals and stops cleanly on SIGTERM", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-run-regression-watch-test-"));
+  const projectDir = join(rootDir, "project");
+  const runsDir = join(rootDir, "runs");
+  await mkdir(join(projectDir, "evaluations"), { recursive: true });
+  await writeEval(projectDir, 1, 4.0, false);
+  await writeEval(projectDir, 2, 3.0, true);
+
+  const child = spawn(
+    "bash",
+    [scriptPath("run-regression.sh"), "--project", projectDir, "--runs-dir", runsDir, "--watch", "--interval", "0.1"],
+    { stdio: ["ignore", "pipe", "inherit"] }
+  );
+  const lines = createInterface({ input: child.stdout })[Symbol.asyncIterator]();
+  async function nextUpdate(): Promise<Record<string, unknown>> {
+    const { value } = await lines.next();
+    return JSON.parse(value as string) as Record<string, unknown>;
+  }
+
+  try {
+    const first = await nextUpdate();
+    assert.equal(first.chapters_total, 2);
+    assert.equal(first.violations_total, 1);
+    const watchDir = first.run_dir as string;
+
+    await writeEval(projectDir, 3, 2.0, true);
+    const added = await nextUpdate();
+    assert.equal(added.chapters_total, 3);
+    assert.equal(added.violations_total, 2);
+
+    await rm(join(projectDir, "evaluations", "chapter-002-eval.json"));
+    const deleted = await nextUpdate();
+    assert.equal(deleted.chapters_total, 2);
+    assert.equal(deleted.violations_total, 1);
+    assert.deepEqual(deleted.score_overall, { n: 2, mean: 3.0, min: 2.0, max: 4.0 });
+
+    const summary = JSON.parse(await readFile(join(watchDir, "summary.json"), "utf8")) as Record<string, unknown>;
+    assert.equal(summary.chapters_total, 2);
+    // The contribution cache is only written on stop.
+    await assert.rejects(readdir(join(runsDir, ".cache")));
+
+    const exited = once(child, "exit");
+    child.kill("SIGTERM");
+    const [code] = await exited;
+    assert.equal(code, 0);
+    assert.equal((await readdir(join(runsDir, ".cache"))).length, 1);
+    assert.deepEqual(
+      (await readdir(watchDir)).filter((name) => name.startsWith(".tmp-")),
+      []
+    );
+  } finally {
+    child.kill("SIGKILL");
+  }
+});
+
+async function archivedRunDir(runsDir: string): Promise<string> {
+  const names = (await readdir(runsDir)).filter((name) => !name.startsWith("."));
+  assert.equal(names.length, 1);
+  return join(runsDir, names[0]);
+}
+
+async function compareChapters(args: string[]): Promise<Array<Record<string, unknown>>> {
+  const { stdout } = await execFileAsync("bash", [scriptPath("compare-regression-runs.sh"), ...args]);
+  return stdout
+    .trim()
+    .split("\n")
+    .map((line) => JSON.parse(line) as Record<string, unknown>);
+}
+
+test("compare-regression-runs.sh --chapters diffs the runs' chapters.jsonl", async () => {
+  const rootDir = await mkdtemp(join(tmpdir(), "novel-compare-chapters-script-test-"));
+  const projectDir = join(rootDir, "project");
+  await mkdir(join(projectDir, "evaluations"), { recursive: true });
+  await writeEval(projectDir, 1, 4.0, false);
+  await writeEval(projectDir, 2, 3.0, true);
+  await writeEval(projectDir, 3, 3.0, false);
+  await writeEval(projectDir, 4, 4.0, false);
+  await writeEval(projectDir, 6, 4.0, false);
+  await execFileAsync("bash", [scriptPath("run-regression.sh"), "--project", projectDir, "--runs-dir", join(rootDir, "runs-a")]);
+
+  await writeEval(projectDir, 1, 4.0, true);
+  await writeEval(projectDir, 2, 3.0, false);
+  await writeEval(projectDir, 3, 3.7, false);
+  await rm(join(projectDir, "evaluations", "chapter-004-eval.json"));
+  await writeEval(projectDir, 5, 4.0, false);
+  await execFileAsync("bash", [scriptPath("run-regression.sh"), "--project", projectDir, "--runs-dir", join(rootDir, "runs-b")]);
+
+  const runA = await archivedRunDir(join(rootDir, "runs-a"));
+  const runB = await archivedRunDir(join(rootDir, "runs-b"));
+  const chapterLines = (await readFile(join(runA, "chapters.jsonl"), "utf8")).trim().split("\n");
+  assert.deepEqual(JSON.parse(chapterLines[1]), {
+    chapter: 2,
+    overall: 3.0,
+    violations: [["L1", "W-001", "high"]],
+    high_conf_violation: true
+  });
+
+  const lines = await compareChapters([runA, runB, "--chapters"]);
+  const summary = lines.pop() as Record<string, unknown>;
+  assert.deepEqual(
+    lines.map((l) => [l.chapter, l.change]),
+    [
+      [1, "regressed"],
+      [2, "recovered"],
+      [3, "changed"],
+      [4, "only_in_a"],
+      [5, "only_in_b"]
+    ]
+  );
+  assert.deepEqual(lines[0].violations_added, [["L1", "W-001", "high"]]);
+  assert.equal(lines[2].overall_delta, 0.7);
+  assert.equal(summary.type, "chapter_diff_summary");
+  assert.equal(summary.chapters_compared, 4);
+  assert.equal(summary.score_changed, 1);
+
+  // Score-only changes within --min-score-delta are dropped.
+  const coarse = await compareChapters([runA, runB, "--chapters", "--min-score-delta", "1"]);
+  assert.deepEqual(
+    coarse.slice(0, -1).map((l) => l.chapter),
+    [1, 2, 4, 5]
+  );
+});